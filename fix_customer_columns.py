@@ -6,19 +6,19 @@ This utility performs three key tasks:
 2. Emits a markdown summary of the schema for quick reference
 3. Walks every markdown-based lab in `tech company/untitled/`, fixing column
    references that do not line up with the authoritative schema. The fixer
-   understands table aliases, performs fuzzy matching, and applies special
-   handlers for the tricky Customers table (ContactName, Email, etc.).
+   understands table aliases, performs fuzzy matching, and applies the
+   rename rules in `column_renames.json` (e.g. the Customers table's
+   ContactName and Email, or Employees.Title).
 """
 
 from __future__ import annotations
 
 import argparse
-import difflib
-import re
+import sys
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
 
 ROOT = Path(__file__).resolve().parent
 MASTER_SQL = ROOT / "tech company" / "00_TechCorp_MASTER_Setup.sql"
@@ -26,41 +26,34 @@ LABS_DIR = ROOT / "tech company" / "untitled"
 SCHEMA_SUMMARY = ROOT / "tech company" / "schema_summary.md"
 REPORT_PATH = ROOT / "tech company" / "sql_validation_report.md"
 
-CREATE_PATTERN = re.compile(r"^\s*CREATE\s+TABLE\s+([A-Za-z0-9_\[\]\.]+)\s*\(", re.IGNORECASE)
-ALIAS_PATTERN = re.compile(
-    r"\b(FROM|JOIN)\s+([A-Za-z_][A-Za-z0-9_\[\]]*)(?:\s+(?:AS\s+)?([A-Za-z_][A-Za-z0-9_\[\]]*))?",
-    re.IGNORECASE,
-)
-COLUMN_TOKEN_PATTERN = re.compile(r"\b([A-Za-z_][A-Za-z0-9_]*)\.([A-Za-z_][A-Za-z0-9_]*)\b")
-CUSTOMER_STATEMENT_PATTERN = re.compile(
-    r"SELECT[\s\S]+?FROM\s+Customers\b(?!\s+(?:AS\s+)?[A-Za-z_])[\s\S]*?(?=;|$)",
-    re.IGNORECASE,
-)
-
-SPECIAL_COLUMN_HANDLERS = {
-    "customers": {
-        "companyname": lambda alias: f"{alias}.CustomerName",
-        "contactname": lambda alias: f"CONCAT({alias}.ContactFirstName, ' ', {alias}.ContactLastName)",
-        "email": lambda alias: f"{alias}.PrimaryEmail",
-        "emailaddress": lambda alias: f"{alias}.PrimaryEmail",
-        "phone": lambda alias: f"{alias}.PrimaryPhone",
-        "phonenumber": lambda alias: f"{alias}.PrimaryPhone",
-        "country": lambda alias: f"{alias}.CountryID",
-        "address": lambda alias: f"{alias}.StreetAddress",
-    }
-}
-
-BARE_CUSTOMER_REPLACEMENTS = [
-    (re.compile(r"(?<!\.)\bCompanyName\b", re.IGNORECASE), "CustomerName", "CompanyName -> CustomerName"),
-    (
-        re.compile(r"(?<!\.)\bContactName\b", re.IGNORECASE),
-        "CONCAT(ContactFirstName, ' ', ContactLastName)",
-        "ContactName -> ContactFirstName+LastName",
-    ),
-    (re.compile(r"(?<!\.)\bEmail\b", re.IGNORECASE), "PrimaryEmail", "Email -> PrimaryEmail"),
-    (re.compile(r"(?<!\.)\bPhone\b", re.IGNORECASE), "PrimaryPhone", "Phone -> PrimaryPhone"),
-    (re.compile(r"(?<!\.)\bCountry\b", re.IGNORECASE), "CountryID", "Country -> CountryID"),
-]
+# The shared SQL helpers live next to the other column tools.
+sys.path.insert(0, str(LABS_DIR))
+from file_pool import map_files  # noqa: E402
+from findings import CASE_FIX, FUZZY_FIX, RULES_BY_ID, FindingStream, make_finding  # noqa: E402
+from fuzzy_match import FuzzyMatcher  # noqa: E402
+from git_changes import GitError, select_changed  # noqa: E402
+from line_index import LineIndex  # noqa: E402
+from md_fences import Span, rewrite_fences, sql_fences  # noqa: E402
+from rename_rules import DEFAULT_RULES_PATH, RenameRule, RenameRules, load_rules  # noqa: E402
+from report_stream import MarkdownStream, Spool  # noqa: E402
+from scan_cache import SHARED_SOURCES, ScanCache, default_cache_path, fingerprint  # noqa: E402
+from schema_catalog import load_catalog  # noqa: E402
+from sql_lexer import NAME, CodeMask, Token, code_tokens, tokenize  # noqa: E402
+from sql_scopes import TABLE, Scope, Source, resolve_scopes, schema_table  # noqa: E402
+from stage_profile import PROFILER, add_profile_arguments, finish_profile, start_profile  # noqa: E402
+
+AS_KEYWORD = {"AS"}
+FUZZY_CUTOFF = 0.8
+# Each process parses a single master schema, so one matcher serves every lab.
+COLUMN_MATCHER = FuzzyMatcher()
+
+Edit = Tuple[int, int, str]
+
+
+class Change(NamedTuple):
+    rule: str
+    text: str
+    line: int  # relative to the start of the SQL block until process_markdown_file resolves it
 
 
 @dataclass
@@ -69,13 +62,17 @@ class BlockReport:
     block_index: int
     start_line: int
     status: str
-    issues: List[str]
+    issues: List[Change]
     sql_preview: str
 
+    def to_json(self) -> List[object]:
+        issues = [list(issue) for issue in self.issues]
+        return [self.block_index, self.start_line, self.status, issues, self.sql_preview]
 
-def calculate_line_number(content: str, start_index: int) -> int:
-    """Return the 1-based line number for the regex match start."""
-    return content.count('\n', 0, start_index) + 1
+    @classmethod
+    def from_json(cls, file: Path, data: List[object]) -> "BlockReport":
+        block_index, start_line, status, issues, sql_preview = data
+        return cls(file, block_index, start_line, status, [Change(*issue) for issue in issues], sql_preview)
 
 
 def build_sql_preview(body: str, max_lines: int = 3) -> str:
@@ -95,63 +92,34 @@ def normalize_identifier(raw: str) -> str:
 
 
 def parse_master_sql(path: Path) -> Dict[str, Dict[str, object]]:
-    """Parse the master SQL file and build a table -> columns map."""
+    """Load the master SQL file through the shared schema catalog as a table -> columns map.
+
+    Each entry keeps the declared column types (`DECIMAL(18,6)`, `NVARCHAR(500)`)
+    and the table's foreign keys too; `load_plan.ForeignKeyGraph` turns the
+    latter into the load waves and drop order.
+    """
     if not path.exists():
         raise FileNotFoundError(f"Master SQL not found: {path}")
 
     tables: Dict[str, Dict[str, object]] = {}
-    lines = path.read_text(encoding="utf-8").splitlines()
-    i = 0
-
-    while i < len(lines):
-        line = lines[i]
-        match = CREATE_PATTERN.match(line)
-        if not match:
-            i += 1
-            continue
-
-        raw_name = match.group(1)
-        table_key = normalize_identifier(raw_name)
-        table_display = raw_name.strip().strip('[]').split('.')[-1]
-        i += 1
-
-        column_order: List[str] = []
-        column_lookup: Dict[str, str] = {}
-
-        while i < len(lines):
-            current = lines[i].strip()
-            if current.startswith(')'):
-                break
-            if not current or current.startswith('--'):
-                i += 1
-                continue
-
-            leading = current.split()[0].upper()
-            if leading in {"CONSTRAINT", "PRIMARY", "FOREIGN", "UNIQUE", "CHECK"}:
-                i += 1
-                continue
-
-            col_match = re.match(r"(\[?[A-Za-z0-9_]+\]?)(\s+.+)", current)
-            if col_match:
-                col_name = col_match.group(1).strip().strip('[]')
-                column_order.append(col_name)
-                column_lookup[col_name.lower()] = col_name
-
-            i += 1
-
-        tables[table_key] = {
-            "name": table_display,
-            "columns": column_lookup,
+    for table in load_catalog([path]):
+        column_order = table.column_names
+        tables[table.key] = {
+            "name": table.name,
+            "columns": {column.lower(): column for column in column_order},
             "order": column_order,
+            "types": {key: column.data_type for key, column in table.columns.items()},
+            "foreign_keys": table.foreign_keys,
         }
+    return tables
 
-        while i < len(lines) and not lines[i].strip().startswith('CREATE TABLE'):
-            if lines[i].strip().startswith(')'):
-                i += 1
-                break
-            i += 1
 
-    return tables
+def display_path(path: Path) -> Path:
+    """`path` relative to the repository root, or as given when it lies outside (e.g. a benchmark corpus)."""
+    try:
+        return path.relative_to(ROOT)
+    except ValueError:
+        return path
 
 
 def write_schema_summary(schema: Dict[str, Dict[str, object]], output: Path) -> None:
@@ -167,59 +135,80 @@ def write_schema_summary(schema: Dict[str, Dict[str, object]], output: Path) ->
     output.write_text("\n".join(lines), encoding="utf-8")
 
 
-def build_alias_map(sql: str, schema: Dict[str, Dict[str, object]]) -> Dict[str, str]:
-    alias_map: Dict[str, str] = {}
-    for match in ALIAS_PATTERN.finditer(sql):
-        table_raw = match.group(2)
-        alias_raw = match.group(3)
-        table_key = normalize_identifier(table_raw)
-        if table_key not in schema:
-            continue
-        alias = alias_raw if alias_raw else schema[table_key]["name"]
-        alias_map[normalize_identifier(alias)] = table_key
-
-    for table_key in schema.keys():
-        alias_map.setdefault(table_key, table_key)
-
-    return alias_map
-
-
-def pick_best_column(table_key: str, column: str, schema: Dict[str, Dict[str, object]]) -> Tuple[str, str] | Tuple[None, None]:
-    table = schema.get(table_key)
-    if not table:
-        return None, None
-
-    lookup = table["columns"]
-    column_lower = column.lower()
-    if column_lower in lookup:
-        return lookup[column_lower], "exact"
+def bare_source(scope: Scope) -> Optional[Source]:
+    """The table an unqualified column in `scope` must belong to, if the scope reads exactly one, unaliased."""
+    if len(scope.sources) != 1:
+        return None
+    (source,) = scope.sources.values()
+    if source.kind != TABLE or source.aliased:
+        return None
+    return source
 
-    special = SPECIAL_COLUMN_HANDLERS.get(table_key, {})
-    if column_lower in special:
-        handler = special[column_lower]
-        return handler, "special"
-
-    candidates = difflib.get_close_matches(column_lower, lookup.keys(), n=1, cutoff=0.8)
-    if candidates:
-        best = candidates[0]
-        return lookup[best], "fuzzy"
-
-    return None, None
 
+def rewrite_columns(
+    sql: str,
+    tokens: List[Token],
+    scopes: List[Scope],
+    schema: Dict[str, Dict[str, object]],
+    rules: RenameRules,
+) -> Tuple[List[Edit], List[Change]]:
+    """Resolve every column reference in one walk over the block's tokens.
+
+    Qualifiers are resolved in the reference's own statement scope.
+    Qualified references are normalized to the schema's casing, rewritten by
+    an alias-scope rename rule, or fuzzy-matched, in that order; CTE and
+    derived-table columns are left alone. Unqualified names in a query that
+    reads a rule's table alone and without an alias are rewritten by its
+    bare-scope rules and summarized per query.
+    """
+    edits: List[Edit] = []
+    changes: List[Change] = []
+    check_bare = rules.mentions_bare_table(sql)
+    # Per query scope: rule position -> (rule, offsets of the names it rewrote).
+    scope_hits: Dict[Scope, Dict[int, Tuple[RenameRule, List[int]]]] = {}
+    lines: Optional[LineIndex] = None  # built on the first change; most blocks need none
+
+    def line_of(offset: int) -> int:
+        nonlocal lines
+        if lines is None:
+            with PROFILER.stage("lines"):
+                lines = LineIndex(sql)
+        return lines.line_of(offset)
+
+    for position, (token, scope) in enumerate(zip(tokens, scopes)):
+        if token.kind != NAME:
+            continue
 
-def fix_alias_columns(sql: str, alias_map: Dict[str, str], schema: Dict[str, Dict[str, object]]) -> Tuple[str, List[str]]:
-    changes: List[str] = []
+        if "." not in token.text:
+            if not check_bare:
+                continue
+            # `AS Title` names an output column; it is not a reference.
+            if position and tokens[position - 1].is_keyword(AS_KEYWORD):
+                continue
+            source = bare_source(scope)
+            hit = rules.bare_rules(source.table.lower()).get(token.text.lower()) if source else None
+            if hit is None:
+                continue
+            with PROFILER.stage("handlers"):
+                order, rule = hit
+                # INSERT column lists and UPDATE targets only take a column name, not an expression.
+                if source.clause not in ("FROM", "JOIN") and not rule.render(None).isidentifier():
+                    continue
+                scope_hits.setdefault(scope, {}).setdefault(order, (rule, []))[1].append(token.start)
+                edits.append((token.start, token.end, rule.render(None)))
+            continue
 
-    def replacer(match: re.Match) -> str:
-        alias, column = match.group(1), match.group(2)
-        alias_key = alias.lower()
-        if alias_key not in alias_map:
-            return match.group(0)
+        if "[" in token.text:
+            continue
+        parts = token.parts
+        if len(parts) != 2:
+            continue
 
-        table_key = alias_map[alias_key]
-        table = schema.get(table_key)
+        alias, column = parts
+        table_key = schema_table(scope, alias, schema)
+        table = schema.get(table_key) if table_key else None
         if not table:
-            return match.group(0)
+            continue
 
         lookup = table["columns"]
         column_lower = column.lower()
@@ -227,57 +216,66 @@ def fix_alias_columns(sql: str, alias_map: Dict[str, str], schema: Dict[str, Dic
         if column_lower in lookup:
             canonical = lookup[column_lower]
             if canonical != column:
-                changes.append(f"{alias}.{column} -> {alias}.{canonical} ({table['name']})")
-            return f"{alias}.{canonical}"
-
-        special = SPECIAL_COLUMN_HANDLERS.get(table_key, {})
-        if column_lower in special:
-            handler = special[column_lower]
-            replacement = handler(alias)
-            changes.append(f"{alias}.{column} -> {replacement} ({table['name']} special)")
-            return replacement
-
-        candidates = difflib.get_close_matches(column_lower, lookup.keys(), n=1, cutoff=0.8)
-        if candidates:
-            canonical = lookup[candidates[0]]
-            changes.append(f"{alias}.{column} -> {alias}.{canonical} ({table['name']} fuzzy)")
-            return f"{alias}.{canonical}"
-
-        return match.group(0)
-
-    new_sql = COLUMN_TOKEN_PATTERN.sub(replacer, sql)
-    return new_sql, changes
-
-
-def apply_bare_customer_replacements(segment: str) -> Tuple[str, List[str]]:
-    changes: List[str] = []
-    updated = segment
-    for pattern, replacement, description in BARE_CUSTOMER_REPLACEMENTS:
-        updated, count = pattern.subn(replacement, updated)
-        if count:
-            changes.append(f"Customers (no alias): {description} x{count}")
-    return updated, changes
-
-
-def fix_bare_customer_segments(sql: str) -> Tuple[str, List[str]]:
-    changes: List[str] = []
-
-    def repl(match: re.Match) -> str:
-        segment = match.group(0)
-        updated, seg_changes = apply_bare_customer_replacements(segment)
-        changes.extend(seg_changes)
-        return updated
-
-    new_sql = CUSTOMER_STATEMENT_PATTERN.sub(repl, sql)
-    return new_sql, changes
+                description = f"{alias}.{column} -> {alias}.{canonical} ({table['name']})"
+                changes.append(Change(CASE_FIX.id, description, line_of(token.start)))
+                edits.append((token.start, token.end, f"{alias}.{canonical}"))
+            continue
 
+        with PROFILER.stage("handlers"):
+            rule = rules.alias_rule(table_key, column_lower)
+            replacement = rule.render(alias) if rule is not None else None
+        if rule is not None:
+            description = f"{alias}.{column} -> {replacement} ({table['name']} special)"
+            changes.append(Change(rule.finding, description, line_of(token.start)))
+            edits.append((token.start, token.end, replacement))
+            continue
 
-def process_sql_block(block: str, schema: Dict[str, Dict[str, object]]) -> Tuple[str, List[str]]:
-    alias_map = build_alias_map(block, schema)
-    updated, changes = fix_alias_columns(block, alias_map, schema)
-    updated, bare_changes = fix_bare_customer_segments(updated)
-    changes.extend(bare_changes)
-    return updated, changes
+        best = COLUMN_MATCHER.best_match(table_key, column_lower, lookup.keys(), FUZZY_CUTOFF)
+        if best:
+            canonical = lookup[best]
+            description = f"{alias}.{column} -> {alias}.{canonical} ({table['name']} fuzzy)"
+            changes.append(Change(FUZZY_FIX.id, description, line_of(token.start)))
+            edits.append((token.start, token.end, f"{alias}.{canonical}"))
+
+    for hits in scope_hits.values():
+        for order in sorted(hits):
+            rule, offsets = hits[order]
+            table_name = schema[rule.table_key]["name"] if rule.table_key in schema else rule.table
+            changes.append(
+                Change(
+                    rule.finding,
+                    f"{table_name} (no alias): {rule.description} x{len(offsets)}",
+                    line_of(offsets[0]),
+                )
+            )
+    return edits, changes
+
+
+def apply_edits(sql: str, edits: List[Edit]) -> str:
+    """Splice non-overlapping `(start, end, replacement)` edits into `sql`."""
+    if not edits:
+        return sql
+    parts: List[str] = []
+    last_index = 0
+    for start, end, replacement in sorted(edits):
+        parts.append(sql[last_index:start])
+        parts.append(replacement)
+        last_index = end
+    parts.append(sql[last_index:])
+    return "".join(parts)
+
+
+def process_sql_block(
+    block: str, schema: Dict[str, Dict[str, object]], rules: RenameRules
+) -> Tuple[str, List[Change]]:
+    with PROFILER.stage("tokenize"):
+        raw_tokens = tokenize(block)
+        tokens = code_tokens(raw_tokens, CodeMask(raw_tokens))
+    with PROFILER.stage("aliases"):
+        scopes = resolve_scopes(tokens)
+    with PROFILER.stage("references"):
+        edits, changes = rewrite_columns(block, tokens, scopes, schema, rules)
+        return apply_edits(block, edits), changes
 
 
 def parse_args() -> argparse.Namespace:
@@ -294,129 +292,269 @@ def parse_args() -> argparse.Namespace:
         default=REPORT_PATH,
         help="Destination markdown file for validation results (report mode only).",
     )
+    parser.add_argument(
+        "--rules",
+        type=Path,
+        default=DEFAULT_RULES_PATH,
+        help="Column rename rules file (default: tech company/untitled/column_renames.json).",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of worker processes used to scan the labs (0 = one per CPU).",
+    )
+    parser.add_argument(
+        "--cache",
+        type=Path,
+        help="Scan cache file (default: tech company/untitled/.scan_cache/fix_customer_columns.json).",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Re-scan every lab and leave the scan cache untouched.",
+    )
+    parser.add_argument(
+        "--jsonl",
+        type=Path,
+        help="Also stream every finding to this JSON Lines file (report mode only).",
+    )
+    parser.add_argument(
+        "--sarif",
+        type=Path,
+        help="Also write every finding to this SARIF 2.1.0 log (report mode only).",
+    )
+    changed = parser.add_mutually_exclusive_group()
+    changed.add_argument(
+        "--since",
+        metavar="REF",
+        help="Only scan labs changed since this git ref (plus labs using tables a master script change touched).",
+    )
+    changed.add_argument(
+        "--staged",
+        action="store_true",
+        help="Only scan labs staged for commit (plus labs using tables a master script change touched).",
+    )
+    add_profile_arguments(parser)
     return parser.parse_args()
 
 
-def write_validation_report(rows: List[BlockReport], output_path: Path) -> None:
-    total = len(rows)
-    passed = sum(1 for row in rows if row.status == "pass")
-    failed = total - passed
+def write_validation_report(
+    rows: Iterable[BlockReport], output_path: Path, findings: Optional[FindingStream] = None
+) -> None:
+    """Stream block rows into the markdown report (and optional findings stream).
 
-    lines: List[str] = [
-        "# SQL Validation Report",
-        "",
-        f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
-        f"- Total SQL blocks: {total}",
-        f"- ✅ Passed: {passed}",
-        f"- ❌ Failed: {failed}",
-        "",
-    ]
+    `rows` may be a lazy iterator; block details are spooled to a temporary
+    file so only the pass/fail counters are held until the summary is written.
+    """
+    total = 0
+    passed = 0
+    details = Spool()
 
     for row in rows:
-        rel_path = row.file.relative_to(ROOT)
-        icon = "✅" if row.status == "pass" else "❌"
-        lines.append(f"{icon} **{rel_path}** (block {row.block_index}, line {row.start_line})")
-        lines.append(f"> {row.sql_preview}")
-        if row.issues:
-            lines.append("Errors:")
-            for issue in row.issues:
-                lines.append(f"- {issue}")
-        lines.append("")
+        with PROFILER.stage("report"):
+            total += 1
+            if row.status == "pass":
+                passed += 1
+            rel_path = display_path(row.file)
+            icon = "✅" if row.status == "pass" else "❌"
+            details.write(f"{icon} **{rel_path}** (block {row.block_index}, line {row.start_line})")
+            details.write(f"> {row.sql_preview}")
+            if row.issues:
+                details.write("Errors:")
+                for issue in row.issues:
+                    details.write(f"- {issue.text}")
+                    if findings is not None:
+                        findings.write(
+                            make_finding(
+                                RULES_BY_ID[issue.rule], str(rel_path), issue.line, issue.text, block=row.block_index
+                            )
+                        )
+            details.write("")
+    failed = total - passed
 
-    output_path.write_text("\n".join(lines).strip() + "\n", encoding="utf-8")
+    with PROFILER.stage("report"), output_path.open("w", encoding="utf-8") as handle:
+        out = MarkdownStream(handle)
+        out.write_all(
+            [
+                "# SQL Validation Report",
+                "",
+                f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+                f"- Total SQL blocks: {total}",
+                f"- ✅ Passed: {passed}",
+                f"- ❌ Failed: {failed}",
+                "",
+            ]
+        )
+        out.write_all(details)
+        out.finish()
+
+    details.close()
+    if findings is not None:
+        findings.close()
 
 
 def print_console_report(rows: List[BlockReport]) -> None:
     for row in rows:
-        rel_path = row.file.relative_to(ROOT)
+        rel_path = display_path(row.file)
         icon = "✅" if row.status == "pass" else "❌"
         print(f"{icon} {rel_path} (block {row.block_index}, line {row.start_line})")
         if row.issues:
             for issue in row.issues:
-                print(f"    - {issue}")
+                print(f"    - {issue.text}")
 
 
 def process_markdown_file(
     path: Path,
     schema: Dict[str, Dict[str, object]],
     *,
+    rules: RenameRules,
     mode: str = "fix",
     reporter: List[BlockReport] | None = None,
 ) -> Tuple[bool, List[str]]:
-    content = path.read_text(encoding="utf-8")
-    block_pattern = re.compile(r"```(?P<lang>[^\n]*)\n(?P<body>[\s\S]*?)```", re.IGNORECASE)
     file_changes: List[str] = []
-    block_counter = 0
-    file_was_changed = False
-
-    def replace_block(match: re.Match) -> str:
-        nonlocal block_counter, file_was_changed
-        lang = match.group("lang").strip().lower()
-        body = match.group("body")
-        if lang not in {"", "sql", "tsql"}:
-            return match.group(0)
-
-        block_counter += 1
-        updated_body, changes = process_sql_block(body, schema)
-        start_line = calculate_line_number(content, match.start())
+    replacements: Dict[Span, str] = {}
+
+    for block_index, fence in enumerate(sql_fences(path), start=1):
+        updated_body, changes = process_sql_block(fence.body, schema, rules)
+        changes = [change._replace(line=fence.body_line + change.line) for change in changes]
         status = "pass" if not changes else "fail"
 
         if reporter is not None:
-            reporter.append(
-                BlockReport(
-                    file=path,
-                    block_index=block_counter,
-                    start_line=start_line,
-                    status=status,
-                    issues=list(changes),
-                    sql_preview=build_sql_preview(body),
+            with PROFILER.stage("report"):
+                reporter.append(
+                    BlockReport(
+                        file=path,
+                        block_index=block_index,
+                        start_line=fence.start_line,
+                        status=status,
+                        issues=changes,
+                        sql_preview=build_sql_preview(fence.body),
+                    )
                 )
-            )
 
         if mode == "fix" and changes:
-            file_changes.extend([f"[block {block_counter}] {change}" for change in changes])
-            file_was_changed = True
-            return f"```{match.group('lang')}\n{updated_body}```"
+            file_changes.extend([f"[block {block_index}] {change.text}" for change in changes])
+            replacements[fence.span] = updated_body
+
+    if replacements:
+        rewrite_fences(path, replacements)
+    return bool(replacements), file_changes
 
-        return match.group(0)
 
-    updated_content = block_pattern.sub(replace_block, content)
-    if mode == "fix" and file_was_changed:
-        path.write_text(updated_content, encoding="utf-8")
-    return file_was_changed, file_changes
+_worker_schema: Optional[Dict[str, Dict[str, object]]] = None
+_worker_rules = RenameRules()
+_worker_mode = "fix"
+
+
+def _init_worker(schema: Dict[str, Dict[str, object]], rules: RenameRules, mode: str) -> None:
+    global _worker_schema, _worker_rules, _worker_mode
+    _worker_schema = schema
+    _worker_rules = rules
+    _worker_mode = mode
+
+
+def _process_in_worker(path: Path) -> Tuple[bool, List[str], List[BlockReport]]:
+    rows: List[BlockReport] = []
+    changed, change_list = process_markdown_file(
+        path, _worker_schema, rules=_worker_rules, mode=_worker_mode, reporter=rows
+    )
+    return changed, change_list, rows
+
+
+def scan_labs(
+    md_files: List[Path],
+    schema: Dict[str, Dict[str, object]],
+    rules: RenameRules,
+    mode: str,
+    jobs: int,
+    cache: Optional[ScanCache],
+) -> Iterator[Tuple[bool, List[str], List[BlockReport]]]:
+    """Yield `(changed, changes, rows)` per lab, in order, reusing cached rows.
+
+    In fix mode a cached lab that still has findings is processed again so
+    its fixes are actually written.
+    """
+    cached: Dict[Path, List[BlockReport]] = {}
+    if cache is not None:
+        for md_file in md_files:
+            data = cache.get(md_file)
+            if data is None:
+                continue
+            rows = [BlockReport.from_json(md_file, row) for row in data]
+            if mode == "report" or not any(row.issues for row in rows):
+                cached[md_file] = rows
+
+    pending = [md_file for md_file in md_files if md_file not in cached]
+    fresh = map_files(_process_in_worker, pending, jobs, _init_worker, (schema, rules, mode))
+    for md_file in md_files:
+        if md_file in cached:
+            yield False, [], cached[md_file]
+            continue
+        changed, change_list, rows = next(fresh)
+        if cache is not None and not changed:
+            cache.put(md_file, [row.to_json() for row in rows])
+        yield changed, change_list, rows
 
 
 def main() -> None:
     args = parse_args()
+    start_profile(args)
     schema = parse_master_sql(MASTER_SQL)
-    write_schema_summary(schema, SCHEMA_SUMMARY)
+    with PROFILER.stage("write"):
+        write_schema_summary(schema, SCHEMA_SUMMARY)
     print(f"Captured schema for {len(schema)} tables. Summary saved to {SCHEMA_SUMMARY.relative_to(ROOT)}")
+    rules = load_rules(args.rules)
+    print(f"Loaded {len(rules)} column rename rules from {args.rules.name}")
 
     if not LABS_DIR.exists():
         raise FileNotFoundError(f"Labs directory missing: {LABS_DIR}")
 
     md_files = sorted(LABS_DIR.rglob('*.md'))
+    if args.since or args.staged:
+        try:
+            selection = select_changed(md_files, [MASTER_SQL], args.since, args.staged)
+        except GitError as exc:
+            raise SystemExit(f"❌ {exc}") from None
+        md_files = selection.files
+        print(selection.describe(f"since {args.since}" if args.since else "staged for commit"))
     print(f"Scanning {len(md_files)} markdown labs for schema alignment...")
 
+    cache = None
+    if not args.no_cache:
+        cache_path = args.cache or default_cache_path(LABS_DIR, "fix_customer_columns")
+        sources = [MASTER_SQL, __file__, *SHARED_SOURCES]
+        if args.rules.is_file():
+            sources.append(args.rules)
+        cache = ScanCache(cache_path, fingerprint(sources))
+
+    # Results come back in file order, so output matches a serial run.
+    results = scan_labs(md_files, schema, rules, args.mode, args.jobs, cache)
     if args.mode == "fix":
         total_changes = 0
-        for md_file in md_files:
-            changed, change_list = process_markdown_file(md_file, schema, mode="fix")
+        for md_file, (changed, change_list, _) in zip(md_files, results):
             if changed:
                 total_changes += 1
                 print(f"  ✓ {md_file.relative_to(LABS_DIR)} -> {len(change_list)} fixes")
         print(f"Completed. Updated {total_changes} files.")
     else:
-        report_rows: List[BlockReport] = []
-        for md_file in md_files:
-            process_markdown_file(md_file, schema, mode="report", reporter=report_rows)
-        write_validation_report(report_rows, args.report_path)
-        print_console_report(report_rows)
-        try:
-            relative_report = args.report_path.relative_to(ROOT)
-        except ValueError:
-            relative_report = args.report_path
-        print(f"Validation report saved to {relative_report}")
+
+        def report_rows() -> Iterator[BlockReport]:
+            for _, _, rows in results:
+                with PROFILER.stage("report"):
+                    print_console_report(rows)
+                yield from rows
+
+        findings = None
+        if args.jsonl or args.sarif:
+            findings = FindingStream("fix_customer_columns", args.jsonl, args.sarif)
+        write_validation_report(report_rows(), args.report_path, findings)
+        print(f"Validation report saved to {display_path(args.report_path)}")
+
+    if cache is not None:
+        with PROFILER.stage("write"):
+            cache.save()
+    finish_profile(args)
 
 
 if __name__ == "__main__":
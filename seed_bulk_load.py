@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+"""Convert the numbered seed-data scripts into bulk loads.
+
+The data scripts (`03_TechCorp_Lookup_Data.sql` .. `13_TechCorp_Performance_Data.sql`,
+or `lesotho/00_CBL_DataWarehouse_Setup.sql`) fill the tables with
+`INSERT ... VALUES` statements. This tool parses every such statement with
+the shared lexer and rewrites each script into `<output>/<script>.bulk.sql`,
+keeping everything else (USE, PRINT, the UPDATEs that wire managers to
+departments, verification queries) exactly where it was:
+
+* `--format csv` (default) writes the rows of each statement to
+  `data/<Table>.csv` with a bcp format file `data/<Table>.fmt` next to it and
+  replaces the statement with a `BULK INSERT`. The format file maps each
+  field to the column's position in the table as `parse_master_sql`
+  recovers it from the CREATE TABLE statements, so identity and defaulted
+  columns the INSERT leaves out are skipped. `load_bcp.cmd` loads the same files with
+  bcp instead.
+* `--format inserts` replaces each statement with multi-row INSERTs of at
+  most `--batch-size` rows (SQL Server accepts up to 1,000 per VALUES list).
+
+A statement whose values are not plain literals (function calls, DEFAULT),
+or whose strings contain the delimiter, a line break or are empty (which a
+bulk load would read as NULL), falls back to batched INSERTs in csv mode.
+`load_all.sql` runs the converted scripts in order under `sqlcmd -i`.
+
+The numbered scripts build their tables in `02_TechCorp_Table_Creation.sql`
+(not the master setup script, whose tables have since gained and renamed
+columns), so that is the default `--schema`. Tables a converted script
+creates itself (`08_TechCorp_Advanced_Tables.sql`, the CBL warehouse script)
+are added as the scripts are read, in order.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from fix_customer_columns import LABS_DIR, ROOT, display_path, parse_master_sql
+
+sys.path.insert(0, str(LABS_DIR))
+from line_index import LineIndex  # noqa: E402
+from sql_lexer import COMMENT, NAME, NUMBER, OPERATOR, PUNCT, STRING, Token, split_name, tokenize  # noqa: E402
+
+SEED_SCRIPTS_DIR = ROOT / "tech company" / "adding_data_scripts"
+TABLE_SCRIPT = SEED_SCRIPTS_DIR / "02_TechCorp_Table_Creation.sql"
+OUTPUT_DIR = ROOT / "tech company" / "bulk_load"
+MAX_VALUES_ROWS = 1000  # SQL Server's limit on the rows of one VALUES list
+FORMAT_FILE_VERSION = "14.0"
+ROW_TERMINATOR = "\r\n"
+
+
+class InsertStatement(NamedTuple):
+    table: str  # as written, e.g. "dbo.Employees"
+    columns: List[str]
+    rows: List[List[List[Token]]]  # the tokens of every value of every row
+    span: Tuple[int, int]  # from INSERT through the closing parenthesis (and `;`)
+
+
+class NotLiteral(ValueError):
+    """A value that has to be evaluated by the server, e.g. `SYSDATETIME()`."""
+
+
+@dataclass
+class Conversion:
+    script: Path
+    output: Path
+    statements: int = 0
+    rows: int = 0
+    bulk_files: List[Tuple[str, Path, Path, bool]] = field(default_factory=list)  # table, data, format, nulls
+    warnings: List[str] = field(default_factory=list)
+
+
+def default_scripts() -> List[Path]:
+    """`03_*.sql` .. `13_*.sql`; the `_Individual` variant of 04 inserts the same companies again."""
+    return [
+        path
+        for path in sorted(SEED_SCRIPTS_DIR.glob("[0-9][0-9]_*.sql"))
+        if 3 <= int(path.name[:2]) <= 13 and not path.stem.endswith("_Individual")
+    ]
+
+
+def _is_word(token: Token, word: str) -> bool:
+    return token.kind == NAME and token.text.upper() == word
+
+
+def _is_punct(token: Token, text: str) -> bool:
+    return token.kind == PUNCT and token.text == text
+
+
+def _split_values(tokens: List[Token], index: int) -> Tuple[List[List[Token]], int]:
+    """Split the parenthesised list opening at `index` on top-level commas; return it and the index after `)`."""
+    values: List[List[Token]] = []
+    current: List[Token] = []
+    depth = 0
+    index += 1
+    while index < len(tokens):
+        token = tokens[index]
+        if token.kind == PUNCT:
+            if token.text == "(":
+                depth += 1
+            elif token.text == ")":
+                if depth == 0:
+                    values.append(current)
+                    return values, index + 1
+                depth -= 1
+            elif token.text == "," and depth == 0:
+                values.append(current)
+                current = []
+                index += 1
+                continue
+        current.append(token)
+        index += 1
+    raise ValueError("unterminated parenthesis")
+
+
+def parse_inserts(sql: str, warnings: List[str]) -> Iterator[InsertStatement]:
+    """Yield every `INSERT [INTO] table (columns) VALUES (...), ...` statement in `sql`.
+
+    INSERTs without a column list or fed by SELECT/EXEC are reported in
+    `warnings` and left in place.
+    """
+    tokens = [token for token in tokenize(sql) if token.kind != COMMENT]
+    lines = LineIndex(sql)
+    index = 0
+    while index < len(tokens):
+        token = tokens[index]
+        if not _is_word(token, "INSERT"):
+            index += 1
+            continue
+        start = token.start
+        position = index + 1
+        if position < len(tokens) and _is_word(tokens[position], "INTO"):
+            position += 1
+        if position + 1 >= len(tokens) or tokens[position].kind != NAME:
+            index += 1
+            continue
+        table = tokens[position].text
+        position += 1
+        where = f"line {lines.line_number(start)}"
+        if not _is_punct(tokens[position], "("):
+            warnings.append(f"{where}: INSERT INTO {table} has no column list; left as is")
+            index = position
+            continue
+        columns, position = _split_values(tokens, position)
+        if position >= len(tokens) or not _is_word(tokens[position], "VALUES"):
+            warnings.append(f"{where}: INSERT INTO {table} is not fed by VALUES; left as is")
+            index = position
+            continue
+        position += 1
+        rows: List[List[List[Token]]] = []
+        while position < len(tokens) and _is_punct(tokens[position], "("):
+            values, position = _split_values(tokens, position)
+            rows.append(values)
+            if position < len(tokens) and _is_punct(tokens[position], ","):
+                position += 1
+                continue
+            break
+        end = tokens[position - 1].end
+        if position < len(tokens) and _is_punct(tokens[position], ";"):
+            end = tokens[position].end
+            position += 1
+        names = [split_name(column[0].text)[-1].strip("[]") for column in columns if column]
+        yield InsertStatement(table, names, rows, (start, end))
+        index = position
+
+
+def literal_field(value: List[Token]) -> Optional[str]:
+    """The text a data file holds for one VALUES entry, or None for NULL."""
+    if len(value) == 1:
+        token = value[0]
+        if token.kind == NAME and token.text.upper() == "NULL":
+            return None
+        if token.kind == STRING:
+            body = token.text[token.text.index("'") + 1 : -1]
+            return body.replace("''", "'")
+        if token.kind == NUMBER:
+            return token.text
+    if len(value) == 2 and value[0].kind == OPERATOR and value[0].text in ("-", "+") and value[1].kind == NUMBER:
+        return value[0].text.lstrip("+") + value[1].text
+    raise NotLiteral(" ".join(token.text for token in value))
+
+
+def _value_text(sql: str, value: List[Token]) -> str:
+    return sql[value[0].start : value[-1].end] if value else ""
+
+
+def batched_inserts(sql: str, statement: InsertStatement, batch_size: int) -> str:
+    head = f"INSERT INTO {statement.table} ({', '.join(statement.columns)}) VALUES"
+    batches = []
+    for offset in range(0, len(statement.rows), batch_size):
+        rows = statement.rows[offset : offset + batch_size]
+        body = ",\n".join("(" + ", ".join(_value_text(sql, value) for value in row) + ")" for row in rows)
+        batches.append(f"{head}\n{body};")
+    return "\n".join(batches)
+
+
+def format_file(columns: Sequence[str], order: Sequence[str], delimiter: str) -> str:
+    """A non-XML bcp format file mapping each data field to its table column by position."""
+    positions = {column.lower(): number for number, column in enumerate(order, start=1)}
+    lines = [FORMAT_FILE_VERSION, str(len(columns))]
+    for number, column in enumerate(columns, start=1):
+        terminator = ROW_TERMINATOR if number == len(columns) else delimiter
+        escaped = terminator.replace("\\", "\\\\").replace("\r", "\\r").replace("\n", "\\n").replace("\t", "\\t")
+        lines.append(f'{number}\tSQLCHAR\t0\t0\t"{escaped}"\t{positions[column.lower()]}\t{column}\t""')
+    return "\n".join(lines) + "\n"
+
+
+def _data_rows(statement: InsertStatement, delimiter: str) -> Tuple[List[List[Optional[str]]], bool]:
+    rows: List[List[Optional[str]]] = []
+    has_nulls = False
+    for row in statement.rows:
+        if len(row) != len(statement.columns):
+            raise NotLiteral(f"a row has {len(row)} values for {len(statement.columns)} columns")
+        fields = [literal_field(value) for value in row]
+        for text in fields:
+            if text is None:
+                has_nulls = True
+            elif text == "" or delimiter in text or "\n" in text or "\r" in text:
+                raise NotLiteral(f"value {text!r} cannot be written to a {delimiter!r}-delimited file")
+        rows.append(fields)
+    return rows, has_nulls
+
+
+def _unique_stem(table_name: str, used: Dict[str, int]) -> str:
+    count = used.get(table_name.lower(), 0) + 1
+    used[table_name.lower()] = count
+    return table_name if count == 1 else f"{table_name}.{count}"
+
+
+def convert_script(
+    script: Path,
+    schema: Dict[str, Dict[str, object]],
+    output_dir: Path,
+    mode: str,
+    batch_size: int,
+    delimiter: str,
+    server_data_dir: Path,
+    used_stems: Dict[str, int],
+) -> Conversion:
+    """Write the bulk-load version of `script`; tables it creates are added to `schema` first."""
+    sql = script.read_text(encoding="utf-8-sig")
+    schema.update(parse_master_sql(script))
+    conversion = Conversion(script, output_dir / f"{script.stem}.bulk.sql")
+    lines = LineIndex(sql)
+    replacements: List[Tuple[Tuple[int, int], str]] = []
+
+    for statement in parse_inserts(sql, conversion.warnings):
+        conversion.statements += 1
+        conversion.rows += len(statement.rows)
+        where = f"line {lines.line_number(statement.span[0])}"
+        replacement = None
+        if mode == "csv":
+            table_name = split_name(statement.table)[-1].strip("[]")
+            table = schema.get(table_name.lower())
+            try:
+                if table is None:
+                    raise NotLiteral(f"table {table_name} is not in the schema")
+                missing = [column for column in statement.columns if column.lower() not in table["columns"]]
+                if missing:
+                    raise NotLiteral(f"{table['name']} has no column {', '.join(missing)}")
+                rows, has_nulls = _data_rows(statement, delimiter)
+            except NotLiteral as exc:
+                conversion.warnings.append(f"{where}: INSERT INTO {statement.table} kept as batched INSERTs ({exc})")
+            else:
+                stem = _unique_stem(table["name"], used_stems)
+                data_path = output_dir / "data" / f"{stem}.csv"
+                format_path = output_dir / "data" / f"{stem}.fmt"
+                with data_path.open("w", encoding="utf-8", newline="") as handle:
+                    for fields in rows:
+                        handle.write(delimiter.join("" if text is None else text for text in fields) + ROW_TERMINATOR)
+                format_path.write_text(format_file(statement.columns, table["order"], delimiter), encoding="utf-8")
+                conversion.bulk_files.append((statement.table, data_path, format_path, has_nulls))
+                options = [
+                    f"FORMATFILE = '{server_data_dir / format_path.name}'",
+                    "CODEPAGE = '65001'",
+                    "TABLOCK",
+                    f"BATCHSIZE = {batch_size}",
+                ]
+                if has_nulls:
+                    options.insert(2, "KEEPNULLS")
+                replacement = (
+                    f"-- {len(rows)} rows bulk loaded from data/{data_path.name} (INSERT ... VALUES at {where})\n"
+                    f"BULK INSERT {statement.table} FROM '{server_data_dir / data_path.name}'\n"
+                    f"WITH ({', '.join(options)});"
+                )
+        if replacement is None:
+            replacement = batched_inserts(sql, statement, min(batch_size, MAX_VALUES_ROWS))
+        replacements.append((statement.span, replacement))
+
+    parts: List[str] = []
+    last = 0
+    for (start, end), text in replacements:
+        parts.append(sql[last:start])
+        parts.append(text)
+        last = end
+    parts.append(sql[last:])
+    conversion.output.write_text("".join(parts), encoding="utf-8")
+    return conversion
+
+
+def _database(script: Path) -> Optional[str]:
+    """The database named by the script's first `USE` statement."""
+    tokens = [token for token in tokenize(script.read_text(encoding="utf-8-sig")) if token.kind != COMMENT]
+    for token, following in zip(tokens, tokens[1:]):
+        if _is_word(token, "USE") and following.kind == NAME:
+            return following.text
+    return None
+
+
+def write_loaders(conversions: List[Conversion], output_dir: Path, batch_size: int, database: Optional[str]) -> None:
+    lines = ["-- Run with: sqlcmd -S <server> -E -i load_all.sql", ""]
+    lines += [f":r {conversion.output.name}" for conversion in conversions]
+    (output_dir / "load_all.sql").write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    bulk_files = [entry for conversion in conversions for entry in conversion.bulk_files]
+    if not bulk_files:
+        return
+    target = f"{database}.dbo." if database else ""
+    commands = [
+        "@echo off",
+        "rem Loads the data files only; the converted scripts also run the seed scripts' UPDATEs and checks.",
+        'if "%SERVER%"=="" set SERVER=localhost',
+    ]
+    for table, data_path, format_path, has_nulls in bulk_files:
+        name = split_name(table)[-1]
+        flags = f"-b {batch_size} -h \"TABLOCK\"" + (" -k" if has_nulls else "")
+        commands.append(
+            f'bcp {target}{name} in "data\\{data_path.name}" -f "data\\{format_path.name}" -S %SERVER% -T -C 65001 {flags}'
+        )
+    (output_dir / "load_bcp.cmd").write_text("\r\n".join(commands) + "\r\n", encoding="utf-8")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Turn the seed-data INSERT scripts into bulk loads.")
+    parser.add_argument(
+        "scripts",
+        nargs="*",
+        type=Path,
+        help="Seed scripts to convert, in load order (default: adding_data_scripts/03_*.sql .. 13_*.sql).",
+    )
+    parser.add_argument(
+        "--format",
+        choices=("csv", "inserts"),
+        default="csv",
+        help="'csv' for data files + bcp format files + BULK INSERT, 'inserts' for batched multi-row INSERTs.",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=MAX_VALUES_ROWS,
+        help=f"Rows per INSERT (at most {MAX_VALUES_ROWS}) or per BULK INSERT/bcp batch (default: {MAX_VALUES_ROWS}).",
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=OUTPUT_DIR,
+        help="Directory for the converted scripts and data files (default: tech company/bulk_load).",
+    )
+    parser.add_argument(
+        "--delimiter",
+        default="|",
+        help="Field terminator of the data files (default: '|'; commas are common in the seed text).",
+    )
+    parser.add_argument(
+        "--server-data-dir",
+        type=Path,
+        help="Path of <output>/data as the SQL Server machine sees it, for BULK INSERT (default: the local path).",
+    )
+    parser.add_argument(
+        "--schema",
+        nargs="+",
+        type=Path,
+        default=[TABLE_SCRIPT],
+        help="Scripts with the CREATE TABLE statements the seed scripts load into "
+        "(default: adding_data_scripts/02_TechCorp_Table_Creation.sql).",
+    )
+    args = parser.parse_args()
+    if args.batch_size < 1:
+        parser.error("--batch-size must be positive")
+    if args.format == "inserts" and args.batch_size > MAX_VALUES_ROWS:
+        parser.error(f"--batch-size cannot exceed {MAX_VALUES_ROWS} rows per INSERT")
+    if not args.delimiter or any(char in args.delimiter for char in "\r\n"):
+        parser.error("--delimiter must be non-empty and on one line")
+    return args
+
+
+def main() -> int:
+    args = parse_args()
+    scripts = args.scripts or default_scripts()
+    schema: Dict[str, Dict[str, object]] = {}
+    for source in args.schema:
+        schema.update(parse_master_sql(source))
+    output_dir: Path = args.output
+    (output_dir / "data").mkdir(parents=True, exist_ok=True)
+    server_data_dir = args.server_data_dir or (output_dir / "data").resolve()
+    print(f"Loaded {len(schema)} tables from {', '.join(str(display_path(source)) for source in args.schema)}")
+
+    conversions: List[Conversion] = []
+    used_stems: Dict[str, int] = {}
+    for script in scripts:
+        conversion = convert_script(
+            script, schema, output_dir, args.format, args.batch_size, args.delimiter, server_data_dir, used_stems
+        )
+        conversions.append(conversion)
+        print(
+            f"  {script.name}: {conversion.statements} INSERT statements, {conversion.rows} rows, "
+            f"{len(conversion.bulk_files)} bulk loads -> {conversion.output.name}"
+        )
+        for warning in conversion.warnings:
+            print(f"    ⚠️  {warning}")
+
+    write_loaders(conversions, output_dir, args.batch_size, _database(scripts[0]) if scripts else None)
+    total_rows = sum(conversion.rows for conversion in conversions)
+    print(f"Converted {total_rows} rows from {len(conversions)} scripts into {display_path(output_dir)}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,782 @@
+#!/usr/bin/env python3
+"""Generate large, referentially valid data sets for the performance labs.
+
+The seed scripts give every table a few hundred rows, too few for an index
+seek to beat a scan. This tool reads the schema catalog (the TechCorp
+master script by default, or `lesotho/00_CBL_DataWarehouse_Setup.sql` for
+the warehouse) and streams any number of rows per table to
+`<output>/<Table>.csv`, with a bcp format file next to each data file and
+`load_synthetic.sql` to BULK INSERT them in foreign-key order, one load wave
+(`load_plan.py`) at a time.
+
+The rows satisfy the constraints the catalog records:
+
+* PRIMARY KEY and UNIQUE columns (single or composite) are a function of the
+  row number: identity keys count up from the identity seed, composite keys
+  spread it over their components, giving each but the last about
+  sqrt(rows) values (5,000 `TimeSeriesData` rows cover 71 indicators on 71
+  days), unique strings carry the row number (`EN000042`).
+* FOREIGN KEY columns pick a row number of the parent and take that row's
+  key, so no key is ever kept in memory; a self-reference
+  (`Employees.ReportsToEmployeeID`) points at an earlier row.
+* CHECK constraints with a readable domain are honoured: `IN (...)` lists,
+  `BETWEEN` and comparisons with a literal (`PeriodQuarter BETWEEN 1 AND 4`,
+  `Quantity > 0`).
+
+Memory stays constant however many rows are asked for: a table is written
+row by row and children only need the row counts of their parents. Every
+table draws from its own `random.Random` seeded with `--seed` and the
+table name, so the same arguments always produce the same files, and
+changing one table's row count leaves the other tables' columns alone.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import random
+import sys
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import date
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from fix_customer_columns import LABS_DIR, MASTER_SQL, display_path
+from seed_bulk_load import OUTPUT_DIR, ROW_TERMINATOR, format_file
+
+sys.path.insert(0, str(LABS_DIR))
+from load_plan import ForeignKeyGraph, LoadPlan, plan_loads  # noqa: E402
+from schema_catalog import Column, SchemaCatalog, Table, load_catalog  # noqa: E402
+
+DEFAULT_OUTPUT = OUTPUT_DIR / "synthetic"
+DEFAULT_ROWS = 1000
+WRITE_BUFFER_ROWS = 10_000
+LOAD_SCRIPT = "load_synthetic.sql"
+MANIFEST = "synthetic.json"
+
+INTEGER_RANGES = {
+    "TINYINT": (0, 255),
+    "SMALLINT": (-(2**15), 2**15 - 1),
+    "INT": (-(2**31), 2**31 - 1),
+    "BIGINT": (-(2**63), 2**63 - 1),
+}
+# Values non-key integers are drawn from, before CHECK constraints narrow them.
+RANDOM_INTEGER_RANGES = {"TINYINT": (0, 100), "SMALLINT": (0, 10_000), "INT": (0, 100_000), "BIGINT": (0, 1_000_000)}
+NAME_RANGES = (("year", 1990, 2030), ("quarter", 1, 4), ("month", 1, 12), ("day", 1, 28))
+DATE_PARTS = ("year", "quarter", "month")
+DATETIME_TYPES = {"DATETIME", "DATETIME2", "SMALLDATETIME", "DATETIMEOFFSET"}
+DECIMAL_TYPES = {"DECIMAL", "NUMERIC", "MONEY", "SMALLMONEY", "FLOAT", "REAL"}
+BASE36 = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+FIRST_NAMES = (
+    "James Mary Robert Patricia John Jennifer Michael Linda David Elizabeth William Barbara Thabo "
+    "Lerato Palesa Tumelo Mpho Naledi Karabo Refiloe Sipho Ayesha Wei Priya Carlos Sofia Liam Emma"
+).split()
+LAST_NAMES = (
+    "Smith Johnson Williams Brown Jones Garcia Miller Davis Rodriguez Martinez Mokoena Molapo "
+    "Letsie Nkosi Dlamini Chen Patel Kim Nguyen Silva Müller Rossi Dubois Okafor Mensah Tanaka"
+).split()
+CITIES = (
+    "Maseru|Johannesburg|Cape Town|New York|Chicago|London|Toronto|Sydney|Berlin|Paris|Tokyo|Mumbai|"
+    "São Paulo|Nairobi|Leribe|Mafeteng|Seattle|Austin|Dublin|Singapore"
+).split("|")
+WORDS = (
+    "analysis system service report project data network cloud support quarterly annual review "
+    "customer product order invoice budget strategy platform migration security training audit "
+    "delivery planning research finance operations sales marketing development integration"
+).split()
+
+
+class Domain:
+    """The values a column can take: `random` draws one, `ordinal(k)` is the k-th of `size` distinct ones.
+
+    `random` methods index with `rnd.random()` rather than calling `choice` or
+    `randrange`, which costs several times as much per value.
+    """
+
+    size: Optional[int] = None  # None: more distinct values than any table will ask for
+
+    def random(self, rnd: random.Random) -> str:
+        raise NotImplementedError
+
+    def ordinal(self, k: int) -> str:
+        raise NotImplementedError
+
+
+class IntegerDomain(Domain):
+    def __init__(self, low: int, high: int, random_low: Optional[int] = None, random_high: Optional[int] = None):
+        self.low, self.high = low, high
+        self.random_low = low if random_low is None else max(low, random_low)
+        self.random_high = high if random_high is None else min(high, random_high)
+        if self.random_low > self.random_high:
+            self.random_low, self.random_high = low, min(high, low + 100)
+        self.random_span = self.random_high - self.random_low + 1
+        self.size = high - low + 1
+
+    def random(self, rnd: random.Random) -> str:
+        return str(self.random_low + int(rnd.random() * self.random_span))
+
+    def ordinal(self, k: int) -> str:
+        return str(self.low + k)
+
+
+class DecimalDomain(Domain):
+    def __init__(self, low: float, high: float, scale: int):
+        self.low, self.high, self.scale = low, max(low, high), scale
+        self.step = 10.0**-scale
+        self.size = int(round((self.high - low) / self.step)) + 1
+
+    def random(self, rnd: random.Random) -> str:
+        return f"{rnd.uniform(self.low, self.high):.{self.scale}f}"
+
+    def ordinal(self, k: int) -> str:
+        return f"{self.low + k * self.step:.{self.scale}f}"
+
+
+class ChoiceDomain(Domain):
+    def __init__(self, values: Sequence[str]):
+        self.values = tuple(values)
+        self.size = len(self.values)
+
+    def random(self, rnd: random.Random) -> str:
+        return self.values[int(rnd.random() * self.size)]
+
+    def ordinal(self, k: int) -> str:
+        return self.values[k]
+
+
+class DateDomain(Domain):
+    def __init__(self, start: date, days: int, with_time: bool):
+        self.start = start.toordinal()
+        self.size = date.max.toordinal() - self.start + 1
+        self.days = [date.fromordinal(self.start + day).isoformat() for day in range(min(days, self.size))]
+        self.with_time = with_time
+
+    def random(self, rnd: random.Random) -> str:
+        text = self.days[int(rnd.random() * len(self.days))]
+        if self.with_time:
+            seconds = int(rnd.random() * 86_400)
+            text += f" {seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+        return text
+
+    def ordinal(self, k: int) -> str:
+        text = self.days[k] if k < len(self.days) else date.fromordinal(self.start + k).isoformat()
+        return text + " 00:00:00" if self.with_time else text
+
+
+class TimeDomain(Domain):
+    size = 86_400
+
+    def random(self, rnd: random.Random) -> str:
+        return self.ordinal(int(rnd.random() * 86_400))
+
+    def ordinal(self, k: int) -> str:
+        return f"{k // 3600:02d}:{k // 60 % 60:02d}:{k % 60:02d}"
+
+
+class GuidDomain(Domain):
+    def random(self, rnd: random.Random) -> str:
+        return str(uuid.UUID(int=rnd.getrandbits(128), version=4))
+
+    def ordinal(self, k: int) -> str:
+        # An odd multiplier is a bijection modulo 2**128, so distinct k give distinct GUIDs.
+        return str(uuid.UUID(int=((k + 1) * 0x9E3779B97F4A7C15F39CC0605CEDC835) % 2**128))
+
+
+class TextDomain(Domain):
+    """Strings of at most `length` characters, shaped by the column name (emails, phones, names, cities)."""
+
+    def __init__(self, column: str, length: int):
+        self.length = length
+        lowered = column.lower()
+        self.kind = next(
+            (kind for kind in ("email", "phone", "firstname", "lastname", "city", "code") if kind in lowered), "words"
+        )
+        # Distinct values carry the ordinal: user42@example.com, EN000042, or base 36 when that does not fit.
+        self.prefix = "user" if self.kind == "email" else "".join(char for char in column if char.isupper())[:3]
+        self.suffix = "@example.com" if self.kind == "email" else ""
+        digits = length - len(self.prefix) - len(self.suffix)
+        self.numbered = digits >= 6
+        self.size = 10**digits - 1 if self.numbered else 36**length
+
+    def random(self, rnd: random.Random) -> str:
+        kind, pick = self.kind, rnd.random
+        if kind == "email":
+            first = FIRST_NAMES[int(pick() * len(FIRST_NAMES))]
+            last = LAST_NAMES[int(pick() * len(LAST_NAMES))]
+            text = f"{first}.{last}{int(pick() * 1000)}@example.com".lower()
+        elif kind == "phone":
+            text = f"+1-555-{int(pick() * 1000):03d}-{int(pick() * 10_000):04d}"
+        elif kind == "firstname":
+            text = FIRST_NAMES[int(pick() * len(FIRST_NAMES))]
+        elif kind == "lastname":
+            text = LAST_NAMES[int(pick() * len(LAST_NAMES))]
+        elif kind == "city":
+            text = CITIES[int(pick() * len(CITIES))]
+        elif kind == "code" or self.length <= 3:
+            text = "".join(BASE36[10 + int(pick() * 26)] for _ in range(min(self.length, 8)))
+        else:
+            text = " ".join(WORDS[int(pick() * len(WORDS))] for _ in range(1 + int(pick() * 4))).capitalize()
+        return text[: self.length]
+
+    def ordinal(self, k: int) -> str:
+        if self.numbered:
+            return f"{self.prefix}{k + 1:06d}{self.suffix}"
+        text = ""
+        for _ in range(self.length):
+            k, digit = divmod(k, 36)
+            text = BASE36[digit] + text
+        return text
+
+
+def _type_parts(data_type: str) -> Tuple[str, List[str]]:
+    """`DECIMAL(10,2)` -> ("DECIMAL", ["10", "2"])."""
+    name, _, arguments = data_type.partition("(")
+    return name.upper(), [part.strip() for part in arguments.rstrip(")").split(",") if part.strip()]
+
+
+def column_domain(table: Table, column: Column, start: date, years: int) -> Domain:
+    """The domain of `column` under its type and the CHECK constraints on it."""
+    checks = table.checks_on(column.name)
+    for check in checks:
+        if check.values:
+            return ChoiceDomain(check.values)
+    minimum = max((check.minimum for check in checks if check.minimum is not None), default=None)
+    maximum = min((check.maximum for check in checks if check.maximum is not None), default=None)
+    exclusive_minimum = any(check.exclusive_minimum and check.minimum == minimum for check in checks)
+    exclusive_maximum = any(check.exclusive_maximum and check.maximum == maximum for check in checks)
+    type_name, arguments = _type_parts(column.data_type or "NVARCHAR(50)")
+
+    if type_name in INTEGER_RANGES:
+        low, high = INTEGER_RANGES[type_name]
+        random_low, random_high = RANDOM_INTEGER_RANGES[type_name]
+        # Keys count up from the identity seed, or from 0 rather than the type's minimum.
+        low = column.identity_seed if column.identity else max(low, 0)
+        for word, name_low, name_high in NAME_RANGES:
+            if column.name.lower().endswith(word):
+                random_low, random_high = name_low, name_high
+        if minimum is not None:
+            low = max(low, math.floor(minimum) + 1 if exclusive_minimum else math.ceil(minimum))
+        if maximum is not None:
+            high = min(high, math.ceil(maximum) - 1 if exclusive_maximum else math.floor(maximum))
+        return IntegerDomain(low, high, random_low, random_high)
+    if type_name == "BIT":
+        return IntegerDomain(0, 1)
+    if type_name in DECIMAL_TYPES:
+        scale = 4 if type_name in {"MONEY", "SMALLMONEY"} else 2
+        high = 100_000.0
+        if type_name in {"DECIMAL", "NUMERIC"} and arguments:
+            precision = int(arguments[0])
+            scale = int(arguments[1]) if len(arguments) > 1 else 0
+            # DECIMAL(5,4) holds rates and discounts, not amounts.
+            high = 1.0 if precision - scale <= 1 else min(high, 10.0 ** (precision - scale) - 1)
+        step = 10.0**-scale
+        low = 0.0
+        if minimum is not None:
+            low = minimum + (step if exclusive_minimum else 0.0)
+        if maximum is not None:
+            high = maximum - (step if exclusive_maximum else 0.0)
+        return DecimalDomain(low, high, scale)
+    if type_name == "DATE":
+        return DateDomain(start, 365 * years, with_time=False)
+    if type_name in DATETIME_TYPES:
+        return DateDomain(start, 365 * years, with_time=True)
+    if type_name == "TIME":
+        return TimeDomain()
+    if type_name == "UNIQUEIDENTIFIER":
+        return GuidDomain()
+    length = 100 if not arguments or arguments[0].upper() == "MAX" else int(arguments[0])
+    return TextDomain(column.name, length)
+
+
+@dataclass
+class Component:
+    """Columns that take their values together from one ordinal: a plain column or a foreign key."""
+
+    columns: Tuple[str, ...]  # lower-case names
+    values: Callable[[int], Tuple[str, ...]]
+    fixed_size: Optional[int] = None
+    parent: Optional["TablePlan"] = None  # a foreign key ranges over the parent's rows
+
+    @property
+    def size(self) -> Optional[int]:
+        return self.parent.rows if self.parent is not None else self.fixed_size
+
+
+@dataclass
+class KeyGroup:
+    """A PRIMARY KEY or UNIQUE column set; row `i` maps to a distinct combination of its components."""
+
+    components: List[Component]
+    radices: List[int] = field(default_factory=list)  # set by `spread`, one per component but the last
+
+    @property
+    def capacity(self) -> Optional[int]:
+        sizes = [component.size for component in self.components]
+        return None if None in sizes else math.prod(sizes)
+
+    def spread(self, rows: int) -> None:
+        """Pick the radices so `rows` rows vary every component, not just the first.
+
+        Each component but the last gets about sqrt(rows) values; one is only
+        widened, up to its size, when the last component could not take the rest.
+        """
+        last = len(self.components) - 1
+        cap = math.isqrt(max(rows - 1, 0)) + 1
+        radices = [min(component.size or cap, cap) for component in self.components[:last]]
+        last_size = self.components[last].size
+        if last_size is not None:
+            for index, component in enumerate(self.components[:last]):
+                held = math.prod(radices) * last_size
+                if held >= rows:
+                    break
+                others = held // radices[index]
+                radices[index] = min(component.size or cap, -(-rows // others))
+        self.radices = radices
+
+    def values(self, row: int) -> List[Tuple[str, ...]]:
+        """The mixed-radix digits of `row`; the last component takes whatever is left."""
+        values = []
+        last = len(self.components) - 1
+        for position, component in enumerate(self.components):
+            if position == last:
+                digit = row
+            else:
+                row, digit = divmod(row, self.radices[position])
+            values.append(component.values(digit))
+        return values
+
+
+@dataclass
+class TablePlan:
+    table: Table
+    rows: int
+    domains: Dict[str, Domain] = field(default_factory=dict)  # lower-case column -> domain
+    groups: List[KeyGroup] = field(default_factory=list)
+    keyed: Dict[str, Tuple[int, int, int]] = field(default_factory=dict)  # column -> group, component, position
+
+    @property
+    def columns(self) -> List[Column]:
+        """The columns the data file carries: all but the computed ones."""
+        return [column for column in self.table.columns.values() if not column.computed]
+
+    @property
+    def capacity(self) -> Optional[int]:
+        capacities = [group.capacity for group in self.groups if group.capacity is not None]
+        return min(capacities) if capacities else None
+
+    def key_value(self, column: str, row: int) -> str:
+        """The value keyed `column` has in row `row`; children call this to copy a parent's key."""
+        group_index, component_index, position = self.keyed[column]
+        return self.groups[group_index].values(row)[component_index][position]
+
+
+class GenerationError(ValueError):
+    """The schema or the requested row counts cannot be satisfied."""
+
+
+def with_parents(catalog: SchemaCatalog, names: Sequence[str]) -> List[Table]:
+    """The named tables plus every table they reference, directly or not, in catalog order."""
+    wanted = set()
+    pending: List[Table] = []
+    for name in names:
+        table = catalog.table(name)
+        if table is None:
+            raise GenerationError(f"Table {name} is not in the schema")
+        pending.append(table)
+    while pending:
+        table = pending.pop()
+        if table.key in wanted:
+            continue
+        wanted.add(table.key)
+        for foreign_key in table.foreign_keys:
+            parent = catalog.table(foreign_key.ref_table)
+            if parent is not None:
+                pending.append(parent)
+    return [table for table in catalog if table.key in wanted]
+
+
+def _nullable(table: Table, columns: Sequence[str]) -> bool:
+    return all(getattr(table.column(name), "nullable", True) for name in columns)
+
+
+def plan_tables(
+    tables: Sequence[Table], rows: Dict[str, int], start: date, years: int, warnings: List[str]
+) -> Dict[str, TablePlan]:
+    """A `TablePlan` per table, with row counts clamped to the distinct keys each table can hold."""
+    plans = {table.key: TablePlan(table, rows[table.key]) for table in tables}
+    referenced: Dict[str, List[Tuple[str, ...]]] = {}
+    for table in tables:
+        for foreign_key in table.foreign_keys:
+            if foreign_key.ref_columns:
+                referenced.setdefault(foreign_key.ref_table.lower(), []).append(foreign_key.ref_columns)
+
+    for plan in plans.values():
+        table = plan.table
+        plan.domains = {column.name.lower(): column_domain(table, column, start, years) for column in plan.columns}
+        # Referenced columns are keyed too, so a child can recompute any parent row's value.
+        key_sets = ([table.primary_key] if table.primary_key else []) + table.unique + referenced.get(table.key, [])
+        for key_set in key_sets:
+            _add_group(plans, plan, tuple(column.lower() for column in key_set))
+
+    changed = True
+    while changed:
+        changed = False
+        for plan in plans.values():
+            capacity = plan.capacity
+            if capacity is not None and plan.rows > capacity:
+                warnings.append(
+                    f"{plan.table.name}: its PRIMARY KEY/UNIQUE columns allow {capacity:,} distinct rows; "
+                    f"writing {capacity:,} instead of {plan.rows:,}"
+                )
+                plan.rows = capacity
+                changed = True
+
+    for plan in plans.values():
+        for foreign_key in plan.table.foreign_keys:
+            parent = plans.get(foreign_key.ref_table.lower())
+            if not plan.rows or _nullable(plan.table, foreign_key.columns) or parent is plan:
+                continue
+            if parent is None or not foreign_key.ref_columns:
+                raise GenerationError(
+                    f"{plan.table.name}.{', '.join(foreign_key.columns)} references {foreign_key.ref_table}, "
+                    "which is not in the schema"
+                )
+            if not parent.rows:
+                raise GenerationError(f"{plan.table.name} needs rows in {parent.table.name}")
+    for plan in plans.values():
+        for group in plan.groups:
+            group.spread(plan.rows)
+    return plans
+
+
+def _add_group(plans: Dict[str, TablePlan], plan: TablePlan, key_set: Tuple[str, ...]) -> None:
+    columns = [name for name in key_set if name in plan.domains]
+    if not columns or all(name in plan.keyed for name in columns):
+        return  # already distinct through an earlier key
+    components: List[Component] = []
+    covered = set()
+    for foreign_key in plan.table.foreign_keys:
+        fk_columns = tuple(column.lower() for column in foreign_key.columns)
+        parent = plans.get(foreign_key.ref_table.lower())
+        if parent is None or parent is plan or not foreign_key.ref_columns or not set(fk_columns) <= set(columns):
+            continue
+        ref_columns = [column.lower() for column in foreign_key.ref_columns]
+        components.append(
+            Component(
+                fk_columns,
+                lambda k, parent=parent, ref_columns=ref_columns: tuple(parent.key_value(c, k) for c in ref_columns),
+                parent=parent,
+            )
+        )
+        covered.update(fk_columns)
+    for name in columns:
+        if name not in covered:
+            domain = plan.domains[name]
+            components.append(Component((name,), lambda k, ordinal=domain.ordinal: (ordinal(k),), domain.size))
+    # Unbounded components go last, where they take the remainder of the row number.
+    components.sort(key=lambda component: component.fixed_size is None and component.parent is None)
+    group_index = len(plan.groups)
+    plan.groups.append(KeyGroup(components))
+    for component_index, component in enumerate(components):
+        for position, name in enumerate(component.columns):
+            plan.keyed.setdefault(name, (group_index, component_index, position))
+
+
+def row_writer(
+    plan: TablePlan, plans: Dict[str, TablePlan], rnd: random.Random, null_rate: float, skew: float
+) -> Callable[[int], List[str]]:
+    """A function from row number to the row's fields, in data-file order ("" is NULL)."""
+    table = plan.table
+    positions = {column.name.lower(): index for index, column in enumerate(plan.columns)}
+    width = len(positions)
+
+    group_fields: List[Tuple[KeyGroup, List[Tuple[int, int, int]]]] = []
+    for group_index, group in enumerate(plan.groups):
+        fields = [
+            (component_index, position, positions[name])
+            for component_index, component in enumerate(group.components)
+            for position, name in enumerate(component.columns)
+            if plan.keyed[name][0] == group_index
+        ]
+        group_fields.append((group, fields))
+
+    foreign_fields = []
+    for foreign_key in table.foreign_keys:
+        fk_columns = [column.lower() for column in foreign_key.columns]
+        if any(name in plan.keyed or name not in positions for name in fk_columns):
+            continue
+        parent = plans.get(foreign_key.ref_table.lower()) if foreign_key.ref_columns else None
+        ref_columns = [column.lower() for column in foreign_key.ref_columns]
+        # A nullable reference to a table that is not generated stays NULL.
+        foreign_fields.append(
+            ([positions[name] for name in fk_columns], ref_columns, parent, _nullable(table, foreign_key.columns))
+        )
+
+    nullable = [column.nullable and not column.primary_key for column in plan.columns]
+    taken = set(plan.keyed) | {name for name in positions if any(positions[name] in f[0] for f in foreign_fields)}
+    # PeriodYear/PeriodQuarter/PeriodMonth follow PeriodDate in the same row.
+    derived_fields = []
+    for name, index in positions.items():
+        for part in DATE_PARTS:
+            date_index = positions.get(name[: -len(part)] + "date")
+            if name not in taken and name.endswith(part) and date_index is not None:
+                derived_fields.append((index, date_index, part, plan.domains[name].random, nullable[index]))
+                taken.add(name)
+    plain_fields = [
+        (positions[name], domain.random, nullable[positions[name]])
+        for name, domain in plan.domains.items()
+        if name not in taken
+    ]
+
+    def fields_of(row: int) -> List[str]:
+        values = [""] * width
+        for group, fields in group_fields:
+            digits = group.values(row)
+            for component_index, position, index in fields:
+                values[index] = digits[component_index][position]
+        for indexes, ref_columns, parent, optional in foreign_fields:
+            if parent is None or (optional and rnd.random() < null_rate):
+                continue
+            if parent is plan:
+                # An earlier row, so the hierarchy has no cycles; its root has no parent (or itself).
+                if not row and optional:
+                    continue
+                parent_row = int(rnd.random() * row)
+            else:
+                parent_row = min(int(parent.rows * rnd.random() ** skew), parent.rows - 1)
+            for index, column in zip(indexes, ref_columns):
+                values[index] = parent.key_value(column, parent_row)
+        for index, draw, optional in plain_fields:
+            if optional and rnd.random() < null_rate:
+                continue
+            values[index] = draw(rnd)
+        for index, date_index, part, draw, optional in derived_fields:
+            text = values[date_index]
+            if text:
+                month = int(text[5:7])
+                values[index] = text[:4] if part == "year" else str(month if part == "month" else (month + 2) // 3)
+            elif not optional:
+                values[index] = draw(rnd)
+        return values
+
+    return fields_of
+
+
+def write_table(
+    plan: TablePlan,
+    plans: Dict[str, TablePlan],
+    data_path: Path,
+    seed: int,
+    null_rate: float,
+    skew: float,
+    delimiter: str,
+) -> None:
+    """Stream `plan.rows` rows to `data_path`, buffering at most `WRITE_BUFFER_ROWS` of them."""
+    rnd = random.Random(f"{seed}:{plan.table.key}")
+    fields_of = row_writer(plan, plans, rnd, null_rate, skew)
+    join = delimiter.join
+    buffer: List[str] = []
+    with data_path.open("w", encoding="utf-8", newline="") as handle:
+        for row in range(plan.rows):
+            buffer.append(join(fields_of(row)))
+            if len(buffer) >= WRITE_BUFFER_ROWS:
+                handle.write(ROW_TERMINATOR.join(buffer) + ROW_TERMINATOR)
+                buffer.clear()
+        if buffer:
+            handle.write(ROW_TERMINATOR.join(buffer) + ROW_TERMINATOR)
+
+
+def load_script(
+    plans: Dict[str, TablePlan], load_plan: LoadPlan, server_data_dir: Path, batch_size: int, seed: int
+) -> str:
+    ordered = [plans[name.lower()] for name in load_plan.load_order]
+    total = sum(plan.rows for plan in ordered)
+    lines = [
+        f"-- {total:,} synthetic rows in {len(ordered)} tables (synthetic_data.py --seed {seed})",
+        "-- Run against an empty copy of the schema: sqlcmd -S <server> -E -d <database> -i load_synthetic.sql",
+        "-- The tables of one wave only reference earlier waves; a loader may run each wave's inserts concurrently.",
+        "SET NOCOUNT ON;",
+        "",
+    ]
+    for dependency in load_plan.deferred:
+        lines.append(f"-- Deferred foreign key: {dependency.describe()} (checked after the load)")
+    for number, wave in enumerate(load_plan.waves, start=1):
+        lines += [f"-- Wave {number}: {', '.join(wave)}", ""]
+        for name in wave:
+            lines += _bulk_insert(plans[name.lower()], server_data_dir, batch_size)
+    # BULK INSERT skips FOREIGN KEY and CHECK constraints unless told otherwise, which leaves
+    # them untrusted; checking them once afterwards lets the optimizer rely on them again.
+    lines.append("PRINT 'Validating constraints...';")
+    lines += [f"ALTER TABLE dbo.{plan.table.name} WITH CHECK CHECK CONSTRAINT ALL;" for plan in ordered]
+    return "\n".join(lines) + "\n"
+
+
+def _bulk_insert(plan: TablePlan, server_data_dir: Path, batch_size: int) -> List[str]:
+    name = plan.table.name
+    options = [f"FORMATFILE = '{server_data_dir / f'{name}.fmt'}'", "CODEPAGE = '65001'"]
+    if any(column.identity for column in plan.columns):
+        options.append("KEEPIDENTITY")
+    options += ["KEEPNULLS", "TABLOCK", f"BATCHSIZE = {batch_size}"]
+    return [
+        f"PRINT 'Loading {plan.rows:,} rows into {name}...';",
+        f"BULK INSERT dbo.{name} FROM '{server_data_dir / f'{name}.csv'}'",
+        f"WITH ({', '.join(options)});",
+        "",
+    ]
+
+
+def _table_rows(text: str) -> Tuple[str, int]:
+    name, separator, count = text.partition("=")
+    try:
+        rows = int(count)
+    except ValueError:
+        rows = -1
+    if not separator or not name or rows < 0:
+        raise argparse.ArgumentTypeError(f"expected TABLE=ROWS, got {text!r}")
+    return name.strip(), rows
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Write referentially valid synthetic rows for the schema's tables as bulk-load files."
+    )
+    parser.add_argument(
+        "--schema",
+        nargs="+",
+        type=Path,
+        default=[MASTER_SQL],
+        help="Setup scripts defining the tables (default: tech company/00_TechCorp_MASTER_Setup.sql; "
+        "use lesotho/00_CBL_DataWarehouse_Setup.sql for the warehouse).",
+    )
+    parser.add_argument(
+        "--tables",
+        nargs="+",
+        metavar="TABLE",
+        help="Tables to generate; the tables they reference are added (default: every table).",
+    )
+    parser.add_argument("--rows", type=int, default=DEFAULT_ROWS, help=f"Rows per table (default: {DEFAULT_ROWS}).")
+    parser.add_argument(
+        "--table-rows",
+        type=_table_rows,
+        nargs="+",
+        action="extend",
+        default=[],
+        metavar="TABLE=ROWS",
+        help="Rows for particular tables, e.g. Orders=5_000_000 OrderDetails=20_000_000.",
+    )
+    parser.add_argument("--seed", type=int, default=2016, help="Random seed; the same seed gives the same files.")
+    parser.add_argument(
+        "--null-rate", type=float, default=0.1, help="Share of NULLs in nullable non-key columns (default: 0.1)."
+    )
+    parser.add_argument(
+        "--skew",
+        type=float,
+        default=1.0,
+        help="Foreign-key skew: 1 spreads child rows evenly over the parents, larger values "
+        "pile them onto the first parents (default: 1).",
+    )
+    parser.add_argument(
+        "--start-date",
+        type=date.fromisoformat,
+        default=date(2015, 1, 1),
+        help="First date of random DATE/DATETIME values and of dates in keys (default: 2015-01-01).",
+    )
+    parser.add_argument("--years", type=int, default=10, help="Years random dates span (default: 10).")
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=DEFAULT_OUTPUT,
+        help="Directory for the data files and load_synthetic.sql (default: tech company/bulk_load/synthetic).",
+    )
+    parser.add_argument("--delimiter", default="|", help="Field terminator of the data files (default: '|').")
+    parser.add_argument(
+        "--server-data-dir",
+        type=Path,
+        help="Path of --output as the SQL Server machine sees it, for BULK INSERT (default: the local path).",
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=100_000, help="Rows per BULK INSERT batch (default: 100000)."
+    )
+    args = parser.parse_args()
+    if args.rows < 0:
+        parser.error("--rows cannot be negative")
+    if not 0 <= args.null_rate <= 1:
+        parser.error("--null-rate must be between 0 and 1")
+    if args.skew <= 0:
+        parser.error("--skew must be positive")
+    if args.years < 1 or args.batch_size < 1:
+        parser.error("--years and --batch-size must be positive")
+    if not args.delimiter or any(char in args.delimiter for char in "\r\n"):
+        parser.error("--delimiter must be non-empty and on one line")
+    return args
+
+
+def main() -> int:
+    args = parse_args()
+    catalog = load_catalog(args.schema)
+    print(f"Loaded {len(catalog)} tables from {', '.join(str(display_path(source)) for source in args.schema)}")
+
+    try:
+        tables = with_parents(catalog, args.tables) if args.tables else list(catalog)
+        rows = {table.key: args.rows for table in tables}
+        for name, count in args.table_rows:
+            table = catalog.table(name)
+            if table is None or table.key not in rows:
+                raise GenerationError(f"--table-rows: {name} is not one of the tables being generated")
+            rows[table.key] = count
+        warnings: List[str] = []
+        plans = plan_tables(tables, rows, args.start_date, args.years, warnings)
+    except GenerationError as exc:
+        print(f"❌ {exc}")
+        return 1
+    for warning in warnings:
+        print(f"⚠️  {warning}")
+
+    output_dir: Path = args.output
+    output_dir.mkdir(parents=True, exist_ok=True)
+    server_data_dir = args.server_data_dir or output_dir.resolve()
+    load_plan = plan_loads(ForeignKeyGraph(tables))
+    ordered = [plans[name.lower()] for name in load_plan.load_order]
+    started = time.perf_counter()
+    for plan in ordered:
+        table_started = time.perf_counter()
+        columns = [column.name for column in plan.columns]
+        write_table(
+            plan, plans, output_dir / f"{plan.table.name}.csv", args.seed, args.null_rate, args.skew, args.delimiter
+        )
+        (output_dir / f"{plan.table.name}.fmt").write_text(
+            format_file(columns, plan.table.column_names, args.delimiter), encoding="utf-8"
+        )
+        seconds = time.perf_counter() - table_started
+        rate = f"{plan.rows / seconds:,.0f} rows/s" if seconds else "-"
+        print(f"  {plan.table.name}: {plan.rows:,} rows in {seconds:.1f}s ({rate})")
+
+    (output_dir / LOAD_SCRIPT).write_text(
+        load_script(plans, load_plan, server_data_dir, args.batch_size, args.seed), encoding="utf-8"
+    )
+    manifest = {
+        "schema": [str(display_path(source)) for source in args.schema],
+        "catalog_fingerprint": catalog.fingerprint,
+        "seed": args.seed,
+        "null_rate": args.null_rate,
+        "skew": args.skew,
+        "start_date": args.start_date.isoformat(),
+        "years": args.years,
+        "rows": {plan.table.name: plan.rows for plan in ordered},
+        "load_plan": load_plan.to_json(),
+    }
+    (output_dir / MANIFEST).write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    total = sum(plan.rows for plan in ordered)
+    print(
+        f"Wrote {total:,} rows in {time.perf_counter() - started:.1f}s to {display_path(output_dir)} "
+        f"(load with {LOAD_SCRIPT})"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,23 @@
+"""Throughput benchmarks for the column tools.
+
+    python -m benchmarks generate --files 1000 --out /tmp/corpus
+    python -m benchmarks run --files 1000 --label "before lexer change"
+    python -m benchmarks compare
+
+Run from `tech company/untitled` (or with it on PYTHONPATH). `generate`
+writes a synthetic lab corpus built from the schema (see `corpus`), `run`
+times every stage of the validator, the fixer and fix_customer_columns.py
+on such a corpus in a fresh process per tool (see `measure`) and appends
+the numbers to a JSON Lines results file tagged with the current commit,
+and `compare` lines two recorded runs up side by side.
+"""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+# The tools are plain modules next to this package, as they are for each other.
+LABS_DIR = Path(__file__).resolve().parent.parent
+if str(LABS_DIR) not in sys.path:
+    sys.path.insert(0, str(LABS_DIR))
@@ -0,0 +1,227 @@
+"""Command line for the benchmarks; see the package docstring for an overview."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from benchmarks import LABS_DIR
+from benchmarks.corpus import MANIFEST_NAME, CorpusSpec, generate_corpus, read_manifest
+from benchmarks.measure import REPO_ROOT, TOOLS
+from rename_rules import load_rules
+from schema_catalog import load_catalog
+
+DEFAULT_RESULTS = LABS_DIR / "benchmarks" / "results.jsonl"
+SIZES = (100, 1_000, 10_000, 100_000)
+
+
+def _add_spec_arguments(parser: argparse.ArgumentParser) -> None:
+    defaults = CorpusSpec()
+    parser.add_argument("--files", type=int, default=defaults.files, help=f"Lessons to generate (e.g. {SIZES})")
+    parser.add_argument("--blocks-per-file", type=int, default=defaults.blocks_per_file)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--alias-rate", type=float, default=defaults.alias_rate, help="Share of aliased queries")
+    parser.add_argument("--typo-rate", type=float, default=defaults.typo_rate, help="Share of misspelt columns")
+    parser.add_argument("--comment-rate", type=float, default=defaults.comment_rate, help="Share of commented queries")
+    parser.add_argument(
+        "--rewrite-rate", type=float, default=defaults.rewrite_rate, help="Share of queries using legacy Customers columns"
+    )
+
+
+def _spec(args: argparse.Namespace) -> CorpusSpec:
+    return CorpusSpec(
+        files=args.files,
+        blocks_per_file=args.blocks_per_file,
+        seed=args.seed,
+        alias_rate=args.alias_rate,
+        typo_rate=args.typo_rate,
+        comment_rate=args.comment_rate,
+        rewrite_rate=args.rewrite_rate,
+    )
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Benchmark the column tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    generate = commands.add_parser("generate", help="Write a synthetic lab corpus")
+    generate.add_argument("--out", type=Path, required=True, help="Directory to write the corpus to")
+    _add_spec_arguments(generate)
+
+    run = commands.add_parser("run", help="Time every tool over a corpus and record the results")
+    run.add_argument("--corpus", type=Path, help="Existing corpus; generated into a temporary directory otherwise")
+    _add_spec_arguments(run)
+    run.add_argument("--tools", nargs="+", choices=TOOLS, default=list(TOOLS))
+    run.add_argument("--jobs", type=int, default=1, help="Worker processes each tool may use")
+    run.add_argument("--repeat", type=int, default=3, help="Runs per tool; the fastest is recorded")
+    run.add_argument("--results", type=Path, default=DEFAULT_RESULTS, help="JSON Lines file to append to")
+    run.add_argument("--label", default="", help="Free-form note stored with the record")
+
+    compare = commands.add_parser("compare", help="Compare two recorded runs")
+    compare.add_argument("commits", nargs="*", help="Commit prefixes of the runs to compare (default: the last two)")
+    compare.add_argument("--results", type=Path, default=DEFAULT_RESULTS)
+    return parser.parse_args()
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        completed = subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=str(REPO_ROOT), capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=str(REPO_ROOT),
+                           capture_output=True, text=True).stdout.strip()
+    return completed.stdout.strip() + ("-dirty" if dirty else "")
+
+
+def _generate(out_dir: Path, spec: CorpusSpec) -> Dict[str, object]:
+    catalog = load_catalog([LABS_DIR / "Results.json"])
+    stats = generate_corpus(out_dir, spec, catalog, load_rules())
+    return vars(stats)
+
+
+def _measure_once(tool: str, corpus: Path, jobs: int) -> Dict[str, object]:
+    completed = subprocess.run(
+        [sys.executable, "-m", "benchmarks.measure", tool, str(corpus), "--jobs", str(jobs)],
+        cwd=str(LABS_DIR),
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode != 0:
+        raise SystemExit(f"❌ {tool} failed:\n{completed.stderr}")
+    # The tools may print progress of their own; the measurement is the last line.
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def run_benchmarks(args: argparse.Namespace) -> int:
+    with tempfile.TemporaryDirectory() as scratch:
+        corpus = args.corpus
+        if corpus is None:
+            corpus = Path(scratch) / "corpus"
+            print(f"Generating {args.files} lessons...")
+            _generate(corpus, _spec(args))
+        elif not (corpus / MANIFEST_NAME).is_file():
+            raise SystemExit(f"❌ {corpus} has no {MANIFEST_NAME}; create it with `python -m benchmarks generate`")
+        manifest = read_manifest(corpus)
+
+        measurements: List[Dict[str, object]] = []
+        for tool in args.tools:
+            runs = [_measure_once(tool, corpus, args.jobs) for _ in range(max(1, args.repeat))]
+            best = min(runs, key=lambda run: run["total_seconds"])
+            measurements.append(best)
+            print(_format_measurement(best))
+
+    record = {
+        "commit": _git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "label": args.label,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "corpus": manifest,
+        "tools": measurements,
+    }
+    args.results.parent.mkdir(parents=True, exist_ok=True)
+    with args.results.open("a", encoding="utf-8") as handle:
+        handle.write(json.dumps(record) + "\n")
+    print(f"Results appended to {args.results}")
+    return 0
+
+
+def _format_measurement(measurement: Dict[str, object]) -> str:
+    stages = ", ".join(f"{name} {seconds:.3f}s" for name, seconds in measurement["stages"].items())
+    rss = measurement["peak_rss_mb"]["self"]
+    return (
+        f"{measurement['tool']:<22} {measurement['total_seconds']:8.3f}s  "
+        f"{measurement['files_per_sec']:>10} files/s  {measurement['references_per_sec']:>11} refs/s  "
+        f"peak {rss} MiB  ({stages})"
+    )
+
+
+def _read_records(path: Path) -> List[Dict[str, object]]:
+    if not path.is_file():
+        raise SystemExit(f"❌ No results recorded yet in {path}")
+    with path.open("r", encoding="utf-8") as handle:
+        return [json.loads(line) for line in handle if line.strip()]
+
+
+def _pick(records: List[Dict[str, object]], prefix: str) -> Dict[str, object]:
+    matches = [record for record in records if (record.get("commit") or "").startswith(prefix)]
+    if not matches:
+        raise SystemExit(f"❌ No recorded run for commit {prefix}")
+    return matches[-1]
+
+
+def _change(before: Optional[float], after: Optional[float]) -> str:
+    if not before or after is None:
+        return "n/a"
+    return f"{(after - before) / before * 100:+.1f}%"
+
+
+def compare_runs(args: argparse.Namespace) -> int:
+    records = _read_records(args.results)
+    if args.commits:
+        if len(args.commits) != 2:
+            raise SystemExit("❌ compare takes exactly two commits (or none for the last two runs)")
+        old, new = (_pick(records, prefix) for prefix in args.commits)
+    elif len(records) >= 2:
+        old, new = records[-2], records[-1]
+    else:
+        raise SystemExit("❌ compare needs at least two recorded runs")
+
+    for record in (old, new):
+        stats = record["corpus"]["stats"]
+        print(
+            f"{(record['commit'] or 'unknown')[:12]:<14} {record['timestamp']}  {stats['files']} files, "
+            f"{stats['references']} refs  {record['label']}"
+        )
+    if old["corpus"]["spec"] != new["corpus"]["spec"]:
+        print("⚠️  The runs used different corpora; throughput is comparable, totals are not.")
+    print()
+    print(f"{'tool':<22} {'metric':<18} {'before':>12} {'after':>12} {'change':>9}")
+    old_tools = {measurement["tool"]: measurement for measurement in old["tools"]}
+    for measurement in new["tools"]:
+        before = old_tools.get(measurement["tool"])
+        if before is None:
+            continue
+        rows = [("total seconds", before["total_seconds"], measurement["total_seconds"])]
+        rows += [
+            (f"{stage} seconds", before["stages"].get(stage), seconds) for stage, seconds in measurement["stages"].items()
+        ]
+        rows += [
+            ("files/sec", before["files_per_sec"], measurement["files_per_sec"]),
+            ("references/sec", before["references_per_sec"], measurement["references_per_sec"]),
+            ("peak RSS MiB", before["peak_rss_mb"]["self"], measurement["peak_rss_mb"]["self"]),
+        ]
+        for metric, old_value, new_value in rows:
+            print(
+                f"{measurement['tool']:<22} {metric:<18} {str(old_value):>12} {str(new_value):>12} "
+                f"{_change(old_value, new_value):>9}"
+            )
+    return 0
+
+
+def main() -> int:
+    args = parse_args()
+    if args.command == "generate":
+        stats = _generate(args.out, _spec(args))
+        print(
+            f"Wrote {stats['files']} lessons ({stats['blocks']} SQL blocks, {stats['references']} qualified references, "
+            f"{stats['typos']} typos, {stats['rewrites']} legacy columns) to {args.out}"
+        )
+        return 0
+    if args.command == "run":
+        return run_benchmarks(args)
+    return compare_runs(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,182 @@
+"""Synthetic markdown lab corpora for the benchmarks.
+
+`generate_corpus` writes `files` lessons shaped like the real ones: prose,
+headings, the odd non-SQL fence, and SQL fences whose queries select, join
+and filter real schema tables. The densities that drive the tools' hot
+paths are parameters:
+
+* `alias_rate` - share of queries that alias their tables (`FROM Employees e`);
+  the rest qualify with the table name or, for one-table queries, not at all;
+* `typo_rate` - share of column references misspelt (fuzzy-match work);
+* `comment_rate` - share of queries carrying line/block comments, some of
+  which contain column-like text the lexer has to skip;
+* `rewrite_rate` - share of queries reading legacy Customers (or other
+  column_renames.json) columns that fix_customer_columns.py rewrites.
+
+Everything comes from one seeded `random.Random`, so the same arguments
+always produce byte-identical corpora. A `manifest.json` next to the
+lessons records the arguments and what was generated (files, blocks,
+qualified references), which the benchmark uses for references/sec.
+"""
+
+from __future__ import annotations
+
+import json
+import random
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from rename_rules import RenameRules
+from schema_catalog import SchemaCatalog
+
+MANIFEST_NAME = "manifest.json"
+FILES_PER_MODULE = 100
+
+_WORDS = (
+    "query table column join filter result row employee department project report total "
+    "average group order index schema value select where lesson example note practice data"
+).split()
+_FILTERS = ("IS NOT NULL", "> 0", "= 1", "LIKE 'A%'", "<> ''")
+
+
+@dataclass
+class CorpusSpec:
+    files: int = 100
+    blocks_per_file: int = 6
+    seed: int = 2016
+    alias_rate: float = 0.6
+    typo_rate: float = 0.05
+    comment_rate: float = 0.2
+    rewrite_rate: float = 0.1
+
+
+@dataclass
+class CorpusStats:
+    files: int = 0
+    blocks: int = 0
+    references: int = 0  # qualified table.column / alias.column references written
+    typos: int = 0
+    rewrites: int = 0
+    bytes: int = 0
+
+
+class _Writer:
+    """Builds lessons from one RNG; the schema is flattened into lists once."""
+
+    def __init__(self, spec: CorpusSpec, catalog: SchemaCatalog, rules: RenameRules):
+        self.spec = spec
+        self.random = random.Random(spec.seed)
+        self.stats = CorpusStats()
+        self.tables: List[Tuple[str, List[str]]] = [
+            (table.name, table.column_names) for table in catalog if len(table.columns) >= 2
+        ]
+        # Join on shared *ID columns, the way the lessons do.
+        self.joins: List[Tuple[int, int, str]] = []
+        for left, (_, left_columns) in enumerate(self.tables):
+            for right, (_, right_columns) in enumerate(self.tables):
+                if left == right:
+                    continue
+                shared = [column for column in left_columns if column.endswith("ID") and column in right_columns]
+                if shared:
+                    self.joins.append((left, right, shared[0]))
+        self.legacy: List[Tuple[str, str]] = [(rule.table, rule.old) for rule in rules.rules]
+
+    def _typo(self, name: str) -> str:
+        if len(name) < 4:
+            return name + "x"
+        index = self.random.randrange(1, len(name) - 1)
+        if self.random.random() < 0.5:
+            return name[:index] + name[index + 1 :]  # dropped letter
+        return name[:index] + name[index + 1] + name[index] + name[index + 2 :]  # swapped letters
+
+    def _column(self, qualifier: Optional[str], columns: Sequence[str]) -> str:
+        name = self.random.choice(columns)
+        if self.random.random() < self.spec.typo_rate:
+            name = self._typo(name)
+            self.stats.typos += 1
+        if qualifier is None:
+            return name
+        self.stats.references += 1
+        return f"{qualifier}.{name}"
+
+    def _query(self) -> str:
+        spec, rnd = self.spec, self.random
+        aliased = rnd.random() < spec.alias_rate
+        if self.legacy and rnd.random() < spec.rewrite_rate:
+            table_name, old = rnd.choice(self.legacy)
+            qualifier = table_name[0].lower() if aliased else None
+            self.stats.rewrites += 1
+            if qualifier:
+                self.stats.references += 1
+            source = f"{table_name} {qualifier}" if qualifier else table_name
+            select = f"{qualifier}.{old}" if qualifier else old
+            return f"SELECT {select}\nFROM {source};"
+
+        if self.joins and rnd.random() < 0.5:
+            left, right, key = rnd.choice(self.joins)
+            (left_name, left_columns), (right_name, right_columns) = self.tables[left], self.tables[right]
+            left_q, right_q = ("a", "b") if aliased else (left_name, right_name)
+            columns = [self._column(left_q, left_columns) for _ in range(rnd.randint(1, 3))]
+            columns += [self._column(right_q, right_columns) for _ in range(rnd.randint(1, 3))]
+            self.stats.references += 2  # the join keys
+            from_clause = f"FROM {left_name} a\nINNER JOIN {right_name} b" if aliased else (
+                f"FROM {left_name}\nINNER JOIN {right_name}"
+            )
+            where = f"\nWHERE {self._column(left_q, left_columns)} {rnd.choice(_FILTERS)}" if rnd.random() < 0.5 else ""
+            sql = (
+                f"SELECT {', '.join(columns)}\n{from_clause} ON {left_q}.{key} = {right_q}.{key}{where}\n"
+                f"ORDER BY {self._column(left_q, left_columns)};"
+            )
+        else:
+            table_name, table_columns = rnd.choice(self.tables)
+            style = rnd.random()
+            qualifier = "t" if aliased else (table_name if style < 0.5 else None)
+            source = f"{table_name} t" if aliased else table_name
+            columns = [self._column(qualifier, table_columns) for _ in range(rnd.randint(2, 5))]
+            where = f"\nWHERE {self._column(qualifier, table_columns)} {rnd.choice(_FILTERS)}" if rnd.random() < 0.6 else ""
+            sql = f"SELECT {', '.join(columns)}\nFROM {source}{where};"
+
+        if rnd.random() < spec.comment_rate:
+            table_name, table_columns = rnd.choice(self.tables)
+            hidden = f"{table_name}.{rnd.choice(table_columns)}"
+            if rnd.random() < 0.5:
+                sql = f"-- {self._prose(4)} ({hidden})\n{sql}"
+            else:
+                sql = f"/* {self._prose(6)}\n   {hidden} */\n{sql}"
+        return sql
+
+    def _prose(self, words: int) -> str:
+        return " ".join(self.random.choice(_WORDS) for _ in range(words))
+
+    def lesson(self, number: int) -> str:
+        parts = [f"# Lesson {number}: {self._prose(3).title()}", ""]
+        for block in range(self.spec.blocks_per_file):
+            parts += [f"## Step {block + 1}", "", self._prose(self.random.randint(12, 40)).capitalize() + ".", ""]
+            if self.random.random() < 0.1:
+                parts += ["```powershell", f"Invoke-Sqlcmd -Query \"SELECT 1\" # {self._prose(3)}", "```", ""]
+            parts += ["```sql", self._query(), "```", ""]
+            self.stats.blocks += 1
+        return "\n".join(parts)
+
+
+def generate_corpus(
+    out_dir: Path, spec: CorpusSpec, catalog: SchemaCatalog, rules: RenameRules = RenameRules()
+) -> CorpusStats:
+    """Write `spec.files` lessons under `out_dir` (100 per module directory) plus the manifest."""
+    writer = _Writer(spec, catalog, rules)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for number in range(1, spec.files + 1):
+        module = out_dir / f"Module {(number - 1) // FILES_PER_MODULE + 1:04d}"
+        module.mkdir(exist_ok=True)
+        text = writer.lesson(number)
+        (module / f"Lesson{number:06d}.md").write_text(text, encoding="utf-8")
+        writer.stats.files += 1
+        writer.stats.bytes += len(text.encode("utf-8"))
+    manifest = {"spec": asdict(spec), "stats": asdict(writer.stats)}
+    (out_dir / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    return writer.stats
+
+
+def read_manifest(corpus_dir: Path) -> Dict[str, Dict[str, object]]:
+    return json.loads((corpus_dir / MANIFEST_NAME).read_text(encoding="utf-8"))
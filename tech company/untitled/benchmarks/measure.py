@@ -0,0 +1,163 @@
+"""Stage timings for one tool over one corpus, in a process of its own.
+
+    python -m benchmarks.measure validator /tmp/corpus --jobs 2
+
+prints one JSON object: wall seconds per stage, the throughput the corpus
+manifest makes possible (files/sec, references/sec), and peak RSS. Each
+tool is driven through the same entry points its `main` uses, in dry-run /
+report mode with caches and the usage index off, so a run measures the
+real work and never writes to the corpus:
+
+* `schema`   - loading the schema (and rename rules);
+* `discover` - globbing the corpus;
+* `scan`     - lexing, resolving and checking every file, including the
+  per-file report sections each tool streams while it goes;
+* `report`   - assembling and writing the final report.
+
+A fresh interpreter per tool keeps one tool's imports, caches and peak
+memory out of the next one's numbers; `benchmarks.__main__` spawns them.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+from benchmarks import LABS_DIR
+from benchmarks.corpus import read_manifest
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+REPO_ROOT = LABS_DIR.parent.parent
+TOOLS = ("validator", "fixer", "fix_customer_columns")
+PATTERN = "**/*.md"
+
+
+class StageTimer:
+    def __init__(self):
+        self.seconds: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[name] = self.seconds.get(name, 0.0) + time.perf_counter() - started
+
+
+def peak_rss_mb() -> Dict[str, Optional[float]]:
+    """Peak resident set size of this process and of its largest finished worker, in MiB."""
+    if resource is None:
+        return {"self": None, "workers": None}
+    # ru_maxrss is KiB on Linux, bytes on macOS.
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+    workers = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale
+    return {"self": round(own, 1), "workers": round(workers, 1) if workers else None}
+
+
+def _discover(corpus: Path) -> List[Path]:
+    return sorted(corpus.glob(PATTERN), key=str)
+
+
+def measure_validator(corpus: Path, out_dir: Path, jobs: int, timer: StageTimer) -> None:
+    from validate_column_references import ColumnReferenceValidator, ValidationReport
+
+    with timer.stage("schema"):
+        validator = ColumnReferenceValidator(str(LABS_DIR / "Results.json"))
+    with timer.stage("discover"):
+        files = _discover(corpus)
+    report = ValidationReport()
+    with timer.stage("scan"):
+        results = validator.validate_directory(str(corpus), PATTERN, jobs=jobs, report=report, files=files)
+    with timer.stage("report"):
+        report.save(str(out_dir / "validation_report.md"), results)
+
+
+def measure_fixer(corpus: Path, out_dir: Path, jobs: int, timer: StageTimer) -> None:
+    from fix_column_references import ColumnReferenceFixer, FixReport
+
+    with timer.stage("schema"):
+        fixer = ColumnReferenceFixer(LABS_DIR / "Results.json", dry_run=True)
+    with timer.stage("discover"):
+        files = _discover(corpus)
+    report = FixReport(out_dir / "fix_report.md")
+    with timer.stage("scan"):
+        fixer.run(corpus, PATTERN, jobs=jobs, report=report, files=files)
+    with timer.stage("report"):
+        report.close(fixer)
+
+
+def measure_fix_customer_columns(corpus: Path, out_dir: Path, jobs: int, timer: StageTimer) -> None:
+    if str(REPO_ROOT) not in sys.path:
+        sys.path.insert(0, str(REPO_ROOT))
+    import fix_customer_columns as fcc
+
+    with timer.stage("schema"):
+        schema = fcc.parse_master_sql(fcc.MASTER_SQL)
+        rules = fcc.load_rules(fcc.DEFAULT_RULES_PATH)
+    with timer.stage("discover"):
+        files = sorted(corpus.rglob("*.md"))
+
+    # The report consumes the scan lazily, as in main(); the scan ends when the rows run out.
+    finished: Dict[str, float] = {}
+
+    def rows() -> Iterator["fcc.BlockReport"]:
+        for _, _, file_rows in fcc.scan_labs(files, schema, rules, "report", jobs, None):
+            yield from file_rows
+        finished["scan"] = time.perf_counter()
+
+    started = time.perf_counter()
+    fcc.write_validation_report(rows(), out_dir / "validation_report.md")
+    ended = time.perf_counter()
+    timer.seconds["scan"] = finished["scan"] - started
+    timer.seconds["report"] = ended - finished["scan"]
+
+
+MEASURES: Dict[str, Callable[[Path, Path, int, StageTimer], None]] = {
+    "validator": measure_validator,
+    "fixer": measure_fixer,
+    "fix_customer_columns": measure_fix_customer_columns,
+}
+
+
+def measure(tool: str, corpus: Path, jobs: int = 1) -> Dict[str, object]:
+    stats = read_manifest(corpus)["stats"]
+    timer = StageTimer()
+    with tempfile.TemporaryDirectory() as out_dir:
+        MEASURES[tool](corpus, Path(out_dir), jobs, timer)
+    total = sum(timer.seconds.values())
+    scan = timer.seconds.get("scan") or total
+    return {
+        "tool": tool,
+        "jobs": jobs,
+        "stages": {name: round(seconds, 4) for name, seconds in timer.seconds.items()},
+        "total_seconds": round(total, 4),
+        "files_per_sec": round(stats["files"] / scan, 1) if scan else None,
+        "references_per_sec": round(stats["references"] / scan, 1) if scan else None,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Time one column tool over a benchmark corpus")
+    parser.add_argument("tool", choices=TOOLS)
+    parser.add_argument("corpus", type=Path, help="Directory written by `python -m benchmarks generate`")
+    parser.add_argument("--jobs", type=int, default=1, help="Worker processes for the scan stage")
+    args = parser.parse_args()
+    print(json.dumps(measure(args.tool, args.corpus, args.jobs)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+"""Language server for column diagnostics in the markdown labs.
+
+Speaks the Language Server Protocol over stdio, so any LSP-capable editor
+can show the validator's findings while a lesson is being written:
+
+    python "tech company/untitled/column_lsp.py" --schema "tech company/untitled/Results.json"
+
+For every SQL fence of an open markdown document the server publishes the
+issues `ColumnReferenceValidator.validate_sql_block` reports (COL001 unknown
+table, COL002 unknown column, COL008-COL014 predicates that convert a
+column or cannot seek an index, COL015 redundant casts) as diagnostics, and offers a quick fix for
+an unknown column where the batch tools would make one: a column_renames.json rule (the Customers
+rewrites and other renames) or the fixer's fuzzy match from
+`SchemaIndex.canonicalize`.
+
+Edits arrive incrementally and are applied to the server's copy of the
+document; analysis waits until typing pauses for `--debounce` milliseconds.
+Results are memoized per fence body, so after an edit only the fence whose
+text changed is tokenized and validated again; every other fence reuses its
+diagnostics, shifted to wherever the fence now starts.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Optional, Tuple
+
+from findings import RULES_BY_ID, UNKNOWN_COLUMN, UNKNOWN_TABLE
+from fix_column_references import SchemaIndex, format_identifier, normalize_identifier
+from line_index import LineIndex
+from md_fences import SQL_LANGS, iter_fences
+from rename_rules import DEFAULT_RULES_PATH, RenameRules, load_rules
+from validate_column_references import ColumnReferenceValidator
+
+_HERE = Path(__file__).resolve().parent
+DEFAULT_SCHEMA = _HERE / "Results.json"
+SERVER_NAME = "column-tools"
+
+# LSP constants.
+SYNC_INCREMENTAL = 2
+SEVERITY = {"error": 1, "warning": 2, "note": 3}
+# Rules whose reference the rename rules or the fuzzy match can replace.
+FIXABLE = {UNKNOWN_TABLE.id, UNKNOWN_COLUMN.id}
+METHOD_NOT_FOUND = -32601
+INTERNAL_ERROR = -32603
+
+Position = Dict[str, int]
+Range = Dict[str, Position]
+
+
+class BlockIssue:
+    """One validator issue inside a fence body, positioned relative to the body."""
+
+    __slots__ = ("line", "start", "end", "rule", "message", "fix")
+
+    def __init__(self, line: int, start: int, end: int, rule: str, message: str, fix: Optional[Tuple[str, str]]):
+        self.line = line  # 0-based line within the body
+        self.start = start  # UTF-16 columns of the reference on that line
+        self.end = end
+        self.rule = rule
+        self.message = message
+        self.fix = fix  # (title, replacement text for the whole reference)
+
+
+def _utf16_len(text: str) -> int:
+    return len(text.encode("utf-16-le")) // 2
+
+
+def _utf16_to_index(line: str, character: int) -> int:
+    """Convert an LSP character offset (UTF-16 code units) to a str index within `line`."""
+    if line.isascii():
+        return min(character, len(line))
+    units = 0
+    for index, char in enumerate(line):
+        if units >= character:
+            return index
+        units += 2 if ord(char) > 0xFFFF else 1
+    return len(line)
+
+
+class Document:
+    __slots__ = ("uri", "text", "version", "blocks", "diagnostics", "due")
+
+    def __init__(self, uri: str, text: str, version: Optional[int]):
+        self.uri = uri
+        self.text = text
+        self.version = version
+        self.blocks: Dict[str, List[BlockIssue]] = {}  # fence body -> its issues
+        self.diagnostics: List[Tuple[Range, BlockIssue]] = []
+        self.due: Optional[float] = None  # monotonic time the debounced analysis runs
+
+    def apply(self, change: Dict[str, object]) -> None:
+        change_range = change.get("range")
+        if change_range is None:
+            self.text = change["text"]
+            return
+        lines = LineIndex(self.text)
+        start = self._index(lines, change_range["start"])
+        end = self._index(lines, change_range["end"])
+        self.text = self.text[:start] + change["text"] + self.text[end:]
+
+    def _index(self, lines: LineIndex, position: Position) -> int:
+        line = position["line"]
+        if line >= len(lines):
+            return len(self.text)
+        return lines.starts[line] + _utf16_to_index(lines.line_text(line), position["character"])
+
+
+class ColumnLanguageServer:
+    """JSON-RPC message handling and the debounced analysis loop."""
+
+    def __init__(self, schema_path: Path, rules: RenameRules, debounce: float, output: BinaryIO):
+        self.validator = ColumnReferenceValidator(str(schema_path))
+        self.schema = SchemaIndex(schema_path)
+        self.rules = rules
+        self.debounce = debounce
+        self.output = output
+        self.documents: Dict[str, Document] = {}
+        self.shutdown_requested = False
+
+    def send(self, message: Dict[str, object]) -> None:
+        body = json.dumps({"jsonrpc": "2.0", **message}, ensure_ascii=False).encode("utf-8")
+        self.output.write(f"Content-Length: {len(body)}\r\n\r\n".encode("ascii") + body)
+        self.output.flush()
+
+    def serve(self, stream: BinaryIO) -> int:
+        """Handle messages until `exit`; returns the process exit code."""
+        inbox: "queue.Queue[Optional[Dict[str, object]]]" = queue.Queue()
+        threading.Thread(target=_read_messages, args=(stream, inbox), daemon=True).start()
+        while True:
+            due = [doc.due for doc in self.documents.values() if doc.due is not None]
+            timeout = max(0.0, min(due) - time.monotonic()) if due else None
+            try:
+                message = inbox.get(timeout=timeout)
+            except queue.Empty:
+                self._analyse_due()
+                continue
+            if message is None:  # stdin closed
+                return 0 if self.shutdown_requested else 1
+            if message.get("method") == "exit":
+                return 0 if self.shutdown_requested else 1
+            self.dispatch(message)
+
+    def dispatch(self, message: Dict[str, object]) -> None:
+        method = message.get("method")
+        params = message.get("params") or {}
+        handler = getattr(self, "on_" + str(method).replace("/", "_").replace("$", "_"), None)
+        is_request = "id" in message
+        if handler is None:
+            if is_request:
+                self.send({"id": message["id"], "error": {"code": METHOD_NOT_FOUND, "message": f"{method}"}})
+            return
+        try:
+            result = handler(params)
+        except Exception as exc:  # one bad message must not take the editor's diagnostics down
+            print(f"{method} failed: {exc!r}", file=sys.stderr)
+            if is_request:
+                self.send({"id": message["id"], "error": {"code": INTERNAL_ERROR, "message": str(exc)}})
+            return
+        if is_request:
+            self.send({"id": message["id"], "result": result})
+
+    def on_initialize(self, params: Dict[str, object]) -> Dict[str, object]:
+        return {
+            "capabilities": {
+                "textDocumentSync": {"openClose": True, "change": SYNC_INCREMENTAL, "save": True},
+                "codeActionProvider": {"codeActionKinds": ["quickfix"]},
+            },
+            "serverInfo": {"name": SERVER_NAME},
+        }
+
+    def on_initialized(self, params: Dict[str, object]) -> None:
+        return None
+
+    def on_shutdown(self, params: Dict[str, object]) -> None:
+        self.shutdown_requested = True
+        return None
+
+    def on_textDocument_didOpen(self, params: Dict[str, object]) -> None:
+        item = params["textDocument"]
+        document = self.documents[item["uri"]] = Document(item["uri"], item["text"], item.get("version"))
+        self.analyse(document)
+
+    def on_textDocument_didChange(self, params: Dict[str, object]) -> None:
+        document = self.documents.get(params["textDocument"]["uri"])
+        if document is None:
+            return
+        for change in params["contentChanges"]:
+            document.apply(change)
+        document.version = params["textDocument"].get("version")
+        document.due = time.monotonic() + self.debounce
+
+    def on_textDocument_didSave(self, params: Dict[str, object]) -> None:
+        document = self.documents.get(params["textDocument"]["uri"])
+        if document is not None and document.due is not None:
+            self.analyse(document)
+
+    def on_textDocument_didClose(self, params: Dict[str, object]) -> None:
+        uri = params["textDocument"]["uri"]
+        if self.documents.pop(uri, None) is not None:
+            self.send({"method": "textDocument/publishDiagnostics", "params": {"uri": uri, "diagnostics": []}})
+
+    def _analyse_due(self) -> None:
+        now = time.monotonic()
+        for document in list(self.documents.values()):
+            if document.due is not None and document.due <= now:
+                self.analyse(document)
+
+    def analyse(self, document: Document) -> None:
+        """Publish diagnostics for `document`, validating only fences whose text is new."""
+        document.due = None
+        blocks: Dict[str, List[BlockIssue]] = {}
+        diagnostics: List[Tuple[Range, BlockIssue]] = []
+        for fence in iter_fences(document.text.splitlines(True)):
+            if fence.lang not in SQL_LANGS or not fence.body:
+                continue
+            issues = blocks.get(fence.body)
+            if issues is None:
+                issues = document.blocks.get(fence.body)
+            if issues is None:
+                issues = self._validate_block(fence.body, document.uri)
+            blocks[fence.body] = issues
+            first_line = fence.body_line - 1  # LSP lines are 0-based
+            for issue in issues:
+                line = first_line + issue.line
+                start = {"line": line, "character": issue.start}
+                diagnostics.append(({"start": start, "end": {"line": line, "character": issue.end}}, issue))
+        document.blocks = blocks
+        document.diagnostics = diagnostics
+        self.send(
+            {
+                "method": "textDocument/publishDiagnostics",
+                "params": {
+                    "uri": document.uri,
+                    "version": document.version,
+                    "diagnostics": [self._diagnostic(found_range, issue) for found_range, issue in diagnostics],
+                },
+            }
+        )
+
+    def _validate_block(self, body: str, uri: str) -> List[BlockIssue]:
+        lines = LineIndex(body)
+        found: List[BlockIssue] = []
+        for issue in self.validator.validate_sql_block(body, uri, 0):
+            offset = issue["offset"]
+            line = lines.line_of(offset)
+            line_start = lines.starts[line]
+            reference = issue["reference"]
+            if body.startswith(reference, offset):
+                length = len(reference)
+            else:
+                length = len(issue["column"])  # a spaced or 3-part reference: mark its start only
+            end = min(offset + length, line_start + len(lines.line_text(line)))
+            found.append(
+                BlockIssue(
+                    line,
+                    _utf16_len(body[line_start:offset]),
+                    _utf16_len(body[line_start:end]),
+                    issue["rule"],
+                    issue["message"],
+                    self._fix(issue) if issue["rule"] in FIXABLE and body.startswith(reference, offset) else None,
+                )
+            )
+        return found
+
+    def _fix(self, issue: Dict[str, object]) -> Optional[Tuple[str, str]]:
+        """The replacement the fixers would make for this reference, if any."""
+        table_key = normalize_identifier(issue["table"])
+        qualifier, _, column_raw = issue["reference"].rpartition(".")
+        rule = self.rules.alias_rule(table_key, normalize_identifier(column_raw))
+        if rule is not None:
+            return f"Apply rename rule: {rule.description}", rule.render(qualifier)
+        # The validator only flags names the table lacks, so this is the fixer's fuzzy match.
+        canonical, _ = self.schema.canonicalize(table_key, column_raw)
+        if canonical is None:
+            return None
+        replacement = f"{qualifier}.{format_identifier(column_raw, canonical)}"
+        return f"Change to {replacement} (closest match)", replacement
+
+    @staticmethod
+    def _diagnostic(found_range: Range, issue: BlockIssue) -> Dict[str, object]:
+        rule = RULES_BY_ID[issue.rule]
+        diagnostic: Dict[str, object] = {
+            "range": found_range,
+            "severity": SEVERITY[rule.level],
+            "code": rule.id,
+            "source": SERVER_NAME,
+            "message": issue.message,
+        }
+        if issue.fix is not None:
+            diagnostic["data"] = {"title": issue.fix[0], "newText": issue.fix[1]}
+        return diagnostic
+
+    def on_textDocument_codeAction(self, params: Dict[str, object]) -> List[Dict[str, object]]:
+        document = self.documents.get(params["textDocument"]["uri"])
+        if document is None:
+            return []
+        wanted = params["range"]
+        actions = []
+        for found_range, issue in document.diagnostics:
+            if issue.fix is None or not _overlaps(found_range, wanted):
+                continue
+            title, new_text = issue.fix
+            actions.append(
+                {
+                    "title": title,
+                    "kind": "quickfix",
+                    "diagnostics": [self._diagnostic(found_range, issue)],
+                    "isPreferred": True,
+                    "edit": {"changes": {document.uri: [{"range": found_range, "newText": new_text}]}},
+                }
+            )
+        return actions
+
+
+def _overlaps(first: Range, second: Range) -> bool:
+    def key(position: Position) -> Tuple[int, int]:
+        return position["line"], position["character"]
+
+    return key(first["start"]) <= key(second["end"]) and key(second["start"]) <= key(first["end"])
+
+
+def _read_messages(stream: BinaryIO, inbox: "queue.Queue[Optional[Dict[str, object]]]") -> None:
+    """Reader thread: parse `Content-Length` framed messages from `stream` into `inbox`."""
+    while True:
+        length = None
+        while True:
+            header = stream.readline()
+            if not header:
+                inbox.put(None)
+                return
+            header = header.strip()
+            if not header:
+                break
+            name, _, value = header.decode("ascii", "replace").partition(":")
+            if name.lower() == "content-length":
+                length = int(value.strip())
+        if length is None:
+            continue
+        body = stream.read(length)
+        try:
+            inbox.put(json.loads(body.decode("utf-8")))
+        except ValueError:
+            inbox.put({"method": "$/parseError"})
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Language server publishing column diagnostics for markdown labs")
+    parser.add_argument(
+        "--schema",
+        type=Path,
+        default=DEFAULT_SCHEMA,
+        help="Path to Results.json, a setup .sql script or a directory of numbered scripts",
+    )
+    parser.add_argument(
+        "--rules",
+        type=Path,
+        default=DEFAULT_RULES_PATH,
+        help="Column rename rules offered as quick fixes (default: column_renames.json)",
+    )
+    parser.add_argument(
+        "--debounce",
+        type=int,
+        default=150,
+        help="Milliseconds to wait after the last edit before re-analysing (default: 150)",
+    )
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    output = sys.stdout.buffer
+    # Anything printed by the shared modules must not corrupt the protocol stream.
+    sys.stdout = sys.stderr
+    server = ColumnLanguageServer(args.schema, load_rules(args.rules), args.debounce / 1000, output)
+    return server.serve(sys.stdin.buffer)
+
+
+if __name__ == "__main__":
+    code = main()
+    sys.stderr.flush()
+    # The reader thread is still blocked on stdin; a normal interpreter
+    # shutdown would wait on its buffer lock and abort.
+    os._exit(code)
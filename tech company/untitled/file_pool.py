@@ -0,0 +1,52 @@
+"""Process-pool fan-out for the per-file scans of the column tools.
+
+Every markdown file is an independent unit of work: the tools only share the
+schema, which each worker receives once through the pool initializer instead
+of with every task. `map_files` yields results in input order, so callers can
+merge them exactly as a serial loop would and produce identical reports.
+"""
+
+from __future__ import annotations
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterator, Optional, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def resolve_jobs(jobs: int) -> int:
+    """Return the worker count for a `--jobs` value (0 means one per CPU)."""
+    if jobs < 0:
+        raise ValueError(f"--jobs must be zero or positive, got {jobs}")
+    if jobs == 0:
+        return os.cpu_count() or 1
+    return jobs
+
+
+def map_files(
+    func: Callable[[T], R],
+    items: Sequence[T],
+    jobs: int,
+    initializer: Optional[Callable[..., None]] = None,
+    initargs: Tuple[object, ...] = (),
+) -> Iterator[R]:
+    """Apply `func` to every item, in a pool of `jobs` worker processes.
+
+    `func` and `initializer` must be module-level functions so they can be
+    sent to the workers. With a single job (or a single item) everything runs
+    in this process after calling `initializer` once.
+    """
+    workers = min(resolve_jobs(jobs), len(items))
+    if workers <= 1:
+        if initializer is not None:
+            initializer(*initargs)
+        yield from map(func, items)
+        return
+
+    # A few chunks per worker keeps the pipes quiet without letting one
+    # oversized lesson leave the other workers idle at the end of the run.
+    chunksize = max(1, len(items) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs) as pool:
+        yield from pool.map(func, items, chunksize=chunksize)
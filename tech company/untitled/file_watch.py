@@ -0,0 +1,199 @@
+"""Change notifications for the column tools' watch mode.
+
+`open_watcher` returns an inotify watcher on Linux and a polling watcher
+everywhere else (or when the inotify limits are exhausted). Both report
+batches of paths that were written, created, moved or deleted under a
+directory tree plus a few extra files (the schema sources), and leave it to
+the caller to decide which of them it cares about.
+
+inotify is reached through ctypes, so no extra package is needed: every
+directory in the tree gets a watch, directories created later are added as
+their IN_CREATE arrives, and a queue overflow is reported as `overflow` so
+the caller can fall back to a full rescan. The polling watcher compares
+`(mtime_ns, size)` snapshots of the files a glob returns.
+"""
+
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple, Union
+
+# From <sys/inotify.h>.
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_ISDIR = 0x40000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+_EVENT = struct.Struct("iIII")  # wd, mask, cookie, len; the name follows
+
+# Editors save in bursts (write a temp file, rename it, touch metadata);
+# events arriving this soon after the first one join its batch.
+SETTLE_SECONDS = 0.02
+
+
+class ChangeBatch(NamedTuple):
+    paths: Set[Path]
+    overflow: bool = False  # events were lost: treat every file as changed
+
+
+class InotifyWatcher:
+    """Recursive inotify watch on `directory` plus individual `extra_files`."""
+
+    kind = "inotify"
+
+    def __init__(self, directory: Path, extra_files: Sequence[Path] = ()):
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._dirs: Dict[int, Path] = {}
+        self._extra = {path.resolve() for path in extra_files}
+        try:
+            for root, subdirs, _ in os.walk(directory):
+                # The tools' own caches change on every run; never watch them.
+                subdirs[:] = [name for name in subdirs if not name.startswith(".")]
+                self._add(Path(root))
+            for path in self._extra:
+                self._add(path.parent)
+        except OSError:
+            self.close()
+            raise
+
+    def _add(self, directory: Path) -> None:
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(str(directory)), WATCH_MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {directory}")
+        self._dirs[wd] = directory
+
+    def _read(self) -> Tuple[Set[Path], bool]:
+        paths: Set[Path] = set()
+        overflow = False
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                return paths, overflow
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _EVENT.unpack_from(data, offset)
+                name = data[offset + _EVENT.size : offset + _EVENT.size + length].rstrip(b"\0")
+                offset += _EVENT.size + length
+                if mask & IN_Q_OVERFLOW:
+                    overflow = True
+                    continue
+                directory = self._dirs.get(wd)
+                if directory is None or not name:
+                    continue
+                path = directory / os.fsdecode(name)
+                if mask & IN_ISDIR:
+                    if mask & (IN_CREATE | IN_MOVED_TO) and not path.name.startswith("."):
+                        try:
+                            self._add(path)
+                        except OSError:
+                            overflow = True  # out of watches: let the caller rescan
+                        # Files may have landed in it before the watch existed.
+                        paths.update(child for child in path.rglob("*") if child.is_file())
+                    continue
+                paths.add(path)
+
+    def wait(self, timeout: Optional[float] = None) -> ChangeBatch:
+        """Block until something changes (or `timeout` passes) and return the settled batch."""
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return ChangeBatch(set())
+        paths, overflow = self._read()
+        while select.select([self._fd], [], [], SETTLE_SECONDS)[0]:
+            more, lost = self._read()
+            paths |= more
+            overflow = overflow or lost
+        return ChangeBatch(paths, overflow)
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+class PollingWatcher:
+    """Portable fallback: re-stat the files `pattern` matches every `interval` seconds."""
+
+    kind = "polling"
+
+    def __init__(self, directory: Path, pattern: str, extra_files: Sequence[Path] = (), interval: float = 0.25):
+        self.directory = directory
+        self.pattern = pattern
+        self.extra_files = list(extra_files)
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self) -> Dict[Path, Tuple[int, int]]:
+        snapshot: Dict[Path, Tuple[int, int]] = {}
+        for path in [*self.directory.glob(self.pattern), *self.extra_files]:
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def wait(self, timeout: Optional[float] = None) -> ChangeBatch:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            current = self._scan()
+            paths = current.keys() | self._snapshot.keys()
+            changed = {path for path in paths if current.get(path) != self._snapshot.get(path)}
+            self._snapshot = current
+            if changed:
+                return ChangeBatch(changed)
+            if deadline is not None and time.monotonic() >= deadline:
+                return ChangeBatch(set())
+            time.sleep(self.interval)
+
+    def close(self) -> None:
+        pass
+
+
+def open_watcher(
+    directory: Path, pattern: str, extra_files: Iterable[Path] = (), polling: bool = False
+) -> Union[InotifyWatcher, PollingWatcher]:
+    """Prefer inotify; fall back to polling where it is missing or out of watches."""
+    extra = list(extra_files)
+    if not polling:
+        try:
+            return InotifyWatcher(directory, extra)
+        except (OSError, AttributeError):
+            pass  # not Linux, or fs.inotify.max_user_watches reached
+    return PollingWatcher(directory, pattern, extra)
+
+
+def matching(paths: Iterable[Path], directory: Path, pattern: str) -> List[Path]:
+    """The changed paths a run over `directory` and `pattern` would scan, sorted, outside dot-directories."""
+    root = directory.resolve()
+    selected = []
+    for path in paths:
+        try:
+            relative = path.resolve().relative_to(root)
+        except ValueError:
+            continue
+        if any(part.startswith(".") for part in relative.parts[:-1]):
+            continue
+        if _glob_match(relative, pattern):
+            selected.append(directory / relative)
+    return sorted(set(selected), key=str)
+
+
+def _glob_match(relative: Path, pattern: str) -> bool:
+    # `**/` matches zero or more directories, which PurePath.match does not do.
+    if pattern.startswith("**/"):
+        return relative.match(pattern[3:]) or relative.match(pattern)
+    return relative.match(pattern) and len(relative.parts) == len(Path(pattern).parts)
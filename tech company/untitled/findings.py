@@ -0,0 +1,131 @@
+"""Stable rule IDs and machine-readable output for the column tools.
+
+Every finding the validator, the fixer and fix_customer_columns.py report
+maps to one of the rules below; the validator's predicate checks add the
+type-conversion and sargability rules. The IDs are part of the output contract:
+dashboards key on them, so existing IDs must never be renumbered or reused.
+
+`FindingStream` fans each finding out to a JSON Lines file and/or a SARIF
+log as it is produced, so neither format holds the run in memory.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+from urllib.parse import quote
+
+from report_stream import JsonLinesWriter, SarifWriter
+
+
+class Rule(NamedTuple):
+    id: str
+    name: str
+    level: str  # SARIF level: error, warning or note
+    description: str
+
+
+UNKNOWN_TABLE = Rule("COL001", "unknown-table", "error", "Reference to a table that is not in the schema")
+UNKNOWN_COLUMN = Rule("COL002", "unknown-column", "error", "Reference to a column the table does not have")
+FUZZY_FIX = Rule("COL003", "fuzzy-column-fix", "warning", "Misspelt column replaced with its closest match")
+CUSTOMERS_REWRITE = Rule(
+    "COL004", "customers-rewrite", "warning", "Legacy Customers column rewritten to the current schema"
+)
+CASE_FIX = Rule("COL005", "column-case-fix", "note", "Column spelling normalized to the schema's casing")
+REDUNDANT_QUALIFIER = Rule(
+    "COL006", "redundant-qualifier", "note", "Duplicate table qualifier removed from a column reference"
+)
+COLUMN_RENAME = Rule("COL007", "column-rename", "warning", "Renamed column rewritten from a column_renames.json rule")
+IMPLICIT_CONVERSION = Rule(
+    "COL008", "implicit-conversion", "warning", "Predicate compares a column with a value or column of another type"
+)
+CONVERTED_COLUMN = Rule(
+    "COL009", "converted-column", "warning", "Predicate wraps a column in CAST or CONVERT, so its index cannot be seeked"
+)
+NON_SARGABLE_FUNCTION = Rule(
+    "COL010", "non-sargable-function", "warning", "Predicate wraps a column in a function, so its index cannot be used"
+)
+LEADING_WILDCARD = Rule("COL011", "leading-wildcard", "warning", "LIKE pattern starts with a wildcard")
+NULL_REPLACEMENT = Rule(
+    "COL012", "null-replacement", "warning", "Predicate compares ISNULL/COALESCE of a column, not the column"
+)
+COLUMN_ARITHMETIC = Rule("COL013", "column-arithmetic", "warning", "Predicate does arithmetic on the column side")
+OR_ACROSS_COLUMNS = Rule("COL014", "or-across-columns", "warning", "OR joins conditions on different columns")
+REDUNDANT_CAST = Rule(
+    "COL015", "redundant-cast", "note", "Predicate casts a column to the type it already has"
+)
+
+RULES = (
+    UNKNOWN_TABLE, UNKNOWN_COLUMN, FUZZY_FIX, CUSTOMERS_REWRITE, CASE_FIX, REDUNDANT_QUALIFIER, COLUMN_RENAME,
+    IMPLICIT_CONVERSION, CONVERTED_COLUMN, NON_SARGABLE_FUNCTION, LEADING_WILDCARD, NULL_REPLACEMENT,
+    COLUMN_ARITHMETIC, OR_ACROSS_COLUMNS, REDUNDANT_CAST,
+)
+RULES_BY_ID = {rule.id: rule for rule in RULES}
+
+
+def make_finding(rule: Rule, file: str, line: int, message: str, **properties: object) -> Dict[str, object]:
+    """Build the JSON Lines record for one finding; extra keyword arguments become properties."""
+    return {
+        "rule": rule.id,
+        "name": rule.name,
+        "level": rule.level,
+        "file": file,
+        "line": line,
+        "message": message,
+        **properties,
+    }
+
+
+def sarif_rules() -> List[Dict[str, object]]:
+    return [
+        {
+            "id": rule.id,
+            "name": rule.name,
+            "shortDescription": {"text": rule.description},
+            "defaultConfiguration": {"level": rule.level},
+        }
+        for rule in RULES
+    ]
+
+
+def sarif_result(finding: Dict[str, object]) -> Dict[str, object]:
+    core = {"rule", "name", "level", "file", "line", "message"}
+    result: Dict[str, object] = {
+        "ruleId": finding["rule"],
+        "level": finding["level"],
+        "message": {"text": finding["message"]},
+        "locations": [
+            {
+                "physicalLocation": {
+                    "artifactLocation": {"uri": quote(Path(str(finding["file"])).as_posix())},
+                    "region": {"startLine": max(int(finding["line"]), 1)},
+                }
+            }
+        ],
+    }
+    properties = {key: value for key, value in finding.items() if key not in core}
+    if properties:
+        result["properties"] = properties
+    return result
+
+
+class FindingStream:
+    """Write findings to JSON Lines and/or SARIF as they arrive."""
+
+    def __init__(self, tool_name: str, jsonl_path: Optional[Path] = None, sarif_path: Optional[Path] = None):
+        self.jsonl = JsonLinesWriter(jsonl_path) if jsonl_path else None
+        self.sarif = SarifWriter(sarif_path, tool_name, sarif_rules()) if sarif_path else None
+        self.count = 0
+
+    def write(self, finding: Dict[str, object]) -> None:
+        if self.jsonl is not None:
+            self.jsonl.write(finding)
+        if self.sarif is not None:
+            self.sarif.write(sarif_result(finding))
+        self.count += 1
+
+    def close(self) -> None:
+        if self.jsonl is not None:
+            self.jsonl.close()
+        if self.sarif is not None:
+            self.sarif.close()
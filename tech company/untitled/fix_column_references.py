@@ -15,25 +15,34 @@ under tech company/untitled using the co-located Results.json file.
 from __future__ import annotations
 
 import argparse
-import difflib
-import json
 import re
 from collections import defaultdict
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
-
-SQL_LANGS = {"", "sql", "tsql"}
-CODE_BLOCK_PATTERN = re.compile(r"```(?P<lang>[^\n]*)\n(?P<body>[\s\S]*?)```", re.IGNORECASE)
-REFERENCE_PATTERN = re.compile(
-    r"(?<![\w])([A-Za-z_][\w]*|\[[^\]]+\])\.([A-Za-z_][\w]*|\[[^\]]+\])(?:\.([A-Za-z_][\w]*|\[[^\]]+\]))?",
-    re.MULTILINE,
-)
-ALIAS_PATTERN = re.compile(
-    r"\b(?:FROM|JOIN|INNER\s+JOIN|LEFT\s+(?:OUTER\s+)?JOIN|RIGHT\s+(?:OUTER\s+)?JOIN|FULL\s+(?:OUTER\s+)?JOIN|CROSS\s+JOIN)\s+"
-    r"([A-Za-z0-9_\[\]\.]+)(?:\s+(?:AS\s+)?([A-Za-z_][A-Za-z0-9_\[\]]*))?",
-    re.IGNORECASE,
+from typing import Dict, List, Optional, Set, Tuple
+
+from file_pool import map_files
+from findings import (
+    CASE_FIX,
+    COLUMN_RENAME,
+    FUZZY_FIX,
+    REDUNDANT_QUALIFIER,
+    RULES_BY_ID,
+    UNKNOWN_COLUMN,
+    FindingStream,
+    make_finding,
 )
+from fuzzy_match import FuzzyMatcher
+from git_changes import GitError, select_changed
+from line_index import LineIndex
+from md_fences import Span, rewrite_fences, sql_fences
+from report_stream import MarkdownStream, Spool
+from scan_cache import SHARED_SOURCES, ScanCache, default_cache_path, file_digest, fingerprint
+from schema_catalog import expand_sources, load_catalog, rename_results_column
+from sql_lexer import CodeMask, Token, code_tokens, tokenize
+from sql_scopes import Scope, resolve_scopes, schema_table
+from stage_profile import PROFILER, add_profile_arguments, finish_profile, start_profile
+from usage_index import ReferenceRow, UsageIndex, default_index_path, format_occurrences, parse_target
 
 
 def strip_brackets(token: str) -> str:
@@ -64,35 +73,12 @@ def format_identifier(original: str, canonical: str) -> str:
     return canonical
 
 
-def line_number_for(text: str, offset: int) -> int:
-    """Return 0-based line offset for a char position within text."""
-    return text.count("\n", 0, offset)
-
-
-def is_within_comment(sql: str, match_start: int) -> bool:
-    """Cheap check for inline (--) or block (/* */) comments."""
-    line_start = sql.rfind("\n", 0, match_start)
-    line_end = sql.find("\n", match_start)
-    if line_end == -1:
-        line_end = len(sql)
-    line_text = sql[line_start + 1 : line_end]
-    inline_pos = line_text.find("--")
-    rel_index = match_start - (line_start + 1)
-    if inline_pos != -1 and rel_index >= inline_pos:
-        return True
-
-    before = sql[:match_start]
-    open_idx = before.rfind("/*")
-    close_idx = before.rfind("*/")
-    return open_idx != -1 and (close_idx == -1 or close_idx < open_idx)
-
-
 @dataclass
 class ReferenceContext:
     tokens: List[str]
     column_index: int
     table_key: str
-    drop_first: bool = False
+    dropped: Optional[int] = None  # index of a qualifier the fix removes
 
     @property
     def column_token(self) -> str:
@@ -101,8 +87,9 @@ class ReferenceContext:
     def render(self, new_column: str) -> str:
         tokens = self.tokens.copy()
         tokens[self.column_index] = new_column
-        rendered = tokens[1:] if (self.drop_first and len(tokens) > 2) else tokens
-        return ".".join(rendered)
+        if self.dropped is not None and len(tokens) > 2:
+            del tokens[self.dropped]
+        return ".".join(tokens)
 
 
 @dataclass
@@ -112,29 +99,68 @@ class ChangeRecord:
     before: str
     after: str
     reason: str
+    rule: str = CASE_FIX.id
+
+
+@dataclass
+class FileScan:
+    """Everything one markdown file contributed to a run."""
+
+    path: Path
+    changed: bool
+    change_log: List[ChangeRecord]
+    unresolved: List[Dict[str, object]]
+    usage_counts: Dict[Tuple[str, str], int]
+    references_seen: int
+    references: List[ReferenceRow]
+
+    def to_json(self) -> Dict[str, object]:
+        return {
+            "changed": self.changed,
+            "change_log": [[c.line, c.before, c.after, c.reason, c.rule] for c in self.change_log],
+            "unresolved": self.unresolved,
+            "usage_counts": [[table, column, count] for (table, column), count in self.usage_counts.items()],
+            "references_seen": self.references_seen,
+            "references": self.references,
+        }
+
+    @classmethod
+    def from_json(cls, path: Path, data: Dict[str, object]) -> "FileScan":
+        return cls(
+            path=path,
+            changed=data["changed"],
+            change_log=[
+                ChangeRecord(path, line, before, after, reason, rule)
+                for line, before, after, reason, rule in data["change_log"]
+            ],
+            unresolved=data["unresolved"],
+            usage_counts={(table, column): count for table, column, count in data["usage_counts"]},
+            references_seen=data["references_seen"],
+            references=[tuple(row) for row in data["references"]],
+        )
 
 
 class SchemaIndex:
-    """Utility wrapper around Results.json."""
+    """Column lookups over the schema catalog (Results.json or a setup script)."""
 
     def __init__(self, schema_path: Path):
-        raw = json.loads(schema_path.read_text(encoding="utf-8"))
+        catalog = load_catalog([schema_path])
         table_map: Dict[str, Dict[str, str]] = defaultdict(dict)
         table_names: Dict[str, str] = {}
         column_lookup: Dict[str, List[str]] = defaultdict(list)
 
-        for entry in raw:
-            table = strip_brackets(entry["TableName"].strip())
-            column = strip_brackets(entry["ColumnName"].strip())
-            table_key = normalize_identifier(table)
-            column_key = normalize_identifier(column)
-            table_map[table_key][column_key] = column
-            table_names[table_key] = table
-            column_lookup[column_key].append(table_key)
+        for table in catalog:
+            table_key = normalize_identifier(table.name)
+            table_names[table_key] = table.name
+            for column in table.column_names:
+                column_key = normalize_identifier(column)
+                table_map[table_key][column_key] = column
+                column_lookup[column_key].append(table_key)
 
         self.tables = table_map
         self.table_names = table_names
         self.column_lookup = column_lookup
+        self.matcher = FuzzyMatcher()
 
     def has_table(self, table_key: str) -> bool:
         return table_key in self.tables
@@ -152,9 +178,9 @@ class SchemaIndex:
                 return canonical, "case"
             return canonical, None
 
-        matches = difflib.get_close_matches(column_key, table.keys(), n=1, cutoff=0.78)
-        if matches:
-            return table[matches[0]], "fuzzy"
+        match = self.matcher.best_match(table_key, column_key, table.keys(), 0.78)
+        if match:
+            return table[match], "fuzzy"
         return None, None
 
     def display_table(self, table_key: str) -> str:
@@ -162,85 +188,182 @@ class SchemaIndex:
 
 
 class ColumnReferenceFixer:
-    def __init__(self, schema_path: Path, dry_run: bool = False, verbose: bool = False):
-        self.schema = SchemaIndex(schema_path)
+    def __init__(
+        self,
+        schema_path: Optional[Path],
+        dry_run: bool = False,
+        verbose: bool = False,
+        schema: Optional[SchemaIndex] = None,
+    ):
+        self.schema = schema if schema is not None else SchemaIndex(schema_path)
         self.dry_run = dry_run
         self.verbose = verbose
+        # change_log/unresolved only hold the file being scanned (see scan_file);
+        # run() keeps totals and hands each file's records to the report.
         self.change_log: List[ChangeRecord] = []
         self.unresolved: List[Dict[str, object]] = []
         self.usage_counts: Dict[Tuple[str, str], int] = defaultdict(int)
+        # Every resolved reference of the file being scanned, for the usage index.
+        self.references: List[ReferenceRow] = []
         self.references_seen = 0
+        self.changes_applied = 0
+        self.unresolved_count = 0
 
-    def run(self, directory: Path, pattern: str) -> Dict[str, object]:
-        md_files = sorted(directory.glob(pattern))
+    def run(
+        self,
+        directory: Path,
+        pattern: str,
+        jobs: int = 1,
+        cache: Optional[ScanCache] = None,
+        report: Optional["FixReport"] = None,
+        index: Optional[UsageIndex] = None,
+        files: Optional[List[Path]] = None,
+    ) -> Dict[str, object]:
+        """Fix every file matching `pattern` under `directory`, or just `files` when given."""
+        md_files = sorted(directory.glob(pattern)) if files is None else files
         total_files = len(md_files)
         files_changed = 0
 
+        cached: Dict[Path, FileScan] = {}
+        if cache is not None:
+            for md_file in md_files:
+                data = cache.get(md_file)
+                # A cached file that still needs fixing has to be rewritten for real.
+                if data is not None and not (data["changed"] and not self.dry_run):
+                    cached[md_file] = FileScan.from_json(md_file, data)
+        pending = [md_file for md_file in md_files if md_file not in cached]
+        fresh = map_files(_scan_in_worker, pending, jobs, _init_worker, (self.schema, self.dry_run))
+
         for md_file in md_files:
-            changed = self._process_markdown_file(md_file)
-            if changed:
+            scan = cached.get(md_file)
+            if scan is None:
+                scan = next(fresh)
+                if cache is not None and not (scan.changed and not self.dry_run):
+                    cache.put(md_file, scan.to_json())
+            self._merge(scan)
+            if index is not None:
+                with PROFILER.stage("write"):
+                    if md_file not in cached:
+                        index.replace_file(scan.path, scan.references, file_digest(scan.path))
+                    else:
+                        # A cache hit was not rewritten, so the hash `get` took still describes it.
+                        digest = cache.digest(md_file)
+                        if index.digest(scan.path) != digest:
+                            index.replace_file(scan.path, scan.references, digest)
+            if report is not None:
+                report.add(scan)
+            if scan.changed:
                 files_changed += 1
                 if self.verbose:
-                    print(f"✔ Fixed {md_file.relative_to(directory)}")
+                    print(f"✔ Fixed {scan.path.relative_to(directory)}")
 
         return {
             "total_files": total_files,
             "files_changed": files_changed,
-            "changes": len(self.change_log),
-            "unresolved": len(self.unresolved),
+            "changes": self.changes_applied,
+            "unresolved": self.unresolved_count,
         }
 
+    def scan_file(self, path: Path) -> FileScan:
+        """Process one file with fresh accumulators and return its results."""
+        self.change_log = []
+        self.unresolved = []
+        self.usage_counts = defaultdict(int)
+        self.references = []
+        self.references_seen = 0
+        changed = self._process_markdown_file(path)
+        return FileScan(
+            path=path,
+            changed=changed,
+            change_log=self.change_log,
+            unresolved=self.unresolved,
+            usage_counts=dict(self.usage_counts),
+            references_seen=self.references_seen,
+            references=self.references,
+        )
+
+    def _merge(self, scan: FileScan) -> None:
+        # Files arrive in sorted order, so the insertion order of usage_counts
+        # (and the report) match a serial run exactly.
+        self.changes_applied += len(scan.change_log)
+        self.unresolved_count += len(scan.unresolved)
+        for key, count in scan.usage_counts.items():
+            self.usage_counts[key] += count
+        self.references_seen += scan.references_seen
+
     def _process_markdown_file(self, path: Path) -> bool:
         if not path.is_file():
             return False
-        original = path.read_text(encoding="utf-8")
-        rebuilt: List[str] = []
-        last_index = 0
-        file_changed = False
-
-        for match in CODE_BLOCK_PATTERN.finditer(original):
-            rebuilt.append(original[last_index : match.start()])
-            lang = match.group("lang").strip().lower()
-            body = match.group("body")
-
-            if lang not in SQL_LANGS:
-                rebuilt.append(match.group(0))
-            else:
-                block_start_line = line_number_for(original, match.start()) + 2
-                alias_map = self._build_alias_map(body)
-                updated_body, block_changes = self._fix_sql_block(body, alias_map, path, block_start_line)
-                if block_changes:
-                    file_changed = True
-                rebuilt.append(f"```{match.group('lang')}\n{updated_body}```")
-            last_index = match.end()
-
-        rebuilt.append(original[last_index:])
-        new_content = "".join(rebuilt)
-
-        if file_changed and not self.dry_run:
-            path.write_text(new_content, encoding="utf-8")
-        return file_changed
-
-    def _build_alias_map(self, sql: str) -> Dict[str, str]:
-        aliases: Dict[str, str] = {}
-        for match in ALIAS_PATTERN.finditer(sql):
-            table_token = match.group(1)
-            alias_token = match.group(2)
-            if table_token.startswith("("):
-                continue  # skip derived tables
-            table_name = strip_brackets(table_token.split(".")[-1])
-            table_key = normalize_identifier(table_name)
-            if not self.schema.has_table(table_key):
+        # Only the new bodies of changed blocks are kept; the file itself is
+        # streamed once to find the blocks and once more to rewrite it.
+        replacements: Dict[Span, str] = {}
+        for fence in sql_fences(path):
+            with PROFILER.stage("tokenize"):
+                raw_tokens = tokenize(fence.body)
+                tokens = code_tokens(raw_tokens, CodeMask(raw_tokens))
+            with PROFILER.stage("aliases"):
+                scopes = resolve_scopes(tokens)
+            with PROFILER.stage("references"):
+                updated_body, block_changes = self._fix_sql_block(fence.body, tokens, scopes, path, fence.body_line)
+            if block_changes:
+                replacements[fence.span] = updated_body
+
+        if replacements and not self.dry_run:
+            rewrite_fences(path, replacements)
+        return bool(replacements)
+
+    def rename_column(
+        self, path: Path, table_key: str, old_column: str, new_column: str, blocks: Optional[Set[int]] = None
+    ) -> List[ChangeRecord]:
+        """Rewrite every reference to `table_key.old_column` in `path` to use `new_column`.
+
+        With `blocks`, only the fences opening on those lines are parsed. Qualifiers
+        are left exactly as written; only the column part of a reference changes.
+        """
+        old_key = normalize_identifier(old_column)
+        replacements: Dict[Span, str] = {}
+        changes: List[ChangeRecord] = []
+        for fence in sql_fences(path):
+            if blocks is not None and fence.start_line not in blocks:
                 continue
-            aliases[table_key] = table_key
-            if alias_token:
-                aliases[normalize_identifier(alias_token)] = table_key
-        return aliases
+            raw_tokens = tokenize(fence.body)
+            tokens = code_tokens(raw_tokens, CodeMask(raw_tokens))
+            lines = LineIndex(fence.body)
+            parts: List[str] = []
+            last_index = 0
+            for token, scope in zip(tokens, resolve_scopes(tokens)):
+                if not token.is_reference or len(token.parts) > 3:
+                    continue
+                context = self._reference_context(list(token.parts), scope)
+                if context is None or context.table_key != table_key:
+                    continue
+                if normalize_identifier(context.column_token) != old_key:
+                    continue
+                new_text = replace(context, dropped=None).render(format_identifier(context.column_token, new_column))
+                parts.append(fence.body[last_index : token.start])
+                parts.append(new_text)
+                last_index = token.end
+                changes.append(
+                    ChangeRecord(
+                        file=path,
+                        line=fence.body_line + lines.line_of(token.start),
+                        before=token.text,
+                        after=new_text,
+                        reason=f"renamed {old_column} -> {new_column}",
+                        rule=COLUMN_RENAME.id,
+                    )
+                )
+            if parts:
+                parts.append(fence.body[last_index:])
+                replacements[fence.span] = "".join(parts)
+
+        if replacements and not self.dry_run:
+            rewrite_fences(path, replacements)
+        return changes
 
-    def _reference_context(self, tokens: List[str], alias_map: Dict[str, str]) -> Optional[ReferenceContext]:
+    def _reference_context(self, tokens: List[str], scope: Scope) -> Optional[ReferenceContext]:
         if len(tokens) == 2:
-            left = normalize_identifier(tokens[0])
-            table_key = alias_map.get(left) or (left if self.schema.has_table(left) else None)
+            table_key = schema_table(scope, tokens[0], self.schema.tables)
             if not table_key:
                 return None
             return ReferenceContext(tokens=tokens, column_index=1, table_key=table_key)
@@ -248,12 +371,21 @@ class ColumnReferenceFixer:
         if len(tokens) == 3:
             first = normalize_identifier(tokens[0])
             second = normalize_identifier(tokens[1])
-            if second in alias_map and alias_map[second] == first:
-                return ReferenceContext(tokens=tokens, column_index=2, table_key=alias_map[second], drop_first=True)
-            if second in alias_map and first not in self.schema.tables:
-                return ReferenceContext(tokens=tokens, column_index=2, table_key=alias_map[second], drop_first=True)
+            bound = scope.lookup(tokens[1])
+            second_table = schema_table(scope, tokens[1], self.schema.tables) if bound is not None else None
+            if second_table and second_table == first:
+                return ReferenceContext(tokens=tokens, column_index=2, table_key=second_table, dropped=0)
+            if second_table and scope.lookup(tokens[0]) is not None:
+                # `e.d.DepartmentID`: the first part is the alias this scope binds, so keep it and drop the
+                # stray middle one; dropping `e` instead would turn `e.d.X = d.X` into `d.X = d.X`.
+                first_table = schema_table(scope, tokens[0], self.schema.tables)
+                if not first_table:
+                    return None
+                return ReferenceContext(tokens=tokens, column_index=2, table_key=first_table, dropped=1)
+            if second_table and first not in self.schema.tables:
+                return ReferenceContext(tokens=tokens, column_index=2, table_key=second_table, dropped=0)
             if second in self.schema.tables:
-                return ReferenceContext(tokens=tokens, column_index=2, table_key=second, drop_first=True)
+                return ReferenceContext(tokens=tokens, column_index=2, table_key=second, dropped=0)
             if first in self.schema.tables:
                 return ReferenceContext(tokens=tokens, column_index=1, table_key=first)
         return None
@@ -261,37 +393,36 @@ class ColumnReferenceFixer:
     def _fix_sql_block(
         self,
         body: str,
-        alias_map: Dict[str, str],
+        tokens: List[Token],
+        scopes: List[Scope],
         file_path: Path,
-        block_start_line: int,
+        body_line: int,
     ) -> Tuple[str, List[ChangeRecord]]:
+        with PROFILER.stage("lines"):
+            lines = LineIndex(body)
         parts: List[str] = []
         last_index = 0
         block_changes: List[ChangeRecord] = []
         modified = False
 
-        for match in REFERENCE_PATTERN.finditer(body):
-            start, end = match.span()
-            parts.append(body[last_index:start])
-
-            if is_within_comment(body, start):
-                parts.append(match.group(0))
-                last_index = end
+        for token, scope in zip(tokens, scopes):
+            if not token.is_reference or len(token.parts) > 3:
                 continue
-
-            tokens = [match.group(1), match.group(2)]
-            if match.group(3):
-                tokens.append(match.group(3))
-            context = self._reference_context(tokens, alias_map)
+            context = self._reference_context(list(token.parts), scope)
             if not context:
-                parts.append(match.group(0))
-                last_index = end
                 continue
 
+            start, end = token.start, token.end
+            parts.append(body[last_index:start])
+
             self.references_seen += 1
             canonical, reason = self.schema.canonicalize(context.table_key, context.column_token)
             usage_column = canonical or strip_brackets(context.column_token)
             self.usage_counts[(context.table_key, normalize_identifier(usage_column))] += 1
+            line = body_line + lines.line_of(start)
+            self.references.append(
+                (self.schema.display_table(context.table_key), usage_column, line, body_line - 1, canonical is not None)
+            )
 
             column_changed = False
             formatted_column = context.column_token
@@ -302,10 +433,10 @@ class ColumnReferenceFixer:
                 self.unresolved.append(
                     {
                         "file": str(file_path),
-                        "line": block_start_line + line_number_for(body, start),
+                        "line": line,
                         "table": self.schema.display_table(context.table_key),
                         "column": context.column_token,
-                        "snippet": match.group(0),
+                        "snippet": token.text,
                     }
                 )
 
@@ -313,13 +444,19 @@ class ColumnReferenceFixer:
             parts.append(new_text)
             last_index = end
 
-            if new_text != match.group(0):
+            if new_text != token.text:
                 modified = True
                 reason_bits: List[str] = []
-                if context.drop_first:
+                rule = CASE_FIX
+                if context.dropped == 0:
                     reason_bits.append("removed duplicate qualifier")
+                    rule = REDUNDANT_QUALIFIER
+                elif context.dropped is not None:
+                    reason_bits.append(f"removed stray qualifier {context.tokens[context.dropped]}")
+                    rule = REDUNDANT_QUALIFIER
                 if column_changed:
                     if reason == "fuzzy":
+                        rule = FUZZY_FIX
                         reason_bits.append(f"column -> {canonical} (fuzzy)")
                     elif reason == "case":
                         reason_bits.append(f"column -> {canonical}")
@@ -327,10 +464,11 @@ class ColumnReferenceFixer:
                         reason_bits.append("column normalized")
                 change = ChangeRecord(
                     file=file_path,
-                    line=block_start_line + line_number_for(body, start),
-                    before=match.group(0),
+                    line=line,
+                    before=token.text,
                     after=new_text,
                     reason=", ".join(reason_bits) or "format tweak",
+                    rule=rule.id,
                 )
                 block_changes.append(change)
                 self.change_log.append(change)
@@ -339,43 +477,115 @@ class ColumnReferenceFixer:
         updated_body = "".join(parts) if modified else body
         return updated_body, block_changes
 
-    def report(self) -> str:
-        lines: List[str] = ["# Column Reference Fix Report", ""]
-        lines.append(f"- Total references inspected: {self.references_seen}")
-        lines.append(f"- Changes applied: {len(self.change_log)}")
-        lines.append(f"- Unresolved references: {len(self.unresolved)}")
-        lines.append("")
-
-        if self.change_log:
-            lines.append("## Changes")
-            grouped: Dict[str, List[ChangeRecord]] = defaultdict(list)
-            for change in self.change_log:
-                grouped[str(change.file)].append(change)
-            for file_path in sorted(grouped.keys()):
-                lines.append(f"### {file_path}")
-                for change in grouped[file_path]:
-                    lines.append(f"- Line {change.line}: `{change.before}` → `{change.after}` ({change.reason})")
-                lines.append("")
-
-        if self.unresolved:
-            lines.append("## Unresolved References")
-            for issue in self.unresolved:
-                lines.append(
-                    f"- {issue['file']} (line {issue['line']}): `{issue['snippet']}` — no column named "
-                    f"`{issue['column']}` in table `{issue['table']}`"
-                )
-            lines.append("")
 
-        if self.usage_counts:
-            lines.append("## Column Usage (top 20)")
-            sorted_usage = sorted(self.usage_counts.items(), key=lambda item: item[1], reverse=True)[:20]
-            for (table_key, column_key), count in sorted_usage:
-                table_name = self.schema.display_table(table_key)
-                column_name = self.schema.tables[table_key].get(column_key, column_key)
-                lines.append(f"- {table_name}.{column_name}: {count}")
-            lines.append("")
+class FixReport:
+    """Markdown report and/or structured findings, streamed while files are merged.
+
+    Changes and unresolved references are spooled to temporary files as each
+    file arrives; only the summary counters and usage totals stay in memory.
+    """
+
+    def __init__(self, path: Optional[Path], findings: Optional[FindingStream] = None):
+        self.path = path
+        self.changes = Spool()
+        self.unresolved = Spool()
+        self.findings = findings
+
+    def add(self, scan: FileScan) -> None:
+        with PROFILER.stage("report"):
+            self._add(scan)
+
+    def _add(self, scan: FileScan) -> None:
+        if scan.change_log:
+            self.changes.write(f"### {scan.path}")
+            for change in scan.change_log:
+                self.changes.write(f"- Line {change.line}: `{change.before}` → `{change.after}` ({change.reason})")
+            self.changes.write("")
+
+        for issue in scan.unresolved:
+            self.unresolved.write(
+                f"- {issue['file']} (line {issue['line']}): `{issue['snippet']}` — no column named "
+                f"`{issue['column']}` in table `{issue['table']}`"
+            )
+
+        if self.findings is not None:
+            for change in scan.change_log:
+                self.findings.write(
+                    make_finding(
+                        RULES_BY_ID[change.rule],
+                        str(change.file),
+                        change.line,
+                        f"`{change.before}` -> `{change.after}` ({change.reason})",
+                        before=change.before,
+                        after=change.after,
+                    )
+                )
+            for issue in scan.unresolved:
+                self.findings.write(
+                    make_finding(
+                        UNKNOWN_COLUMN,
+                        issue["file"],
+                        issue["line"],
+                        f"No column named `{issue['column']}` in table `{issue['table']}`",
+                        table=issue["table"],
+                        column=issue["column"],
+                        snippet=issue["snippet"],
+                    )
+                )
 
-        return "\n".join(lines).strip() + "\n"
+    def close(self, fixer: ColumnReferenceFixer) -> None:
+        if self.path is not None:
+            with PROFILER.stage("report"):
+                self._write_markdown(fixer)
+        self.changes.close()
+        self.unresolved.close()
+        if self.findings is not None:
+            self.findings.close()
+
+    def _write_markdown(self, fixer: ColumnReferenceFixer) -> None:
+        with self.path.open("w", encoding="utf-8") as handle:
+            out = MarkdownStream(handle)
+            out.write_all(
+                [
+                    "# Column Reference Fix Report",
+                    "",
+                    f"- Total references inspected: {fixer.references_seen}",
+                    f"- Changes applied: {fixer.changes_applied}",
+                    f"- Unresolved references: {fixer.unresolved_count}",
+                    "",
+                ]
+            )
+
+            if self.changes.lines:
+                out.write("## Changes")
+                out.write_all(self.changes)
+
+            if self.unresolved.lines:
+                out.write("## Unresolved References")
+                out.write_all(self.unresolved)
+                out.write()
+
+            if fixer.usage_counts:
+                out.write("## Column Usage (top 20)")
+                sorted_usage = sorted(fixer.usage_counts.items(), key=lambda item: item[1], reverse=True)[:20]
+                for (table_key, column_key), count in sorted_usage:
+                    table_name = fixer.schema.display_table(table_key)
+                    column_name = fixer.schema.tables[table_key].get(column_key, column_key)
+                    out.write(f"- {table_name}.{column_name}: {count}")
+                out.write()
+            out.finish()
+
+
+_worker_fixer: Optional[ColumnReferenceFixer] = None
+
+
+def _init_worker(schema: SchemaIndex, dry_run: bool) -> None:
+    global _worker_fixer
+    _worker_fixer = ColumnReferenceFixer(None, dry_run=dry_run, schema=schema)
+
+
+def _scan_in_worker(path: Path) -> FileScan:
+    return _worker_fixer.scan_file(path)
 
 
 def parse_args() -> argparse.Namespace:
@@ -384,7 +594,7 @@ def parse_args() -> argparse.Namespace:
         "--schema",
         type=Path,
         default=Path("tech company/untitled/Results.json"),
-        help="Path to Results.json",
+        help="Path to Results.json, a setup .sql script or a directory of numbered scripts",
     )
     parser.add_argument(
         "--directory",
@@ -407,18 +617,209 @@ def parse_args() -> argparse.Namespace:
         type=Path,
         help="Optional path to save a detailed markdown report",
     )
+    parser.add_argument(
+        "--jsonl",
+        type=Path,
+        help="Optional path to stream every change and unresolved reference as JSON Lines",
+    )
+    parser.add_argument(
+        "--sarif",
+        type=Path,
+        help="Optional path to write the same findings as a SARIF 2.1.0 log",
+    )
     parser.add_argument(
         "--verbose",
         action="store_true",
         help="Print per-file updates",
     )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of worker processes (0 = one per CPU)",
+    )
+    parser.add_argument(
+        "--cache",
+        type=Path,
+        help="Scan cache file (default: <directory>/.scan_cache/fix_column_references.json)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Re-scan every file and leave the scan cache untouched",
+    )
+    changed = parser.add_mutually_exclusive_group()
+    changed.add_argument(
+        "--since",
+        metavar="REF",
+        help="Only scan markdown files changed since this git ref (plus files using tables a schema change touched)",
+    )
+    changed.add_argument(
+        "--staged",
+        action="store_true",
+        help="Only scan markdown files staged for commit (plus files using tables a schema change touched)",
+    )
+    parser.add_argument(
+        "--index",
+        type=Path,
+        help="Column usage index to update (default: <directory>/.scan_cache/column_usage.sqlite)",
+    )
+    parser.add_argument(
+        "--no-index",
+        action="store_true",
+        help="Do not update the column usage index",
+    )
+    add_profile_arguments(parser)
+
+    commands = parser.add_subparsers(dest="command", metavar="{query,rename}")
+    query = commands.add_parser(
+        "query",
+        help="Look up where a table or column is used, from the index of the last run",
+        description="Answer from the column usage index without rescanning any file.",
+    )
+    query.add_argument("target", help="Table, Table.Column or *.Column (case-insensitive)")
+    query.add_argument("--files", action="store_true", help="Only print the paths of the matching files")
+    # SUPPRESS keeps `--index` given before `query` from being reset to None.
+    query.add_argument("--index", type=Path, default=argparse.SUPPRESS, help="Column usage index to read")
+
+    rename = commands.add_parser(
+        "rename",
+        help="Rename a column in the labs that use it (found through the index) and in Results.json",
+        description=(
+            "Rewrite the references to Table.Old that the column usage index points at, leaving every "
+            "other file untouched, then rename the column in the --schema file when it is Results.json."
+        ),
+    )
+    rename.add_argument("old", help="Column to rename, as Table.Old")
+    rename.add_argument("new", help="New name, as Table.New or just New")
+    rename.add_argument("--dry-run", action="store_true", default=argparse.SUPPRESS, help="Only list the changes")
+    rename.add_argument("--index", type=Path, default=argparse.SUPPRESS, help="Column usage index to use")
     return parser.parse_args()
 
 
+def run_query(args: argparse.Namespace) -> int:
+    try:
+        table, column = parse_target(args.target)
+    except ValueError as exc:
+        print(f"❌ {exc}")
+        return 2
+    try:
+        index = UsageIndex.open_existing(args.index or default_index_path(args.directory))
+    except FileNotFoundError as exc:
+        print(f"❌ {exc}")
+        return 2
+    try:
+        occurrences = list(index.occurrences(table, column))
+    finally:
+        index.close()
+    if not occurrences:
+        print(f"No references to {args.target} in {index.path}")
+        return 1
+    for line in format_occurrences(occurrences, files_only=args.files):
+        print(line)
+    return 0
+
+
+def run_rename(args: argparse.Namespace) -> int:
+    try:
+        table, old_column = parse_target(args.old)
+        new_table, new_column = parse_target(args.new) if "." in args.new else (table, args.new.strip("[] "))
+    except ValueError as exc:
+        print(f"❌ {exc}")
+        return 2
+    if not (table and old_column and new_column) or (new_table or "").lower() != table.lower():
+        print("❌ rename expects Table.Old and Table.New (or New) for the same table")
+        return 2
+
+    fixer = ColumnReferenceFixer(args.schema, dry_run=args.dry_run)
+    table_key = normalize_identifier(table)
+    if not fixer.schema.has_table(table_key):
+        print(f"❌ Table {table} is not in {args.schema}")
+        return 2
+    try:
+        index = UsageIndex.open_existing(args.index or default_index_path(args.directory))
+    except FileNotFoundError as exc:
+        print(f"❌ {exc}")
+        return 2
+
+    blocks: Dict[str, Set[int]] = {}
+    for occurrence in index.occurrences(table, old_column):
+        blocks.setdefault(occurrence.file, set()).add(occurrence.block)
+
+    total = 0
+    for file, file_blocks in blocks.items():
+        path = Path(file)
+        if not path.is_file():
+            print(f"⚠️  {file} no longer exists; skipped")
+            continue
+        current = index.digest(path) == file_digest(path)
+        if not current:
+            print(f"⚠️  {file} changed since it was indexed; checking all of its SQL blocks")
+        changes = fixer.rename_column(path, table_key, old_column, new_column, file_blocks if current else None)
+        total += len(changes)
+        for change in changes:
+            print(f"- {change.file} (line {change.line}): `{change.before}` → `{change.after}`")
+        if changes and not args.dry_run:
+            index.rename_column(path, table, old_column, new_column, file_digest(path))
+    if not args.dry_run:
+        index.save()
+    index.close()
+
+    display_table = fixer.schema.display_table(table_key)
+    verb = "Would rewrite" if args.dry_run else "Rewrote"
+    print(f"{verb} {total} references to {display_table}.{old_column} in {len(blocks)} files")
+    if args.schema.suffix.lower() != ".json":
+        print(f"Schema source {args.schema} is not Results.json; rename the column there yourself")
+    elif args.dry_run:
+        print(f"Would rename {display_table}.{old_column} to {new_column} in {args.schema}")
+    else:
+        outcome = rename_results_column(args.schema, display_table, old_column, new_column)
+        messages = {
+            "renamed": f"Renamed {display_table}.{old_column} to {new_column} in {args.schema}",
+            "merged": f"Dropped {display_table}.{old_column} from {args.schema}; {new_column} was already listed",
+            "current": f"{args.schema} already lists {display_table}.{new_column}",
+            "absent": f"⚠️  {args.schema} lists neither {old_column} nor {new_column} for {display_table}",
+        }
+        print(messages[outcome])
+    return 0
+
+
 def main() -> int:
     args = parse_args()
+    if args.command == "query":
+        return run_query(args)
+    if args.command == "rename":
+        return run_rename(args)
+    start_profile(args)
+    files = None
+    if args.since or args.staged:
+        try:
+            selection = select_changed(
+                sorted(args.directory.glob(args.pattern)), expand_sources([args.schema]), args.since, args.staged
+            )
+        except GitError as exc:
+            print(f"❌ {exc}")
+            return 2
+        files = selection.files
+        print(selection.describe(f"since {args.since}" if args.since else "staged for commit"))
+
     fixer = ColumnReferenceFixer(args.schema, dry_run=args.dry_run, verbose=args.verbose)
-    summary = fixer.run(args.directory, args.pattern)
+    cache = None
+    if not args.no_cache:
+        cache_path = args.cache or default_cache_path(args.directory, "fix_column_references")
+        cache = ScanCache(cache_path, fingerprint([*expand_sources([args.schema]), __file__, *SHARED_SOURCES]))
+    findings = FindingStream("fix_column_references", args.jsonl, args.sarif) if (args.jsonl or args.sarif) else None
+    report = FixReport(args.report, findings) if (args.report or findings) else None
+    index = None if args.no_index else UsageIndex(args.index or default_index_path(args.directory))
+    summary = fixer.run(
+        args.directory, args.pattern, jobs=args.jobs, cache=cache, report=report, index=index, files=files
+    )
+    with PROFILER.stage("write"):
+        if cache is not None:
+            cache.save()
+        if index is not None:
+            index.save()
+            index.close()
 
     print("Summary")
     print("------")
@@ -428,10 +829,17 @@ def main() -> int:
     print(f"Changes       : {summary['changes']}")
     print(f"Unresolved    : {summary['unresolved']}")
 
+    if report is not None:
+        report.close(fixer)
     if args.report:
-        report_text = fixer.report()
-        args.report.write_text(report_text, encoding="utf-8")
         print(f"Report written to {args.report}")
+    if args.jsonl:
+        print(f"JSON Lines written to {args.jsonl}")
+    if args.sarif:
+        print(f"SARIF log written to {args.sarif}")
+    if index is not None:
+        print(f"Usage index updated at {index.path}")
+    finish_profile(args)
     return 0
 
 
@@ -0,0 +1,82 @@
+"""Memoized stand-in for `difflib.get_close_matches(word, columns, n=1, cutoff)`.
+
+The same misspelt column (`e.Title`, `c.CompanyName`) shows up hundreds of
+times across the labs, and every difflib call scores it against every column
+of the table again. `FuzzyMatcher` remembers answers per (table, word,
+cutoff) in a bounded LRU. On a miss it skips whole groups of columns whose
+length alone rules them out before scoring the rest with the same
+SequenceMatcher checks difflib uses, so it picks the same column.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from difflib import SequenceMatcher
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from stage_profile import PROFILER
+
+MemoKey = Tuple[str, str, float]
+
+
+def _length_buckets(candidates: Iterable[str]) -> Dict[int, List[str]]:
+    buckets: Dict[int, List[str]] = {}
+    for candidate in candidates:
+        buckets.setdefault(len(candidate), []).append(candidate)
+    return buckets
+
+
+def _closest(word: str, buckets: Dict[int, List[str]], cutoff: float) -> Optional[str]:
+    matcher = SequenceMatcher()
+    matcher.set_seq2(word)
+    size = len(word)
+    best: Optional[Tuple[float, str]] = None
+
+    for length, candidates in buckets.items():
+        # real_quick_ratio() only depends on the two lengths, so one check
+        # covers the whole bucket.
+        total = length + size
+        if (2.0 * min(length, size) / total if total else 1.0) < cutoff:
+            continue
+        for candidate in candidates:
+            matcher.set_seq1(candidate)
+            if matcher.quick_ratio() < cutoff:
+                continue
+            score = matcher.ratio()
+            # difflib keeps the largest (score, candidate) pair.
+            if score >= cutoff and (best is None or (score, candidate) > best):
+                best = (score, candidate)
+
+    return best[1] if best else None
+
+
+class FuzzyMatcher:
+    """Closest-column lookups for one schema, memoized per (table, word, cutoff).
+
+    A table key must always be queried with the same candidate columns; the
+    length buckets for a table are built on its first lookup and reused.
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self._memo: "OrderedDict[MemoKey, Optional[str]]" = OrderedDict()
+        self._buckets: Dict[str, Dict[int, List[str]]] = {}
+
+    def best_match(self, table_key: str, word: str, candidates: Iterable[str], cutoff: float) -> Optional[str]:
+        """Return the closest candidate to `word` scoring at least `cutoff`, or None."""
+        key = (table_key, word, cutoff)
+        memo = self._memo
+        if key in memo:
+            memo.move_to_end(key)
+            return memo[key]
+
+        with PROFILER.stage("fuzzy"):
+            buckets = self._buckets.get(table_key)
+            if buckets is None:
+                buckets = self._buckets[table_key] = _length_buckets(candidates)
+            result = _closest(word, buckets, cutoff)
+
+        memo[key] = result
+        if len(memo) > self.maxsize:
+            memo.popitem(last=False)
+        return result
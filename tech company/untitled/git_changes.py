@@ -0,0 +1,168 @@
+"""Changed-file selection for the column tools, answered by the local git repository.
+
+`--since <ref>` and `--staged` narrow a run to the markdown files git reports
+as changed, instead of every file under the lab directory, so the validator
+is cheap enough for a pre-commit hook:
+
+    python validate_column_references.py --schema Results.json --staged
+
+`--since` compares the working tree (untracked files included) with the
+ref; `--staged` compares the index with HEAD. Either way the files
+themselves are read from the working tree, as the tools always do.
+
+When a schema source is among the changed files (the tool's own `--schema`,
+plus Results.json and the master setup script, which the other tools are
+generated from), the old and new versions of that file are compiled into
+catalogs and compared. Every file that mentions a table whose columns
+changed is then scanned as well, even if the file itself did not change.
+"""
+
+from __future__ import annotations
+
+import re
+import subprocess
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from schema_catalog import SchemaCatalog, Table
+
+_HERE = Path(__file__).resolve().parent
+# Schema files that widen a changed-files run whichever schema a tool loads.
+WATCHED_SCHEMA = (_HERE / "Results.json", _HERE.parent / "00_TechCorp_MASTER_Setup.sql")
+
+
+class GitError(RuntimeError):
+    """git is missing, the directory is not in a work tree, or the ref is unknown."""
+
+
+class ChangedFiles(NamedTuple):
+    files: List[Path]  # the candidates to scan, in their original order
+    changed: int  # how many of `files` changed themselves
+    schema_files: List[Path]  # changed schema sources
+    tables: Set[str]  # tables whose columns the schema changes touched, as the new schema spells them
+
+    def describe(self, reference: str) -> str:
+        text = f"{self.changed} changed markdown file{'s' if self.changed != 1 else ''} {reference}"
+        if self.schema_files:
+            names = ", ".join(sorted(self.tables, key=str.lower)) or "no tables"
+            widened = len(self.files) - self.changed
+            text += f"; schema changes to {names} add {widened} referencing file{'s' if widened != 1 else ''}"
+        return text
+
+
+def _git(args: Sequence[str], cwd: Path) -> bytes:
+    try:
+        completed = subprocess.run(["git", *args], cwd=str(cwd), capture_output=True, check=False)
+    except OSError as exc:
+        raise GitError(f"cannot run git: {exc}") from None
+    if completed.returncode != 0:
+        message = completed.stderr.decode("utf-8", "replace").strip()
+        raise GitError(f"git {' '.join(args)}: {message}")
+    return completed.stdout
+
+
+def _names(output: bytes) -> List[str]:
+    return [name for name in output.decode("utf-8").split("\0") if name]
+
+
+def repo_root(path: Path) -> Path:
+    start = path if path.is_dir() else path.parent
+    return Path(_git(["rev-parse", "--show-toplevel"], start).decode("utf-8").strip())
+
+
+def changed_paths(root: Path, since: Optional[str] = None, staged: bool = False) -> List[Path]:
+    """Absolute paths of the files that were added, copied, modified or renamed."""
+    if staged:
+        names = _names(_git(["diff", "--cached", "--name-only", "-z", "--diff-filter=ACMR"], root))
+    else:
+        names = _names(_git(["diff", "--name-only", "-z", "--diff-filter=ACMR", since or "HEAD", "--"], root))
+        names += _names(_git(["ls-files", "--others", "--exclude-standard", "-z"], root))
+    return [root / name for name in names]
+
+
+def _old_version(root: Path, path: Path, since: Optional[str], staged: bool) -> Optional[bytes]:
+    spec = f"{'HEAD' if staged else since or 'HEAD'}:{path.relative_to(root).as_posix()}"
+    try:
+        return _git(["show", spec], root)
+    except GitError:
+        return None  # the file is new
+
+
+def _new_version(root: Path, path: Path, staged: bool) -> bytes:
+    if staged:
+        return _git(["show", f":{path.relative_to(root).as_posix()}"], root)
+    return path.read_bytes()
+
+
+def _compile(content: Optional[bytes], suffix: str) -> Dict[str, Table]:
+    """Compile one version of a schema source; a missing or unparsable version has no tables."""
+    if content is None:
+        return {}
+    with tempfile.TemporaryDirectory() as scratch:
+        path = Path(scratch) / f"schema{suffix}"
+        path.write_bytes(content)
+        try:
+            return SchemaCatalog.compile([path]).tables
+        except (ValueError, KeyError, TypeError):
+            return {}
+
+
+def _signature(table: Table) -> Tuple[Tuple[str, str], ...]:
+    return tuple((column.name.lower(), column.data_type) for column in table.columns.values())
+
+
+def changed_tables(old: Optional[bytes], new: bytes, suffix: str) -> Set[str]:
+    """Tables added, dropped or with different columns between two versions of a schema source."""
+    before, after = _compile(old, suffix), _compile(new, suffix)
+    tables: Set[str] = set()
+    for key in before.keys() | after.keys():
+        old_table, new_table = before.get(key), after.get(key)
+        if old_table is None or new_table is None or _signature(old_table) != _signature(new_table):
+            tables.add((new_table or old_table).name)
+    return tables
+
+
+def _mentions(path: Path, pattern: "re.Pattern[str]") -> bool:
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as handle:
+            return any(pattern.search(line) for line in handle)
+    except OSError:
+        return False
+
+
+def select_changed(
+    candidates: Sequence[Path],
+    schema_sources: Iterable[Path] = (),
+    since: Optional[str] = None,
+    staged: bool = False,
+) -> ChangedFiles:
+    """Narrow `candidates` (the files a full run would scan) to what git says changed.
+
+    `schema_sources` are the files the tool builds its schema from; any of
+    them (or of `WATCHED_SCHEMA`) being changed widens the selection to the
+    candidates that mention an affected table.
+    """
+    if not candidates:
+        return ChangedFiles([], 0, [], set())
+    root = repo_root(Path(candidates[0]).resolve())
+    changed = {path.resolve() for path in changed_paths(root, since, staged)}
+
+    watched = {Path(source).resolve() for source in [*schema_sources, *WATCHED_SCHEMA]}
+    schema_files = sorted(path for path in changed if path in watched)
+    tables: Set[str] = set()
+    for path in schema_files:
+        tables |= changed_tables(_old_version(root, path, since, staged), _new_version(root, path, staged), path.suffix)
+
+    hint = None
+    if tables:
+        hint = re.compile(rf"\b(?:{'|'.join(re.escape(name) for name in sorted(tables))})\b", re.IGNORECASE)
+    files: List[Path] = []
+    changed_count = 0
+    for candidate in candidates:
+        if candidate.resolve() in changed:
+            files.append(candidate)
+            changed_count += 1
+        elif hint is not None and _mentions(candidate, hint):
+            files.append(candidate)
+    return ChangedFiles(files, changed_count, schema_files, tables)
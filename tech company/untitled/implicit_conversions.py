@@ -0,0 +1,253 @@
+"""Predicates that make SQL Server convert a column before comparing it.
+
+When the two sides of a comparison have different types, SQL Server
+converts the side with the lower data type precedence. If that side is the
+column, every row's value is converted and an index on the column can no
+longer be seeked: `e.PostalCode = 12345` turns an NVARCHAR column into
+numbers (and fails on the first postal code with a letter in it), a VARCHAR
+column compared with `N'...'` is widened to NVARCHAR, and a join between a
+string key and an INT key converts the string side. `LIKE` only matches
+strings, so `e.HireDate LIKE '2024%'` turns every date into text. Writing
+the conversion out (`CONVERT(VARCHAR(10), o.OrderDate, 120) = '2024-03-01'`)
+has the same effect. Casting a date/time column to DATE is the exception
+the optimizer handles with a range seek, so it is not reported, and a
+cast to the type the column already has is only noted as redundant.
+
+`check_comparison` looks at one `sql_predicates.Comparison` and needs a
+`resolve` callable that maps a column token to its declared type.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Callable, Iterator, Optional
+
+from findings import CONVERTED_COLUMN, IMPLICIT_CONVERSION, REDUNDANT_CAST
+from sql_lexer import NUMBER, STRING, Token
+from sql_predicates import ColumnType, Comparison, Operand, PredicateFinding, Resolver
+
+# Type families, from the point of view of implicit conversion.
+ANSI = "ansi"  # CHAR, VARCHAR, TEXT
+UNICODE = "unicode"  # NCHAR, NVARCHAR, NTEXT
+NUMERIC = "numeric"
+TEMPORAL = "temporal"
+GUID = "guid"
+BINARY = "binary"
+OTHER = "other"
+
+FAMILIES = {
+    "CHAR": ANSI, "VARCHAR": ANSI, "TEXT": ANSI,
+    "NCHAR": UNICODE, "NVARCHAR": UNICODE, "NTEXT": UNICODE, "SYSNAME": UNICODE,
+    "BIT": NUMERIC, "TINYINT": NUMERIC, "SMALLINT": NUMERIC, "INT": NUMERIC, "BIGINT": NUMERIC,
+    "DECIMAL": NUMERIC, "NUMERIC": NUMERIC, "MONEY": NUMERIC, "SMALLMONEY": NUMERIC,
+    "FLOAT": NUMERIC, "REAL": NUMERIC,
+    "DATE": TEMPORAL, "DATETIME": TEMPORAL, "DATETIME2": TEMPORAL, "SMALLDATETIME": TEMPORAL,
+    "DATETIMEOFFSET": TEMPORAL, "TIME": TEMPORAL,
+    "UNIQUEIDENTIFIER": GUID,
+    "BINARY": BINARY, "VARBINARY": BINARY, "IMAGE": BINARY, "ROWVERSION": BINARY, "TIMESTAMP": BINARY,
+}
+STRING_FAMILIES = (ANSI, UNICODE)
+CONVERSION_FUNCTIONS = {"CAST", "CONVERT", "TRY_CAST", "TRY_CONVERT"}
+_TYPE_NAME = re.compile(r"\[?(\w+)")
+_YEAR_PATTERN = re.compile(r"N?'(\d{4})%'", re.IGNORECASE)
+
+
+def type_family(data_type: str) -> str:
+    """`NVARCHAR(100)` -> UNICODE; OTHER for empty or unknown types (XML, user-defined types)."""
+    match = _TYPE_NAME.match(data_type.strip())
+    return FAMILIES.get(match.group(1).upper(), OTHER) if match else OTHER
+
+
+def _same_type(left: str, right: str) -> bool:
+    """`DECIMAL(10, 2)` and `decimal(10,2)` name the same type."""
+    return "".join(left.split()).upper() == "".join(right.split()).upper()
+
+
+def literal_family(token: Token) -> str:
+    if token.kind == STRING:
+        return UNICODE if token.text[:1] in ("N", "n") else ANSI
+    if token.kind == NUMBER:
+        return BINARY if token.text[:2].lower() == "0x" else NUMERIC
+    return OTHER
+
+
+def _converted(column: str, other: str) -> bool:
+    """True when comparing a `column`-family value with an `other`-family one converts the column."""
+    if column == ANSI:
+        return other in (UNICODE, NUMERIC, TEMPORAL, GUID)
+    if column == UNICODE:
+        return other in (NUMERIC, TEMPORAL, GUID)
+    if column == NUMERIC:
+        return other == TEMPORAL
+    return False
+
+
+def rewrite(comparison: Comparison, sql: str, replace: Callable[[Operand], Optional[str]]) -> str:
+    """The comparison as written, with every operand `replace` has a new text for replaced."""
+    def text(operand: Operand) -> str:
+        replaced = replace(operand)
+        return operand.text(sql) if replaced is None else replaced
+
+    left, operator, right = text(comparison.left), comparison.operator, [text(value) for value in comparison.right]
+    if operator.endswith("IN"):
+        return f"{left} {operator} ({', '.join(right)})"
+    if operator.endswith("BETWEEN"):
+        return f"{left} {operator} {right[0]} AND {right[1]}"
+    return f"{left} {operator} {right[0]}"
+
+
+def _literal_of(family: str) -> Callable[[Operand], Optional[Token]]:
+    def literal(operand: Operand) -> Optional[Token]:
+        token = operand.literal
+        return token if token is not None and literal_family(token) == family else None
+
+    return literal
+
+
+def check_comparison(comparison: Comparison, resolve: Resolver, sql: str) -> Iterator[PredicateFinding]:
+    """Yield a finding for every column the comparison converts, implicitly or with CAST/CONVERT."""
+    operands = (comparison.left, *comparison.right)
+    for operand in operands:
+        finding = _explicit_conversion(operand, resolve, sql)
+        if finding is not None:
+            yield finding
+
+    if comparison.operator in ("LIKE", "NOT LIKE"):
+        # LIKE compares strings: a date or number column is converted to text, and a VARCHAR column is
+        # converted only by a Unicode pattern.
+        pairs = [(comparison.left, comparison.right[0])]
+    else:
+        pairs = [(comparison.left, value) for value in comparison.right]
+        pairs += [(value, comparison.left) for value in comparison.right]
+    reported = set()  # an IN list of numbers against one string column is one finding
+    for column_operand, other in pairs:
+        finding = _implicit_conversion(column_operand, other, comparison, resolve, sql)
+        if finding is not None and finding.token.start not in reported:
+            reported.add(finding.token.start)
+            yield finding
+
+
+def _implicit_conversion(
+    operand: Operand, other: Operand, comparison: Comparison, resolve: Resolver, sql: str
+) -> Optional[PredicateFinding]:
+    token = operand.column
+    resolved = resolve(token) if token is not None else None
+    if resolved is None:
+        return None
+    family = type_family(resolved.data_type)
+    if comparison.operator in ("LIKE", "NOT LIKE") and family not in (*STRING_FAMILIES, OTHER):
+        return _non_string_like(token, resolved, family, other, comparison, sql)
+    literal = other.literal
+    if literal is not None:
+        other_family = literal_family(literal)
+        if comparison.operator in ("LIKE", "NOT LIKE") and other_family != UNICODE:
+            return None
+        if not _converted(family, other_family):
+            return None
+        value = other.text(sql)
+        numbers = _literal_of(NUMERIC)
+        unicode = _literal_of(UNICODE)
+        if family in STRING_FAMILIES and other_family == NUMERIC:
+            problem = (
+                f"{resolved.data_type} column {token.text} is compared with the number {value}, so SQL Server "
+                "converts the column to a number on every row (an index scan, and a conversion error on the "
+                "first value that is not numeric)"
+            )
+            quoted = rewrite(comparison, sql, lambda operand: f"'{operand.text(sql)}'" if numbers(operand) else None)
+            suggestion = f"Compare with string literals: {quoted}"
+        elif family == ANSI and other_family == UNICODE:
+            problem = (
+                f"{resolved.data_type} column {token.text} is compared with the Unicode literal {value}, so "
+                "SQL Server converts the column to NVARCHAR on every row"
+            )
+            plain = rewrite(comparison, sql, lambda operand: operand.text(sql)[1:] if unicode(operand) else None)
+            suggestion = f"Drop the N prefix: {plain}"
+        else:
+            problem = (
+                f"{resolved.data_type} column {token.text} is compared with {value}, a value of another type, "
+                "so SQL Server converts the column on every row"
+            )
+            suggestion = f"Compare {token.text} with a {resolved.data_type} literal (dates as 'YYYYMMDD')"
+        return PredicateFinding(IMPLICIT_CONVERSION.id, token, resolved.table, resolved.column, problem, suggestion)
+
+    other_token = other.column
+    other_resolved = resolve(other_token) if other_token is not None else None
+    if other_resolved is None:
+        return None
+    if not _converted(family, type_family(other_resolved.data_type)):
+        return None
+    kind = "joined to" if comparison.clause == "ON" else "compared with"
+    problem = (
+        f"{resolved.data_type} column {token.text} is {kind} {other_resolved.data_type} column "
+        f"{other_token.text}, so SQL Server converts {token.text} on every row and cannot seek an index on it"
+    )
+    suggestion = (
+        f"Give {resolved.table}.{resolved.column} and {other_resolved.table}.{other_resolved.column} the same "
+        "data type, or convert the other side explicitly"
+    )
+    return PredicateFinding(IMPLICIT_CONVERSION.id, token, resolved.table, resolved.column, problem, suggestion)
+
+
+def _non_string_like(
+    token: Token, resolved: ColumnType, family: str, pattern: Operand, comparison: Comparison, sql: str
+) -> PredicateFinding:
+    """`e.HireDate LIKE '2024%'`: LIKE only compares strings, so the column is converted to text on every row."""
+    text = "text (in a format that depends on the session's language settings)" if family == TEMPORAL else "text"
+    problem = (
+        f"{resolved.data_type} column {token.text} is matched with {comparison.operator} {pattern.text(sql)}, so "
+        f"SQL Server converts every value to {text} and cannot seek an index on it"
+    )
+    literal = pattern.literal
+    year = _YEAR_PATTERN.fullmatch(literal.text) if literal is not None and literal.kind == STRING else None
+    if family == TEMPORAL and year is not None and comparison.operator == "LIKE":
+        start = int(year.group(1))
+        suggestion = f"Compare with a date range: {token.text} >= '{start}0101' AND {token.text} < '{start + 1}0101'"
+    elif family == TEMPORAL:
+        suggestion = f"Compare with a date range: {token.text} >= 'YYYYMMDD' AND {token.text} < 'YYYYMMDD'"
+    else:
+        suggestion = f"Compare {token.text} with {resolved.data_type} values (=, BETWEEN or IN) instead of a pattern"
+    return PredicateFinding(IMPLICIT_CONVERSION.id, token, resolved.table, resolved.column, problem, suggestion)
+
+
+def _explicit_conversion(operand: Operand, resolve: Resolver, sql: str) -> Optional[PredicateFinding]:
+    call = operand.call()
+    if call is None or call[0] not in CONVERSION_FUNCTIONS:
+        return None
+    name, arguments = call
+    if name.endswith("CAST"):
+        if len(arguments) != 1:
+            return None
+        tokens = arguments[0].tokens
+        split = next((index for index, token in enumerate(tokens) if token.text.upper() == "AS"), -1)
+        if split != 1:
+            return None
+        expression, target = Operand(tokens[:1]), Operand(tokens[2:])
+    else:
+        if len(arguments) < 2:
+            return None
+        target, expression = arguments[0], arguments[1]
+    token = expression.column
+    resolved = resolve(token) if token is not None else None
+    if resolved is None or not target.tokens:
+        return None
+    family = type_family(resolved.data_type)
+    target_type = target.text(sql).upper()
+    if _same_type(target_type, resolved.data_type):
+        problem = f"{operand.text(sql)} casts the {resolved.data_type} column {token.text} to the type it already has"
+        suggestion = f"Drop the {name}: compare {token.text} itself"
+        return PredicateFinding(REDUNDANT_CAST.id, token, resolved.table, resolved.column, problem, suggestion)
+    if family == TEMPORAL and type_family(target_type) == TEMPORAL and _TYPE_NAME.match(target_type).group(1) == "DATE":
+        return None  # CAST(datetime AS DATE) is still answered with an index range seek.
+
+    problem = (
+        f"{operand.text(sql)} converts the {resolved.data_type} column {token.text} to {target_type} on every "
+        "row, so an index on it cannot be seeked"
+    )
+    if family == TEMPORAL and type_family(target_type) in STRING_FAMILIES:
+        suggestion = (
+            f"Compare the column with a date range instead of its text: "
+            f"{token.text} >= 'YYYYMMDD' AND {token.text} < 'YYYYMMDD' (the day after)"
+        )
+    else:
+        suggestion = f"Compare {token.text} itself with a {resolved.data_type} value and convert the value instead"
+    return PredicateFinding(CONVERTED_COLUMN.id, token, resolved.table, resolved.column, problem, suggestion)
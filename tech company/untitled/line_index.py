@@ -0,0 +1,45 @@
+"""Offset-to-line lookups for markdown files and SQL blocks.
+
+Every tool reports findings by line number. Counting newlines from the start
+of the text for each match is quadratic on the large all-in-one lessons, so
+`LineIndex` records where each line starts once and answers lookups with a
+binary search.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_right
+from typing import List
+
+
+class LineIndex:
+    """Line-start table for one piece of text, built in a single pass."""
+
+    __slots__ = ("text", "starts")
+
+    def __init__(self, text: str):
+        self.text = text
+        starts: List[int] = [0]
+        find = text.find
+        position = find("\n")
+        while position != -1:
+            starts.append(position + 1)
+            position = find("\n", position + 1)
+        self.starts = starts
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def line_of(self, offset: int) -> int:
+        """Return the 0-based line containing `offset`."""
+        return bisect_right(self.starts, offset) - 1
+
+    def line_number(self, offset: int) -> int:
+        """Return the 1-based line number containing `offset`."""
+        return bisect_right(self.starts, offset)
+
+    def line_text(self, line: int) -> str:
+        """Return the text of 0-based `line` without its newline."""
+        start = self.starts[line]
+        end = self.starts[line + 1] - 1 if line + 1 < len(self.starts) else len(self.text)
+        return self.text[start:end]
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""Foreign-key dependency graph and load-wave planner for the setup schemas.
+
+The setup scripts create and fill their tables one after another, in an
+order someone worked out by hand. `ForeignKeyGraph` builds the dependency
+graph from the schema catalog (`FOREIGN KEY ... REFERENCES` clauses, inline
+`REFERENCES` and `ALTER TABLE ... ADD ... FOREIGN KEY`), and `plan_loads`
+turns it into:
+
+* load waves - every table's parents are in earlier waves, so the tables of
+  one wave can be loaded concurrently (all the lookup tables go in wave 1);
+* the drop order - the waves reversed, children before parents;
+* cycles - a self-reference (`Employees.ReportsToEmployeeID`) only needs
+  the referenced rows loaded first, or the column filled in afterwards; a
+  cycle through several tables (`Departments.ManagerEmployeeID` and
+  `Employees.DepartmentID`) is broken by deferring a nullable foreign key:
+  load the table with that column NULL, or with the constraint disabled,
+  and add or re-check the constraint once both tables are loaded. A cycle
+  with no nullable foreign key is reported as unresolved.
+
+Run it directly to print the plan for the TechCorp and CBL schemas (or any
+catalog sources), as text or as JSON for a loader to consume.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Set
+
+from schema_catalog import ForeignKey, SchemaCatalog, Table, load_catalog, normalize_table_name
+
+_HERE = Path(__file__).resolve().parent
+DEFAULT_SCHEMAS = (
+    _HERE.parent / "00_TechCorp_MASTER_Setup.sql",
+    _HERE.parent.parent / "lesotho" / "00_CBL_DataWarehouse_Setup.sql",
+)
+
+
+@dataclass
+class Dependency:
+    child: str  # table names as the catalog spells them
+    parent: str
+    foreign_key: ForeignKey
+    nullable: bool  # every referencing column allows NULL
+
+    def describe(self) -> str:
+        columns = ", ".join(self.foreign_key.columns)
+        return f"{self.child}.{columns} -> {self.parent}"
+
+
+class ForeignKeyGraph:
+    """Tables (a catalog or part of one) and the foreign keys between them, keyed by lower-case table name."""
+
+    def __init__(self, tables: Iterable[Table]):
+        tables = list(tables)
+        lookup = {table.key: table for table in tables}
+        self.names: Dict[str, str] = {table.key: table.name for table in tables}
+        self.dependencies: List[Dependency] = []
+        self.dangling: List[str] = []  # references to tables outside the graph
+        for table in tables:
+            for foreign_key in table.foreign_keys:
+                parent = lookup.get(normalize_table_name(foreign_key.ref_table))
+                if parent is None:
+                    self.dangling.append(f"{table.name}.{', '.join(foreign_key.columns)} -> {foreign_key.ref_table}")
+                    continue
+                nullable = all(
+                    column is None or column.nullable for column in map(table.column, foreign_key.columns)
+                )
+                self.dependencies.append(Dependency(table.name, parent.name, foreign_key, nullable))
+
+    def parents(self, dependencies: Optional[Sequence[Dependency]] = None) -> Dict[str, Set[str]]:
+        """table key -> keys of the tables it references, self-references left out."""
+        parents: Dict[str, Set[str]] = {key: set() for key in self.names}
+        for dependency in self.dependencies if dependencies is None else dependencies:
+            child, parent = dependency.child.lower(), dependency.parent.lower()
+            if child != parent:
+                parents[child].add(parent)
+        return parents
+
+    def cycles(self) -> List[List[str]]:
+        """Self-references and strongly connected groups of tables, in catalog order."""
+        cycles = [
+            [dependency.child]
+            for dependency in self.dependencies
+            if dependency.child.lower() == dependency.parent.lower()
+        ]
+        cycles = [cycle for index, cycle in enumerate(cycles) if cycle not in cycles[:index]]
+        order = list(self.names)
+        for component in _strongly_connected(self.parents()):
+            if len(component) > 1:
+                cycles.append([self.names[key] for key in sorted(component, key=order.index)])
+        return cycles
+
+
+def _strongly_connected(parents: Dict[str, Set[str]]) -> List[Set[str]]:
+    """Tarjan's algorithm, iteratively, so a long chain of tables cannot hit the recursion limit."""
+    index: Dict[str, int] = {}
+    low: Dict[str, int] = {}
+    stack: List[str] = []
+    on_stack: Set[str] = set()
+    components: List[Set[str]] = []
+    counter = 0
+
+    for root in parents:
+        if root in index:
+            continue
+        work = [(root, iter(sorted(parents[root])))]
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+        while work:
+            node, children = work[-1]
+            child = next(children, None)
+            if child is not None:
+                if child not in index:
+                    index[child] = low[child] = counter
+                    counter += 1
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, iter(sorted(parents[child]))))
+                elif child in on_stack:
+                    low[node] = min(low[node], index[child])
+                continue
+            work.pop()
+            if work:
+                low[work[-1][0]] = min(low[work[-1][0]], low[node])
+            if low[node] == index[node]:
+                component = set()
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.add(member)
+                    if member == node:
+                        break
+                components.append(component)
+    return components
+
+
+@dataclass
+class LoadPlan:
+    waves: List[List[str]]
+    cycles: List[List[str]] = field(default_factory=list)
+    deferred: List[Dependency] = field(default_factory=list)  # foreign keys to add or re-check after the load
+    unresolved: List[List[str]] = field(default_factory=list)  # cycles no nullable foreign key breaks
+    dangling: List[str] = field(default_factory=list)
+
+    @property
+    def drop_waves(self) -> List[List[str]]:
+        return list(reversed(self.waves))
+
+    @property
+    def load_order(self) -> List[str]:
+        return [table for wave in self.waves for table in wave]
+
+    def to_json(self) -> Dict[str, object]:
+        return {
+            "waves": self.waves,
+            "drop_waves": self.drop_waves,
+            "cycles": self.cycles,
+            "deferred": [
+                {
+                    "table": dependency.child,
+                    "columns": list(dependency.foreign_key.columns),
+                    "references": dependency.parent,
+                }
+                for dependency in self.deferred
+            ],
+            "unresolved": self.unresolved,
+            "dangling": self.dangling,
+        }
+
+
+def plan_loads(graph: ForeignKeyGraph) -> LoadPlan:
+    """Group the tables into waves, deferring nullable foreign keys until no cycle is left."""
+    plan = LoadPlan([], cycles=graph.cycles(), dangling=list(graph.dangling))
+    active = list(graph.dependencies)
+    while True:
+        groups = [component for component in _strongly_connected(graph.parents(active)) if len(component) > 1]
+        if not groups:
+            break
+        group = groups[0]
+        inside = [
+            dependency
+            for dependency in active
+            if dependency.child.lower() in group and dependency.parent.lower() in group
+            and dependency.child.lower() != dependency.parent.lower()
+        ]
+        breaker = next((dependency for dependency in inside if dependency.nullable), None)
+        if breaker is None:
+            plan.unresolved.append([graph.names[key] for key in graph.names if key in group])
+            breaker = inside[0]
+        else:
+            plan.deferred.append(breaker)
+        active.remove(breaker)
+
+    parents = graph.parents(active)
+    remaining = list(graph.names)
+    placed: Set[str] = set()
+    while remaining:
+        wave = [key for key in remaining if parents[key] <= placed]
+        plan.waves.append([graph.names[key] for key in wave])
+        placed.update(wave)
+        remaining = [key for key in remaining if key not in placed]
+    return plan
+
+
+def plan_catalog(catalog: SchemaCatalog) -> LoadPlan:
+    return plan_loads(ForeignKeyGraph(catalog))
+
+
+def format_plan(plan: LoadPlan) -> List[str]:
+    lines = ["Load waves (the tables of a wave can load concurrently):"]
+    lines += [f"  {number}. {', '.join(wave)}" for number, wave in enumerate(plan.waves, start=1)]
+    lines.append("Drop order (children first):")
+    lines += [f"  {number}. {', '.join(wave)}" for number, wave in enumerate(plan.drop_waves, start=1)]
+    if plan.cycles:
+        lines.append("Cycles:")
+        for cycle in plan.cycles:
+            if len(cycle) == 1:
+                lines.append(f"  {cycle[0]} -> {cycle[0]} (self-reference; load referenced rows first)")
+            else:
+                lines.append(f"  {' <-> '.join(cycle)}")
+    for dependency in plan.deferred:
+        lines.append(
+            f"  deferred: {dependency.describe()} (load with NULLs or the constraint disabled, "
+            "then add or re-check it after both tables are loaded)"
+        )
+    for cycle in plan.unresolved:
+        lines.append(f"  ❌ no nullable foreign key breaks {' <-> '.join(cycle)}; disable its constraints to load it")
+    for reference in plan.dangling:
+        lines.append(f"  ⚠️  {reference} references a table outside the plan")
+    return lines
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Plan the load and drop order of a schema's tables")
+    parser.add_argument(
+        "sources",
+        nargs="*",
+        type=Path,
+        help="Schema sources of one catalog, in load order (default: the TechCorp master and CBL scripts, each "
+        "planned on its own)",
+    )
+    parser.add_argument("--json", action="store_true", help="Print the plan(s) as JSON")
+    args = parser.parse_args()
+
+    if args.sources:
+        catalogs = [load_catalog(args.sources)]
+    else:
+        catalogs = [load_catalog([source]) for source in DEFAULT_SCHEMAS]
+    plans = [(Path(catalog.sources[0]).name, catalog, plan_catalog(catalog)) for catalog in catalogs]
+    if args.json:
+        print(json.dumps({name: plan.to_json() for name, _, plan in plans}, indent=2))
+    else:
+        for name, catalog, plan in plans:
+            print(f"{name}: {len(catalog)} tables, {len(plan.waves)} waves")
+            for line in format_plan(plan):
+                print(line)
+            print()
+    return 1 if any(plan.unresolved for _, _, plan in plans) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
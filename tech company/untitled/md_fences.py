@@ -0,0 +1,136 @@
+"""Streaming fenced-code-block scanner shared by the column tools.
+
+The tools used to find SQL blocks three different ways: a lazy
+```` ```[\\s\\S]*?``` ```` regex over the whole file (fixer and
+fix_customer_columns.py) and a line-splitting state machine that only knew
+```` ```sql ```` (validator). `iter_fences` replaces all of them. It reads a
+file one line at a time and yields each fenced block as soon as its closing
+fence is seen, following the CommonMark rules that matter for the labs:
+
+* fences are three or more backticks or tildes, optionally indented or
+  opening a list item (``2. ```sql``), and are closed by a fence of the same character that
+  is at least as long and carries nothing but whitespace;
+* the language is the first word of the info string, lowercased;
+* a fence that is never closed runs to the end of the file.
+
+Bodies are returned verbatim, indentation and line endings included, and
+`span` gives their character offsets in the file, so `rewrite_fences` can
+splice new bodies back in with the same streaming read.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from stage_profile import PROFILER
+
+# Languages every tool treats as SQL; an untagged fence is assumed to be SQL.
+SQL_LANGS = frozenset({"", "sql", "tsql", "t-sql", "mssql"})
+
+# Leading whitespace and an optional list marker ("2. ```sql") before the fence.
+_OPENING = re.compile(r"^[ \t]*(?:(?:[-*+]|\d{1,9}[.)])[ \t]+)?(?P<fence>`{3,}|~{3,})(?P<info>[^\r\n]*)")
+
+PathLike = Union[str, Path]
+Span = Tuple[int, int]
+
+
+class Fence(NamedTuple):
+    lang: str
+    body: str
+    start_line: int  # 1-based line of the opening fence; the body starts on the next line
+    span: Span  # character offsets of `body` in the file
+    info: str = ""  # the opening fence's info string as written
+    closed: bool = True
+
+    @property
+    def body_line(self) -> int:
+        return self.start_line + 1
+
+
+def _closes(line: str, char: str, length: int) -> bool:
+    stripped = line.strip()
+    return len(stripped) >= length and stripped == char * len(stripped)
+
+
+def iter_fences(lines: Iterable[str]) -> Iterator[Fence]:
+    """Yield the fenced blocks in `lines`, which must keep their line endings."""
+    offset = 0
+    line_number = 0
+    opening: Optional[Tuple[str, int, str, int]] = None  # char, length, info, line
+    body_start = 0
+    body: List[str] = []
+
+    for line in lines:
+        line_number += 1
+        if opening is None:
+            match = _OPENING.match(line)
+            # A backtick info string may not contain backticks (```x``` is inline code).
+            if match and not (match.group("fence")[0] == "`" and "`" in match.group("info")):
+                fence = match.group("fence")
+                opening = (fence[0], len(fence), match.group("info").strip(), line_number)
+                body_start = offset + len(line)
+                body = []
+        elif _closes(line, opening[0], opening[1]):
+            yield _fence(opening, body, body_start, closed=True)
+            opening = None
+        else:
+            body.append(line)
+        offset += len(line)
+
+    if opening is not None:
+        yield _fence(opening, body, body_start, closed=False)
+
+
+def _fence(opening: Tuple[str, int, str, int], body: List[str], body_start: int, closed: bool) -> Fence:
+    _, _, info, line_number = opening
+    text = "".join(body)
+    lang = info.split(None, 1)[0].lower() if info else ""
+    return Fence(lang, text, line_number, (body_start, body_start + len(text)), info, closed)
+
+
+def read_fences(path: PathLike) -> Iterator[Fence]:
+    """Stream the fenced blocks of the markdown file at `path`."""
+    # newline="" keeps "\r\n" intact so spans line up with the file's characters.
+    if PROFILER.enabled:
+        # Read up front so reading and fence scanning are timed apart.
+        with PROFILER.stage("read"), open(path, "r", encoding="utf-8", newline="") as handle:
+            lines = handle.readlines()
+        yield from PROFILER.iterate("fences", iter_fences(lines))
+        return
+    with open(path, "r", encoding="utf-8", newline="") as handle:
+        yield from iter_fences(handle)
+
+
+def sql_fences(path: PathLike) -> Iterator[Fence]:
+    """Stream only the blocks whose language is in `SQL_LANGS`."""
+    return (fence for fence in read_fences(path) if fence.lang in SQL_LANGS)
+
+
+def rewrite_fences(path: PathLike, replacements: Dict[Span, str]) -> None:
+    """Replace the bodies at the given spans, streaming the file through a temp copy."""
+    if not replacements:
+        return
+    with PROFILER.stage("write"):
+        path = Path(path)
+        pending = sorted(replacements.items(), reverse=True)
+        temp_path = path.with_name(path.name + ".tmp")
+        position = 0
+        skip_until = 0
+        with open(path, "r", encoding="utf-8", newline="") as source, open(
+            temp_path, "w", encoding="utf-8", newline=""
+        ) as target:
+            # Bodies always cover whole lines, so a replacement starts where a
+            # line starts and swallows every line before its end offset.
+            for line in source:
+                while pending and pending[-1][0][0] == position:
+                    (_, skip_until), body = pending.pop()
+                    target.write(body)
+                if position >= skip_until:
+                    target.write(line)
+                position += len(line)
+            for _, body in reversed(pending):
+                target.write(body)
+        os.replace(temp_path, path)
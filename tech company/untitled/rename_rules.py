@@ -0,0 +1,141 @@
+"""Data-driven column rename rules for the lab fixers.
+
+Renamed and removed columns used to be hard-coded: lambdas for the
+Customers table in fix_customer_columns.py, and one-off regex passes in the
+archived PowerShell fixers. They now live in `column_renames.json`, a list
+in the same shape as Results.json:
+
+    [
+      {"TableName": "Customers", "OldName": "ContactName",
+       "NewName": "CONCAT({alias}.ContactFirstName, ' ', {alias}.ContactLastName)",
+       "Scope": ["alias", "bare"], "Label": "ContactName -> ContactFirstName+LastName",
+       "Rule": "COL004"},
+      ...
+    ]
+
+`NewName` is either a column name or a template in which `{alias}` stands
+for the qualifier the reference was written with. Scope `alias` applies the
+rule to qualified references (`c.CompanyName`) whose qualifier resolves to
+the table, `bare` to unqualified names in a statement that reads the table
+without an alias (`SELECT CompanyName FROM Customers`). `Label` names the
+bare rewrite in reports and `Rule` picks the finding ID (default COL007).
+
+`RenameRules` compiles the list into hash lookups keyed by table and old
+name, so one walk over a block's tokens applies every rule at once, however
+many there are.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Pattern, Tuple, Union
+
+from findings import COLUMN_RENAME, RULES_BY_ID
+
+RULES_FILE_NAME = "column_renames.json"
+DEFAULT_RULES_PATH = Path(__file__).resolve().parent / RULES_FILE_NAME
+
+ALIAS = "alias"
+BARE = "bare"
+SCOPES = (ALIAS, BARE)
+ALIAS_PLACEHOLDER = "{alias}"
+
+
+@dataclass(frozen=True)
+class RenameRule:
+    table: str
+    old: str
+    new: str
+    scopes: Tuple[str, ...] = (ALIAS,)
+    label: str = ""
+    finding: str = COLUMN_RENAME.id
+
+    @property
+    def table_key(self) -> str:
+        return self.table.lower()
+
+    @property
+    def old_key(self) -> str:
+        return self.old.lower()
+
+    def render(self, alias: Optional[str]) -> str:
+        """Return the replacement text, qualified with `alias` or bare when it is None."""
+        template = self.new if ALIAS_PLACEHOLDER in self.new else f"{ALIAS_PLACEHOLDER}.{self.new}"
+        if alias is None:
+            return template.replace(f"{ALIAS_PLACEHOLDER}.", "")
+        return template.replace(ALIAS_PLACEHOLDER, alias)
+
+    @property
+    def description(self) -> str:
+        return self.label or f"{self.old} -> {self.render(None)}"
+
+
+class RenameRules:
+    """Every rename rule, indexed for single-pass lookups while walking tokens."""
+
+    def __init__(self, rules: Iterable[RenameRule] = ()):
+        self.rules: List[RenameRule] = list(rules)
+        self._alias: Dict[Tuple[str, str], RenameRule] = {}
+        # Bare rules keep the file order per table; reports list them that way.
+        self._bare: Dict[str, Dict[str, Tuple[int, RenameRule]]] = {}
+
+        for rule in self.rules:
+            if ALIAS in rule.scopes:
+                self._alias[(rule.table_key, rule.old_key)] = rule
+            if BARE in rule.scopes:
+                table_rules = self._bare.setdefault(rule.table_key, {})
+                table_rules[rule.old_key] = (len(table_rules), rule)
+
+        self.bare_hint: Optional[Pattern[str]] = None
+        if self._bare:
+            names = "|".join(re.escape(table) for table in sorted(self._bare))
+            self.bare_hint = re.compile(rf"\b(?:{names})\b", re.IGNORECASE)
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def alias_rule(self, table_key: str, column_key: str) -> Optional[RenameRule]:
+        return self._alias.get((table_key, column_key))
+
+    def bare_rules(self, table_key: str) -> Dict[str, Tuple[int, RenameRule]]:
+        """Map of old name -> (position, rule) for `table_key`'s bare-scope rules."""
+        return self._bare.get(table_key, {})
+
+    @property
+    def bare_tables(self) -> Iterable[str]:
+        return self._bare.keys()
+
+    def mentions_bare_table(self, sql: str) -> bool:
+        """Cheap pre-check: can any bare rule apply to `sql` at all?"""
+        return self.bare_hint is not None and self.bare_hint.search(sql) is not None
+
+
+def _parse_rule(entry: Dict[str, object], where: str) -> RenameRule:
+    try:
+        table, old, new = entry["TableName"], entry["OldName"], entry["NewName"]
+    except KeyError as exc:
+        raise ValueError(f"{where}: missing {exc.args[0]}") from None
+    scopes = entry.get("Scope", [ALIAS])
+    if isinstance(scopes, str):
+        scopes = [scopes]
+    unknown = [scope for scope in scopes if scope not in SCOPES]
+    if unknown or not scopes:
+        raise ValueError(f"{where}: Scope must be a list drawn from {', '.join(SCOPES)}")
+    finding = entry.get("Rule", COLUMN_RENAME.id)
+    if finding not in RULES_BY_ID:
+        raise ValueError(f"{where}: unknown finding rule {finding}")
+    return RenameRule(str(table), str(old), str(new), tuple(scopes), str(entry.get("Label", "")), finding)
+
+
+def load_rules(path: Union[str, Path] = DEFAULT_RULES_PATH) -> RenameRules:
+    """Read and compile a rules file; a missing file means no rules."""
+    path = Path(path)
+    if not path.is_file():
+        return RenameRules()
+    entries = json.loads(path.read_text(encoding="utf-8"))
+    if not isinstance(entries, list):
+        raise ValueError(f"{path}: expected a list of rules")
+    return RenameRules(_parse_rule(entry, f"{path} rule {index}") for index, entry in enumerate(entries, start=1))
@@ -0,0 +1,113 @@
+"""Constant-memory writers for the column tools' reports.
+
+The markdown reports open with totals that are only known once every file
+has been scanned, so the per-file sections are streamed into a `Spool` (a
+temporary file) while the scan runs and copied behind the summary at the
+end. `MarkdownStream` writes lines with the same result as
+`"\\n".join(lines).strip() + "\\n"` without keeping the lines around, while
+`JsonLinesWriter` and `SarifWriter` emit one record per finding as it is
+produced.
+"""
+
+from __future__ import annotations
+
+import json
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO
+
+
+class MarkdownStream:
+    """Write report lines one at a time, dropping leading and trailing blank lines."""
+
+    def __init__(self, handle: TextIO):
+        self.handle = handle
+        self._started = False
+        self._pending: List[str] = []
+
+    def write(self, line: str = "") -> None:
+        if not line.strip():
+            # Blank lines are only written once something follows them.
+            if self._started:
+                self._pending.append(line)
+            return
+        if self._started:
+            self.handle.write("\n")
+            for blank in self._pending:
+                self.handle.write(blank + "\n")
+        self._pending.clear()
+        self.handle.write(line)
+        self._started = True
+
+    def write_all(self, lines: Iterable[str]) -> None:
+        for line in lines:
+            self.write(line)
+
+    def finish(self) -> None:
+        self.handle.write("\n")
+
+
+class Spool:
+    """A report section parked in a temporary file until its heading can be written."""
+
+    def __init__(self):
+        self._file = tempfile.TemporaryFile("w+", encoding="utf-8")
+        self.lines = 0
+
+    def write(self, line: str = "") -> None:
+        self._file.write(line + "\n")
+        self.lines += 1
+
+    def __iter__(self) -> Iterator[str]:
+        self._file.flush()
+        self._file.seek(0)
+        for line in self._file:
+            yield line[:-1] if line.endswith("\n") else line
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class JsonLinesWriter:
+    """Append one JSON object per line to `path`."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._file: Optional[TextIO] = path.open("w", encoding="utf-8")
+        self.records = 0
+
+    def write(self, record: Dict[str, object]) -> None:
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.records += 1
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class SarifWriter:
+    """Stream SARIF 2.1.0 results without holding them: header, results, then the closing brackets."""
+
+    SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+
+    def __init__(self, path: Path, tool_name: str, rules: List[Dict[str, object]]):
+        self.path = path
+        self._file: Optional[TextIO] = path.open("w", encoding="utf-8")
+        self.records = 0
+        driver = {"name": tool_name, "rules": rules}
+        head = json.dumps({"version": "2.1.0", "$schema": self.SCHEMA, "runs": [{"tool": {"driver": driver}}]})
+        # Re-open the run object so results can be appended one at a time.
+        self._file.write(head[: -len("}]}")] + ', "results": [')
+
+    def write(self, result: Dict[str, object]) -> None:
+        if self.records:
+            self._file.write(",")
+        self._file.write("\n" + json.dumps(result, ensure_ascii=False))
+        self.records += 1
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.write("\n]}]}\n")
+            self._file.close()
+            self._file = None
@@ -0,0 +1,290 @@
+"""Predicates that stop SQL Server from seeking an index (non-sargable predicates).
+
+An index on a column can answer a WHERE or JOIN ... ON comparison with a
+seek only when the column stands alone on one side of it. The lessons'
+answers often hide the column instead, and every such pattern scans the
+whole table once it holds production volumes:
+
+* a function around the column (`YEAR(o.OrderDate) = 2024`, `UPPER(...)`,
+  `DATEDIFF(day, o.OrderDate, GETDATE()) <= 30`);
+* `ISNULL(col, x) = y` or `COALESCE(col, x) = y`;
+* arithmetic on the column side (`p.UnitPrice * 1.2 > 100`);
+* `LIKE` with a leading wildcard (`c.Email LIKE '%@gmail.com'`);
+* `OR` between conditions on different columns, which no single index
+  answers.
+
+Each finding comes with the sargable rewrite where one can be derived from
+the predicate (a date range for `YEAR(...) = 2024`, `LIKE 'abc%'` for
+`LEFT(col, 3) = 'abc'`) and with the general remedy otherwise. CAST and
+CONVERT around a column are reported by implicit_conversions.py, which
+knows when the optimizer can still seek.
+"""
+
+from __future__ import annotations
+
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+from findings import COLUMN_ARITHMETIC, LEADING_WILDCARD, NON_SARGABLE_FUNCTION, NULL_REPLACEMENT, OR_ACROSS_COLUMNS
+from implicit_conversions import CONVERSION_FUNCTIONS, rewrite
+from sql_lexer import NAME, NUMBER, OPERATOR, PUNCT, STRING, Token
+from sql_predicates import ARITHMETIC_OPERATORS, ColumnType, Comparison, Operand, PredicateFinding, Resolver
+
+SARGABLE_CLAUSES = ("WHERE", "ON")
+DATE_PART_FUNCTIONS = {"MONTH", "DAY", "DATEPART", "DATENAME", "EOMONTH", "DATEFROMPARTS"}
+DATE_ARITHMETIC_FUNCTIONS = {"DATEADD", "DATEDIFF", "DATEDIFF_BIG"}
+CASE_FUNCTIONS = {"UPPER", "LOWER"}
+TRIM_FUNCTIONS = {"LTRIM", "RTRIM", "TRIM"}
+NULL_FUNCTIONS = {"ISNULL", "COALESCE"}
+INVERSE_OPERATORS = {"+": "-", "-": "+", "*": "/", "/": "*"}
+# `DATEDIFF(unit, col, X) >= n` holds about when `col <= DATEADD(unit, -n, X)`: the comparison turns around.
+MIRRORED_OPERATORS = {">=": "<=", ">": "<", "<=": ">=", "<": ">"}
+COMPARISON_SIGNS = {"=", "<>", "!=", ">=", ">", "<=", "<"}
+# Range bounds that are equivalent to `YEAR(col) <operator> year`: (lower bound, upper bound) as year offsets.
+YEAR_BOUNDS = {"=": (0, 1), ">=": (0, None), ">": (1, None), "<": (None, 0), "<=": (None, 1)}
+
+
+def _columns(operand: Operand, resolve: Resolver) -> List[Tuple[Token, ColumnType]]:
+    """The schema columns an operand mentions, in order (function names are skipped)."""
+    found = []
+    tokens = operand.tokens
+    for index, token in enumerate(tokens):
+        if token.kind != NAME or (index + 1 < len(tokens) and tokens[index + 1].text == "("):
+            continue
+        resolved = resolve(token)
+        if resolved is not None:
+            found.append((token, resolved))
+    return found
+
+
+def _has_arithmetic(operand: Operand) -> bool:
+    """True when top-level arithmetic operators, a leading sign included (`-e.BaseSalary`), appear in the operand."""
+    depth = 0
+    for token in operand.tokens:
+        if token.kind == PUNCT:
+            depth += {"(": 1, ")": -1}.get(token.text, 0)
+        elif token.kind == OPERATOR and token.text in ARITHMETIC_OPERATORS and depth == 0:
+            return True
+    return False
+
+
+def check_sargability(comparison: Comparison, resolve: Resolver, sql: str) -> Iterator[PredicateFinding]:
+    """Yield a finding for every operand of a WHERE/ON comparison that hides a column from its index."""
+    if comparison.clause not in SARGABLE_CLAUSES:
+        return
+    if comparison.operator == "LIKE":
+        finding = _leading_wildcard(comparison, resolve, sql)
+        if finding is not None:
+            yield finding
+    for operand in (comparison.left, *comparison.right):
+        call = operand.call()
+        if call is not None and call[0] in CONVERSION_FUNCTIONS:
+            continue
+        columns = _columns(operand, resolve) if call is not None or _has_arithmetic(operand) else []
+        if not columns:
+            continue
+        others = [other for other in (comparison.left, *comparison.right) if other is not operand]
+        if comparison.clause == "WHERE" and any(_columns(other, resolve) for other in others):
+            continue  # column against column of the same row: no index seeks either side anyway
+        token, resolved = columns[0]
+        if call is not None:
+            yield _function_finding(comparison, operand, call[0], call[1], token, resolved, resolve, sql)
+        else:
+            yield _arithmetic_finding(comparison, operand, token, resolved, sql)
+
+
+def _leading_wildcard(comparison: Comparison, resolve: Resolver, sql: str) -> Optional[PredicateFinding]:
+    token = comparison.left.column
+    resolved = resolve(token) if token is not None else None
+    pattern = comparison.right[0].tokens[0]
+    if resolved is None or pattern.kind != STRING:
+        return None
+    body = pattern.text[pattern.text.index("'") + 1 :]
+    if not body[:1] or body[0] not in "%_[":
+        return None
+    problem = (
+        f"{token.text} LIKE {comparison.right[0].text(sql)} starts with a wildcard, so SQL Server has to read "
+        f"every {token.text} value instead of seeking to a prefix"
+    )
+    prefix = body.lstrip("%_").split("%")[0].rstrip("'")
+    anchored = f"{token.text} LIKE '{prefix}%'" if prefix and body[0] == "%" else f"{token.text} LIKE 'prefix%'"
+    suggestion = (
+        f"Anchor the pattern at the start ({anchored}) if the values allow it; for substring searches use a "
+        "full-text index (CONTAINS) or a persisted computed column such as REVERSE(...) for suffixes"
+    )
+    return PredicateFinding(LEADING_WILDCARD.id, token, resolved.table, resolved.column, problem, suggestion)
+
+
+def _function_finding(
+    comparison: Comparison,
+    operand: Operand,
+    name: str,
+    arguments: Sequence[Operand],
+    token: Token,
+    resolved: ColumnType,
+    resolve: Resolver,
+    sql: str,
+) -> PredicateFinding:
+    expression = operand.text(sql)
+    column = token.text
+    if name in NULL_FUNCTIONS and len(arguments) == 2 and arguments[0].column is not None:
+        problem = (
+            f"{expression} {comparison.operator} ... hides {column} inside {name}, so an index on it cannot be "
+            "seeked"
+        )
+        replacement, value = arguments[1], comparison.right[0] if operand is comparison.left else comparison.left
+        compared = rewrite(comparison, sql, lambda part: column if part is operand else None)
+        if (
+            comparison.operator == "="
+            and len(comparison.right) == 1
+            and value.literal is not None
+            and replacement.literal is not None
+        ):
+            if replacement.text(sql) == value.text(sql):
+                suggestion = f"Test the NULLs separately: ({compared} OR {column} IS NULL)"
+            else:
+                suggestion = f"Drop the {name}, the NULL rows never match {value.text(sql)}: {compared}"
+        else:
+            fallback = rewrite(comparison, sql, lambda part: replacement.text(sql) if part is operand else None)
+            suggestion = f"Test the NULLs separately: ({compared} OR ({column} IS NULL AND {fallback}))"
+        return PredicateFinding(NULL_REPLACEMENT.id, token, resolved.table, resolved.column, problem, suggestion)
+
+    problem = f"{expression} wraps {column} in {name}(), so SQL Server evaluates it for every row instead of seeking"
+    suggestion = _function_rewrite(comparison, operand, name, arguments, column, sql)
+    return PredicateFinding(NON_SARGABLE_FUNCTION.id, token, resolved.table, resolved.column, problem, suggestion)
+
+
+def _function_rewrite(
+    comparison: Comparison, operand: Operand, name: str, arguments: Sequence[Operand], column: str, sql: str
+) -> str:
+    on_left = operand is comparison.left
+    values = [value.literal for value in comparison.right]
+    if name == "YEAR" and on_left and all(value is not None and value.kind == NUMBER for value in values):
+        years = [int(float(value.text)) for value in values]
+        bounds: Optional[Tuple[Optional[int], Optional[int]]] = None
+        if comparison.operator in YEAR_BOUNDS:
+            lower, upper = YEAR_BOUNDS[comparison.operator]
+            bounds = (
+                None if lower is None else years[0] + lower,
+                None if upper is None else years[0] + upper,
+            )
+        elif comparison.operator == "BETWEEN":
+            bounds = (years[0], years[1] + 1)
+        if bounds is not None:
+            parts = []
+            if bounds[0] is not None:
+                parts.append(f"{column} >= '{bounds[0]}0101'")
+            if bounds[1] is not None:
+                parts.append(f"{column} < '{bounds[1]}0101'")
+            return f"Compare the column with a date range: {' AND '.join(parts)}"
+    if name in ("LEFT", "SUBSTRING") and on_left and comparison.operator == "=":
+        value = values[0]
+        starts_at_one = name == "LEFT" or (len(arguments) == 3 and arguments[1].text(sql) == "1")
+        if value is not None and value.kind == STRING and starts_at_one:
+            prefix = value.text[value.text.index("'") + 1 : -1]
+            quote = value.text[: value.text.index("'")]
+            return f"Use a prefix match, which seeks: {column} LIKE {quote}'{prefix}%'"
+    if name == "YEAR" or name in DATE_PART_FUNCTIONS:
+        return (
+            f"Compare {column} itself with a date range ({column} >= start AND {column} < end) instead of a part of it"
+        )
+    if name in DATE_ARITHMETIC_FUNCTIONS and on_left and len(arguments) == 3 and len(comparison.right) == 1:
+        unit, value = arguments[0].text(sql), comparison.right[0].text(sql)
+        if name == "DATEADD" and arguments[2].column is not None and comparison.operator in YEAR_BOUNDS:
+            amount = _negated(arguments[1].text(sql))
+            return (
+                f"Apply the date arithmetic to the other side: "
+                f"{column} {comparison.operator} DATEADD({unit}, {amount}, {value})"
+            )
+        if name != "DATEADD" and arguments[1].column is not None and comparison.operator in MIRRORED_OPERATORS:
+            amount = _negated(value)
+            return (
+                f"Apply the date arithmetic to the other side: {column} {MIRRORED_OPERATORS[comparison.operator]} "
+                f"DATEADD({unit}, {amount}, {arguments[2].text(sql)}) (DATEDIFF counts {unit} boundaries, so "
+                "check the edge of the range)"
+            )
+    if name in DATE_ARITHMETIC_FUNCTIONS:
+        return (
+            f"Move the date arithmetic to the other side so {column} stands alone, e.g. "
+            f"{column} >= DATEADD(day, -30, GETDATE()) instead of DATEDIFF(day, {column}, GETDATE()) <= 30"
+        )
+    bare = rewrite(comparison, sql, lambda part: column if part is operand else None)
+    if name in CASE_FUNCTIONS:
+        return f"Compare the column directly; the default collation is case-insensitive: {bare}"
+    if name in TRIM_FUNCTIONS:
+        return f"Trim the values when they are written and compare the column directly: {bare}"
+    return (
+        f"Leave {column} alone on one side and apply the inverse to the other side, or index a computed "
+        f"column for {operand.text(sql)}"
+    )
+
+
+def _negated(amount: str) -> str:
+    if not amount.strip("0."):
+        return amount
+    if amount.startswith("-"):
+        return amount[1:].strip()
+    return f"-{amount}" if amount.replace(".", "").isdigit() else f"-({amount})"
+
+
+def _arithmetic_finding(
+    comparison: Comparison, operand: Operand, token: Token, resolved: ColumnType, sql: str
+) -> PredicateFinding:
+    problem = f"{operand.text(sql)} computes with {token.text} on the column side, so its index cannot be seeked"
+    tokens = operand.tokens
+    suggestion = f"Move the arithmetic to the other side so {token.text} stands alone"
+    if operand is comparison.left and len(comparison.right) == 1 and len(tokens) == 2 and tokens[1] == token:
+        value = comparison.right[0].text(sql)
+        if tokens[0].text == "+":
+            suggestion = f"Drop the unary plus: {token.text} {comparison.operator} {value}"
+        elif comparison.operator in COMPARISON_SIGNS:
+            operator = MIRRORED_OPERATORS.get(comparison.operator, comparison.operator)
+            suggestion = f"Negate the other side instead: {token.text} {operator} {_negated(value)}"
+    elif (
+        operand is comparison.left
+        and len(comparison.right) == 1
+        and len(tokens) == 3
+        and tokens[0] == token
+        and tokens[1].text in INVERSE_OPERATORS
+        and tokens[2].kind == NUMBER
+    ):
+        operator = tokens[1].text
+        value = comparison.right[0].text(sql)
+        if len(comparison.right[0].tokens) > 1:
+            value = f"({value})"
+        if operator in ("+", "-") or float(tokens[2].text) > 0 or comparison.operator in ("=", "<>", "!="):
+            suggestion += f": {token.text} {comparison.operator} {value} {INVERSE_OPERATORS[operator]} {tokens[2].text}"
+    return PredicateFinding(COLUMN_ARITHMETIC.id, token, resolved.table, resolved.column, problem, suggestion)
+
+
+def check_disjunction(branches: Sequence[Sequence[Comparison]], resolve: Resolver) -> Optional[PredicateFinding]:
+    """A finding when OR joins branches that test no column in common (`a.x = 1 OR a.y = 2`)."""
+    tested: List[List[Tuple[Token, ColumnType]]] = []
+    for branch in branches:
+        columns = []
+        for comparison in branch:
+            for operand in (comparison.left, *comparison.right):
+                token = operand.column
+                resolved = resolve(token) if token is not None else None
+                if resolved is not None:
+                    columns.append((token, resolved))
+        if not columns:
+            return None  # `@Filter IS NULL OR ...` and the like: nothing to judge
+        tested.append(columns)
+    keys = [{(resolved.table.lower(), resolved.column.lower()) for _, resolved in columns} for columns in tested]
+    if set.intersection(*keys):
+        return None
+    token, resolved = tested[0][0]
+    names = []
+    for columns in tested:
+        for column_token, _ in columns:
+            if column_token.text not in names:
+                names.append(column_token.text)
+    problem = (
+        f"OR joins conditions on different columns ({', '.join(names)}); no single index answers every branch, "
+        "so SQL Server scans the table"
+    )
+    suggestion = (
+        "Split the query at the OR into one query per branch and combine them with UNION (UNION ALL when no row "
+        "can match two branches), so each branch seeks its own index"
+    )
+    return PredicateFinding(OR_ACROSS_COLUMNS.id, token, resolved.table, resolved.column, problem, suggestion)
@@ -0,0 +1,115 @@
+"""Persistent per-file results cache for the column tools.
+
+Each tool stores what it found in a markdown file next to the SHA-256 of the
+file's content. On the next run an unchanged file is answered from the cache
+without being parsed again. The whole cache is tied to a fingerprint of the
+schema source and the tool's own code, so editing Results.json, the master
+setup script or the tools themselves starts from an empty cache.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Union
+
+CACHE_VERSION = 1
+CACHE_DIR_NAME = ".scan_cache"
+
+_HERE = Path(__file__).resolve().parent
+# Modules whose behaviour is baked into every cached result.
+SHARED_SOURCES = (
+    _HERE / "sql_lexer.py",
+    _HERE / "fuzzy_match.py",
+    _HERE / "schema_catalog.py",
+    _HERE / "line_index.py",
+    _HERE / "md_fences.py",
+    _HERE / "findings.py",
+    _HERE / "rename_rules.py",
+    _HERE / "sql_scopes.py",
+    _HERE / "sql_predicates.py",
+    _HERE / "implicit_conversions.py",
+    _HERE / "sargability.py",
+    _HERE / "scan_cache.py",
+)
+
+PathLike = Union[str, Path]
+
+
+def file_digest(path: PathLike) -> str:
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+def fingerprint(paths: Iterable[PathLike]) -> str:
+    """Hash the contents of every file that the cached results depend on."""
+    digest = hashlib.sha256(str(CACHE_VERSION).encode("ascii"))
+    for path in paths:
+        digest.update(file_digest(path).encode("ascii"))
+    return digest.hexdigest()
+
+
+def default_cache_path(directory: PathLike, tool: str) -> Path:
+    return Path(directory) / CACHE_DIR_NAME / f"{tool}.json"
+
+
+class ScanCache:
+    """JSON-backed map of file path -> (content hash, cached result)."""
+
+    def __init__(self, path: Path, fingerprint: str):
+        self.path = path
+        self.fingerprint = fingerprint
+        self.entries: Dict[str, Dict[str, object]] = {}
+        self._digests: Dict[str, str] = {}
+        self._dirty = False
+
+        if not path.is_file():
+            return
+        try:
+            stored = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if stored.get("fingerprint") == fingerprint:
+            self.entries = stored.get("files", {})
+
+    def get(self, file: PathLike) -> Optional[object]:
+        """Return the cached result for `file`, or None if it changed since."""
+        key = str(file)
+        digest = file_digest(file)
+        self._digests[key] = digest
+        entry = self.entries.get(key)
+        if entry is not None and entry["sha256"] == digest:
+            return entry["result"]
+        return None
+
+    def digest(self, file: PathLike) -> str:
+        """The content hash `get` computed for `file`, hashing it now if `get` never saw it."""
+        key = str(file)
+        digest = self._digests.get(key)
+        if digest is None:
+            digest = self._digests[key] = file_digest(file)
+        return digest
+
+    def put(self, file: PathLike, result: object) -> None:
+        """Record `result` for the content `file` had when `get` looked at it.
+
+        The hash is taken before the file is processed, so an edit made while
+        the tool runs still misses next time.
+        """
+        key = str(file)
+        digest = self._digests.get(key) or file_digest(file)
+        self.entries[key] = {"sha256": digest, "result": result}
+        self._dirty = True
+
+    def save(self) -> None:
+        stale = [key for key in self.entries if not os.path.exists(key)]
+        for key in stale:
+            del self.entries[key]
+        if not (self._dirty or stale):
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {"fingerprint": self.fingerprint, "files": self.entries}
+        temp_path = self.path.with_suffix(".tmp")
+        temp_path.write_text(json.dumps(payload), encoding="utf-8")
+        os.replace(temp_path, self.path)
@@ -0,0 +1,603 @@
+#!/usr/bin/env python3
+"""One schema catalog for every column tool.
+
+The tools used to read the schema two ways: fix_customer_columns.py parsed
+the TechCorp master script line by line while the fixer and the validator
+read Results.json. `SchemaCatalog` compiles either kind of source (plus the
+Lesotho warehouse script and the numbered `adding_data_scripts`) into the
+same table/column model, using the shared tokenizer for the SQL scripts.
+Besides columns and keys the model keeps the UNIQUE constraints and the
+single-column CHECK constraints whose domain can be read off (`BETWEEN`,
+`IN (...)`, comparisons with a literal), which the data generator honours.
+
+`load_catalog` keeps a pickled snapshot of the compiled catalog next to the
+sources, tagged with a fingerprint of their contents, so a run only parses
+the setup scripts again after one of them changed. Run this module directly
+to compile a snapshot ahead of time and print what it contains.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import pickle
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from scan_cache import CACHE_DIR_NAME, fingerprint
+from sql_lexer import COMMENT, NAME, NUMBER, OPERATOR, PUNCT, STRING, Token, tokenize
+
+PathLike = Union[str, Path]
+
+_HERE = Path(__file__).resolve().parent
+CATALOG_SOURCES = (_HERE / "schema_catalog.py", _HERE / "sql_lexer.py")
+
+# Words that start a new batch statement and therefore end an ALTER TABLE ... ADD
+# list. UPDATE/DELETE/SET are left out because they appear in `ON DELETE SET NULL`.
+STATEMENT_KEYWORDS = {
+    "ALTER", "BEGIN", "CREATE", "DECLARE", "DROP", "END", "EXEC", "EXECUTE",
+    "GO", "IF", "INSERT", "PRINT", "SELECT", "USE", "WHILE",
+}
+SORT_KEYWORDS = {"ASC", "DESC"}
+
+
+@dataclass
+class Column:
+    name: str
+    data_type: str = ""  # as declared, e.g. "NVARCHAR(100)"; empty when the source has no types
+    nullable: bool = True
+    primary_key: bool = False
+    identity: bool = False
+    identity_seed: int = 1
+    has_default: bool = False
+    computed: bool = False
+
+
+@dataclass
+class ForeignKey:
+    columns: Tuple[str, ...]
+    ref_table: str
+    ref_columns: Tuple[str, ...]
+
+
+@dataclass
+class Check:
+    """One column's domain under a CHECK constraint; bounds are inclusive unless marked exclusive."""
+
+    column: str
+    expression: str  # as written, e.g. "PeriodQuarter BETWEEN 1 AND 4"
+    values: Tuple[str, ...] = ()  # IN list, unquoted
+    minimum: Optional[float] = None
+    maximum: Optional[float] = None
+    exclusive_minimum: bool = False
+    exclusive_maximum: bool = False
+
+
+@dataclass
+class Table:
+    name: str
+    columns: Dict[str, Column] = field(default_factory=dict)  # lower-case name -> Column, declaration order
+    primary_key: Tuple[str, ...] = ()
+    foreign_keys: List[ForeignKey] = field(default_factory=list)
+    unique: List[Tuple[str, ...]] = field(default_factory=list)
+    checks: List[Check] = field(default_factory=list)
+    source: str = ""
+
+    @property
+    def key(self) -> str:
+        return self.name.lower()
+
+    @property
+    def column_names(self) -> List[str]:
+        return [column.name for column in self.columns.values()]
+
+    def column(self, name: str) -> Optional[Column]:
+        return self.columns.get(name.strip("[]").lower())
+
+    def add_column(self, column: Column) -> Column:
+        return self.columns.setdefault(column.name.lower(), column)
+
+    def checks_on(self, name: str) -> List[Check]:
+        key = name.lower()
+        return [check for check in self.checks if check.column.lower() == key]
+
+
+class SchemaCatalog:
+    """Tables keyed by lower-case name, in the order the sources define them."""
+
+    def __init__(self, tables: Dict[str, Table], sources: Sequence[str] = (), fingerprint: str = ""):
+        self.tables = tables
+        self.sources = tuple(sources)
+        self.fingerprint = fingerprint
+
+    def __contains__(self, table_name: str) -> bool:
+        return normalize_table_name(table_name) in self.tables
+
+    def __iter__(self) -> Iterator[Table]:
+        return iter(self.tables.values())
+
+    def __len__(self) -> int:
+        return len(self.tables)
+
+    def table(self, table_name: str) -> Optional[Table]:
+        return self.tables.get(normalize_table_name(table_name))
+
+    @classmethod
+    def compile(cls, sources: Sequence[PathLike]) -> "SchemaCatalog":
+        """Parse every source in order; later CREATE TABLEs replace earlier ones."""
+        paths = expand_sources(sources)
+        tables: Dict[str, Table] = {}
+        for path in paths:
+            if path.suffix.lower() == ".json":
+                _compile_results_json(tables, path)
+            else:
+                _compile_sql(tables, path.read_text(encoding="utf-8-sig"), str(path))
+        _resolve_references(tables)
+        return cls(tables, [str(path) for path in paths], source_fingerprint(paths))
+
+    def write_snapshot(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_suffix(".tmp")
+        temp_path.write_bytes(pickle.dumps(self, protocol=pickle.HIGHEST_PROTOCOL))
+        temp_path.replace(path)
+
+    @staticmethod
+    def read_snapshot(path: Path) -> Optional["SchemaCatalog"]:
+        try:
+            catalog = pickle.loads(path.read_bytes())
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            return None
+        return catalog if isinstance(catalog, SchemaCatalog) else None
+
+
+def normalize_table_name(raw: str) -> str:
+    """`[dbo].[Employees]` -> `employees`."""
+    parts = Token(NAME, raw.strip(), 0, 0).parts
+    return parts[-1].strip("[]").lower()
+
+
+def expand_sources(sources: Sequence[PathLike]) -> List[Path]:
+    """Resolve the source list; a directory stands for its `*.sql` files in name order."""
+    paths: List[Path] = []
+    for source in sources:
+        path = Path(source)
+        if path.is_dir():
+            paths.extend(sorted(path.glob("*.sql")))
+        elif path.is_file():
+            paths.append(path)
+        else:
+            raise FileNotFoundError(f"Schema source not found: {path}")
+    return paths
+
+
+def source_fingerprint(paths: Sequence[Path]) -> str:
+    return fingerprint([*CATALOG_SOURCES, *paths])
+
+
+def default_snapshot_path(sources: Sequence[PathLike]) -> Path:
+    first = Path(sources[0])
+    directory = first if first.is_dir() else first.parent
+    return directory / CACHE_DIR_NAME / f"{first.stem}.catalog.pickle"
+
+
+def load_catalog(sources: Sequence[PathLike], snapshot: Optional[Path] = None) -> SchemaCatalog:
+    """Return the compiled catalog for `sources`, reusing the snapshot when it is current."""
+    paths = expand_sources(sources)
+    snapshot = snapshot or default_snapshot_path(sources)
+    cached = SchemaCatalog.read_snapshot(snapshot) if snapshot.is_file() else None
+    if cached is not None and cached.fingerprint == source_fingerprint(paths):
+        return cached
+
+    catalog = SchemaCatalog.compile(paths)
+    try:
+        catalog.write_snapshot(snapshot)
+    except OSError:
+        pass  # a read-only checkout still gets a freshly compiled catalog
+    return catalog
+
+
+def _compile_results_json(tables: Dict[str, Table], path: Path) -> None:
+    for entry in json.loads(path.read_text(encoding="utf-8")):
+        table_name = entry["TableName"].strip().strip("[]")
+        table = tables.get(table_name.lower())
+        if table is None:
+            table = tables[table_name.lower()] = Table(table_name, source=str(path))
+        table.add_column(Column(entry["ColumnName"].strip().strip("[]")))
+
+
+def rename_results_column(path: PathLike, table_name: str, old: str, new: str) -> str:
+    """Rename `table_name.old` to `new` in a Results.json file, keeping its layout.
+
+    Returns "renamed", "merged" when the table already listed `new` (the old
+    entry is dropped), "current" when only `new` is listed, or "absent".
+    """
+    path = Path(path)
+    entries = json.loads(path.read_text(encoding="utf-8"))
+    table_key, old_key, new_key = normalize_table_name(table_name), old.lower(), new.lower()
+
+    def matches(entry: Dict[str, str], column_key: str) -> bool:
+        return (
+            entry["TableName"].strip().strip("[]").lower() == table_key
+            and entry["ColumnName"].strip().strip("[]").lower() == column_key
+        )
+
+    old_entries = [entry for entry in entries if matches(entry, old_key)]
+    has_new = any(matches(entry, new_key) for entry in entries)
+    if not old_entries:
+        return "current" if has_new else "absent"
+    if has_new:
+        entries = [entry for entry in entries if not matches(entry, old_key)]
+    else:
+        for entry in old_entries:
+            entry["ColumnName"] = new
+    # Results.json is written by SSMS's JSON export: two-space indent, no final newline.
+    temp_path = path.with_name(path.name + ".tmp")
+    temp_path.write_text(json.dumps(entries, indent=2, ensure_ascii=False), encoding="utf-8")
+    temp_path.replace(path)
+    return "merged" if has_new else "renamed"
+
+
+def _is_punct(token: Token, text: str) -> bool:
+    return token.kind == PUNCT and token.text == text
+
+
+def _table_name(token: Token) -> str:
+    return token.parts[-1].strip("[]")
+
+
+def _compile_sql(tables: Dict[str, Table], sql: str, source: str) -> None:
+    tokens = [token for token in tokenize(sql) if token.kind != COMMENT]
+    count = len(tokens)
+    index = 0
+
+    while index < count:
+        token = tokens[index]
+        if not (token.is_keyword({"CREATE", "ALTER"}) and index + 2 < count and tokens[index + 1].is_keyword({"TABLE"})):
+            index += 1
+            continue
+
+        name_token = tokens[index + 2]
+        if name_token.kind != NAME or name_token.text.startswith("#"):
+            index += 3
+            continue
+        table_name = _table_name(name_token)
+
+        if token.is_keyword({"CREATE"}):
+            if index + 3 >= count or not _is_punct(tokens[index + 3], "("):
+                index += 3
+                continue
+            table = Table(table_name, source=source)
+            elements, index = _split_list(tokens, index + 4, closing=")")
+            tables[table.key] = table
+        else:
+            position = index + 3
+            if position < count and tokens[position].is_keyword({"WITH"}):
+                position += 2  # WITH CHECK / WITH NOCHECK
+            if position >= count or not tokens[position].is_keyword({"ADD"}):
+                index = position
+                continue
+            table = tables.get(table_name.lower())
+            if table is None:
+                table = tables[table_name.lower()] = Table(table_name, source=source)
+            elements, index = _split_list(tokens, position + 1, closing=None)
+
+        for element in elements:
+            _apply_element(table, element, sql)
+
+
+def _split_list(tokens: List[Token], start: int, closing: Optional[str]) -> Tuple[List[List[Token]], int]:
+    """Split tokens on top-level commas until `closing` (or, with None, the end of the statement).
+
+    Returns the elements and the index just past the list.
+    """
+    elements: List[List[Token]] = []
+    current: List[Token] = []
+    depth = 0
+    index = start
+
+    while index < len(tokens):
+        token = tokens[index]
+        if depth == 0:
+            if closing is not None and _is_punct(token, closing):
+                index += 1
+                break
+            if closing is None and (_is_punct(token, ";") or token.is_keyword(STATEMENT_KEYWORDS)):
+                break
+            if _is_punct(token, ","):
+                elements.append(current)
+                current = []
+                index += 1
+                continue
+        if _is_punct(token, "("):
+            depth += 1
+        elif _is_punct(token, ")"):
+            depth -= 1
+        current.append(token)
+        index += 1
+
+    if current:
+        elements.append(current)
+    return elements, index
+
+
+def _name_list(tokens: List[Token], start: int) -> Tuple[Tuple[str, ...], int]:
+    """Read `(a, b DESC)` starting at or after `start`; return the names and the index after `)`."""
+    index = start
+    while index < len(tokens) and not _is_punct(tokens[index], "("):
+        index += 1
+    names: List[str] = []
+    index += 1
+    while index < len(tokens) and not _is_punct(tokens[index], ")"):
+        token = tokens[index]
+        if token.kind == NAME and not token.is_keyword(SORT_KEYWORDS):
+            names.append(token.text.strip("[]"))
+        index += 1
+    return tuple(names), index + 1
+
+
+def _references(tokens: List[Token], index: int) -> Tuple[str, Tuple[str, ...], int]:
+    """Parse `REFERENCES Table [(cols)]` with `tokens[index]` on the REFERENCES keyword."""
+    ref_table = _table_name(tokens[index + 1]) if index + 1 < len(tokens) else ""
+    columns: Tuple[str, ...] = ()
+    after = index + 2
+    if after < len(tokens) and _is_punct(tokens[after], "("):
+        columns, after = _name_list(tokens, after)
+    return ref_table, columns, after
+
+
+def _parenthesised(tokens: List[Token], index: int) -> Tuple[List[Token], int]:
+    """The tokens inside the parentheses opening at `index`, without redundant inner pairs, and the index after."""
+    if index >= len(tokens) or not _is_punct(tokens[index], "("):
+        return [], index
+    depth = 0
+    for position in range(index, len(tokens)):
+        if _is_punct(tokens[position], "("):
+            depth += 1
+        elif _is_punct(tokens[position], ")"):
+            depth -= 1
+            if depth == 0:
+                body = tokens[index + 1 : position]
+                while len(body) >= 2 and _is_punct(body[0], "(") and _parenthesised(body, 0)[1] == len(body):
+                    body = body[1:-1]
+                return body, position + 1
+    return tokens[index + 1 :], len(tokens)
+
+
+def _literal(tokens: List[Token], index: int) -> Tuple[Optional[Union[float, str]], int]:
+    """Read a number (optionally negative) or a string literal at `index`."""
+    if index >= len(tokens):
+        return None, index
+    token = tokens[index]
+    sign = 1
+    if token.kind == OPERATOR and token.text in ("-", "+") and index + 1 < len(tokens):
+        sign = -1 if token.text == "-" else 1
+        index += 1
+        token = tokens[index]
+    if token.kind == NUMBER:
+        try:
+            return sign * float(token.text), index + 1
+        except ValueError:
+            return None, index + 1
+    if token.kind == STRING and sign == 1:
+        text = token.text[token.text.index("'") + 1 :]
+        return (text[:-1] if text.endswith("'") else text).replace("''", "'"), index + 1
+    return None, index + 1
+
+
+def _checks(body: List[Token], sql: str) -> List[Check]:
+    """The column domains of a CHECK expression: its AND-ed `col BETWEEN`, `col IN` and `col <op> literal` terms.
+
+    An expression with a top-level OR constrains no single column on its own
+    and yields nothing; terms of any other shape are skipped.
+    """
+    depth = 0
+    for token in body:
+        if _is_punct(token, "("):
+            depth += 1
+        elif _is_punct(token, ")"):
+            depth -= 1
+        elif depth == 0 and token.is_keyword({"OR"}):
+            return []
+
+    checks: List[Check] = []
+    index = 0
+    while index < len(body):
+        start = index
+        check: Optional[Check] = None
+        token = body[index]
+        if token.kind == NAME and not token.is_keyword({"NOT"}) and index + 1 < len(body):
+            column = token.parts[-1].strip("[]")
+            following = body[index + 1]
+            if following.is_keyword({"BETWEEN"}):
+                low, index = _literal(body, index + 2)
+                if index < len(body) and body[index].is_keyword({"AND"}):
+                    high, index = _literal(body, index + 1)
+                    if isinstance(low, float) and isinstance(high, float):
+                        check = Check(column, "", minimum=low, maximum=high)
+            elif following.is_keyword({"IN"}) and index + 2 < len(body) and _is_punct(body[index + 2], "("):
+                values: List[str] = []
+                index += 3
+                while index < len(body) and not _is_punct(body[index], ")"):
+                    value, index = _literal(body, index)
+                    if value is not None:
+                        values.append(value if isinstance(value, str) else f"{value:g}")
+                    if index < len(body) and _is_punct(body[index], ","):
+                        index += 1
+                index += 1
+                check = Check(column, "", values=tuple(values))
+            elif following.kind == OPERATOR and following.text in (">", ">=", "<", "<="):
+                bound, index = _literal(body, index + 2)
+                if isinstance(bound, float):
+                    exclusive = following.text in (">", "<")
+                    if following.text.startswith(">"):
+                        check = Check(column, "", minimum=bound, exclusive_minimum=exclusive)
+                    else:
+                        check = Check(column, "", maximum=bound, exclusive_maximum=exclusive)
+        # skip to the end of this term
+        depth = 0
+        while index < len(body) and not (depth == 0 and body[index].is_keyword({"AND"})):
+            if _is_punct(body[index], "("):
+                depth += 1
+            elif _is_punct(body[index], ")"):
+                depth -= 1
+            index += 1
+        if check is not None:
+            check.expression = " ".join(sql[body[start].start : body[index - 1].end].split())
+            checks.append(check)
+        index += 1
+    return checks
+
+
+def _apply_element(table: Table, element: List[Token], sql: str) -> None:
+    if not element:
+        return
+    index = 0
+    if element[0].is_keyword({"CONSTRAINT"}):
+        index = 2
+    if index >= len(element):
+        return
+    head = element[index]
+
+    if head.is_keyword({"PRIMARY"}):
+        columns, _ = _name_list(element, index)
+        table.primary_key = columns
+        for name in columns:
+            column = table.column(name)
+            if column is not None:
+                column.primary_key = True
+                column.nullable = False
+    elif head.is_keyword({"FOREIGN"}):
+        columns, after = _name_list(element, index)
+        if after < len(element) and element[after].is_keyword({"REFERENCES"}):
+            ref_table, ref_columns, _ = _references(element, after)
+            table.foreign_keys.append(ForeignKey(columns, ref_table, ref_columns))
+    elif head.is_keyword({"DEFAULT"}):
+        # CONSTRAINT DF_x DEFAULT (0) FOR Column
+        for position in range(index + 1, len(element) - 1):
+            if element[position].is_keyword({"FOR"}):
+                column = table.column(element[position + 1].text)
+                if column is not None:
+                    column.has_default = True
+    elif head.is_keyword({"UNIQUE"}):
+        columns, _ = _name_list(element, index)
+        if columns:
+            table.unique.append(columns)
+    elif head.is_keyword({"CHECK"}):
+        body, _ = _parenthesised(element, index + 1)
+        table.checks.extend(_checks(body, sql))
+    elif head.is_keyword({"INDEX"}) or index:
+        return
+    else:
+        _apply_column(table, element, sql)
+
+
+def _apply_column(table: Table, element: List[Token], sql: str) -> None:
+    column = Column(element[0].text.strip("[]"))
+    rest = element[1:]
+    if rest and rest[0].is_keyword({"AS"}):
+        column.computed = True
+        table.columns[column.name.lower()] = column
+        return
+
+    position = 0
+    if rest and rest[0].kind == NAME:
+        type_end = rest[0].end
+        position = 1
+        if position < len(rest) and _is_punct(rest[position], "("):
+            depth = 0
+            while position < len(rest):
+                if _is_punct(rest[position], "("):
+                    depth += 1
+                elif _is_punct(rest[position], ")"):
+                    depth -= 1
+                    if depth == 0:
+                        type_end = rest[position].end
+                        position += 1
+                        break
+                position += 1
+        type_name = rest[0].text.strip("[]")
+        column.data_type = "".join((type_name + sql[rest[0].end : type_end]).split()).upper()
+
+    depth = 0
+    previous: Optional[Token] = None
+    while position < len(rest):
+        token = rest[position]
+        if _is_punct(token, "("):
+            depth += 1
+        elif _is_punct(token, ")"):
+            depth -= 1
+        elif depth == 0 and token.kind == NAME:
+            word = token.text.upper()
+            if word == "NULL":
+                if previous is None or not previous.is_keyword({"NOT", "SET"}):
+                    column.nullable = True
+                elif previous.is_keyword({"NOT"}):
+                    column.nullable = False
+            elif word == "PRIMARY":
+                column.primary_key = True
+                column.nullable = False
+            elif word == "IDENTITY":
+                column.identity = True
+                if position + 2 < len(rest) and _is_punct(rest[position + 1], "(") and rest[position + 2].kind == NUMBER:
+                    column.identity_seed = int(rest[position + 2].text)
+            elif word == "UNIQUE":
+                table.unique.append((column.name,))
+            elif word == "CHECK":
+                body, after = _parenthesised(rest, position + 1)
+                table.checks.extend(_checks(body, sql))
+                position = after
+                previous = None
+                continue
+            elif word == "DEFAULT":
+                column.has_default = True
+            elif word == "REFERENCES":
+                ref_table, ref_columns, after = _references(rest, position)
+                table.foreign_keys.append(ForeignKey((column.name,), ref_table, ref_columns))
+                position = after
+                previous = None
+                continue
+        previous = token
+        position += 1
+
+    table.columns[column.name.lower()] = column
+    if column.primary_key:
+        table.primary_key = (column.name,)
+
+
+def _resolve_references(tables: Dict[str, Table]) -> None:
+    """Fill in `REFERENCES Table` without a column list with that table's primary key."""
+    for table in tables.values():
+        for foreign_key in table.foreign_keys:
+            if foreign_key.ref_columns:
+                continue
+            target = tables.get(foreign_key.ref_table.lower())
+            if target is not None:
+                foreign_key.ref_columns = target.primary_key
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compile schema sources into a catalog snapshot")
+    parser.add_argument(
+        "sources",
+        nargs="+",
+        type=Path,
+        help="Results.json, setup .sql scripts or directories of numbered scripts, in load order",
+    )
+    parser.add_argument(
+        "--snapshot",
+        type=Path,
+        help="Snapshot file (default: <first source dir>/.scan_cache/<name>.catalog.pickle)",
+    )
+    args = parser.parse_args()
+
+    catalog = load_catalog(args.sources, args.snapshot)
+    for table in catalog:
+        print(f"{table.name}: {len(table.columns)} columns, {len(table.foreign_keys)} foreign keys")
+    column_total = sum(len(table.columns) for table in catalog)
+    print(f"{len(catalog)} tables, {column_total} columns (fingerprint {catalog.fingerprint[:12]})")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,221 @@
+"""Single-pass T-SQL tokenizer shared by the column tools.
+
+The fixer, the validator and fix_customer_columns.py all need the same
+handful of facts about a SQL block: where the identifiers and dotted
+references are, which text is a comment or string literal, and which
+tables the FROM/JOIN clauses introduce. `tokenize` scans a block exactly
+once with a single alternation and returns every token with its offsets,
+so each tool can walk the stream instead of running its own overlapping
+regexes over the same text.
+"""
+
+from __future__ import annotations
+
+import re
+from bisect import bisect_right
+from typing import AbstractSet, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+COMMENT = "comment"
+STRING = "string"
+NAME = "name"
+VARIABLE = "variable"
+NUMBER = "number"
+PUNCT = "punct"
+OPERATOR = "operator"
+
+# Whitespace and any other character (stray dots, quotes, `$`) are skipped by
+# the regex search itself, which is far cheaper than emitting a token for them.
+# Names come first because they are by far the most common token; an `N`
+# prefix on a Unicode literal is folded back into the string in `tokenize`.
+_IDENT = r"(?:[A-Za-z_]\w*|\[[^\]\n]*\]|\#\#?\w+)"
+TOKEN_PATTERN = re.compile(
+    rf"""
+    (?P<name>{_IDENT}(?:\.{_IDENT})*)
+    |(?P<comment>--[^\n]*|/\*[\s\S]*?(?:\*/|\Z))
+    |(?P<string>'[^']*(?:''[^']*)*(?:'|\Z))
+    |(?P<variable>@@?\w+(?:\.\w+)*)
+    |(?P<number>\d\w*(?:\.\d+)?)
+    |(?P<punct>[(),;])
+    |(?P<operator>[=<>!+*/%-]+)
+    """,
+    re.VERBOSE,
+)
+NAME_PART_PATTERN = re.compile(r"\[[^\]]*\]|[^.]+")
+# Keywords that mark a literal as a dynamic SQL fragment. EXEC, sp_executesql
+# and ORDER/GROUP BY count in any case, like every T-SQL keyword. Words that
+# also occur in message text ('Invalid salary and bonus', 'Average
+# e.BaseSalary') only count when upper-case, because prose is written in
+# sentence case.
+DYNAMIC_SQL_HINT = re.compile(
+    r"\b(?:EXEC(?:UTE)?|SP_EXECUTESQL|ORDER\s+BY|GROUP\s+BY"
+    r"|(?-i:SELECT|FROM|JOIN|WHERE|AND|OR|ON|AS|SET|VALUES|HAVING))\b",
+    re.IGNORECASE,
+)
+
+TABLE_SOURCE_KEYWORDS = {"FROM", "JOIN"}
+AS_KEYWORD = {"AS"}
+RESERVED_WORDS = {
+    "AND", "APPLY", "AS", "BETWEEN", "BY", "CASE", "CROSS", "DELETE", "DISTINCT",
+    "ELSE", "END", "EXCEPT", "EXISTS", "FOR", "FROM", "FULL", "GO", "GROUP",
+    "HAVING", "IN", "INNER", "INSERT", "INTERSECT", "INTO", "IS", "JOIN", "LEFT",
+    "LIKE", "MERGE", "NOT", "NULL", "OFFSET", "ON", "OPTION", "OR", "ORDER",
+    "OUTER", "OUTPUT", "OVER", "PARTITION", "PIVOT", "RIGHT", "SELECT", "SET",
+    "TABLESAMPLE", "THEN", "TOP", "UNION", "UNPIVOT", "UPDATE", "USING",
+    "VALUES", "WHEN", "WHERE", "WINDOW", "WITH",
+}
+
+
+class Token(NamedTuple):
+    kind: str
+    text: str
+    start: int
+    end: int
+
+    @property
+    def parts(self) -> Tuple[str, ...]:
+        """Name parts with their brackets, e.g. `('[dbo]', 'Employees')`."""
+        return split_name(self.text)
+
+    @property
+    def is_reference(self) -> bool:
+        """True for dotted names such as `e.FirstName` or `dbo.Employees.ID`."""
+        return self.kind == NAME and "." in self.text and len(split_name(self.text)) > 1
+
+    def is_keyword(self, words: AbstractSet[str]) -> bool:
+        """True when this is a bare (unbracketed, undotted) word in `words`."""
+        return self.kind == NAME and self.text.upper() in words
+
+
+def bare_words(tokens: Sequence[Token]) -> List[str]:
+    """Upper-cased text of every bare (unbracketed, undotted) word, "" for any other token.
+
+    Computed once per block so keyword tests can index into it instead of
+    upper-casing the same token for every neighbour that looks at it.
+    """
+    return [
+        token.text.upper() if token.kind == NAME and "." not in token.text and token.text[0] != "[" else ""
+        for token in tokens
+    ]
+
+
+def split_name(text: str) -> Tuple[str, ...]:
+    """Split a multi-part name on dots that sit outside square brackets."""
+    if "." not in text:
+        return (text,)
+    return tuple(NAME_PART_PATTERN.findall(text))
+
+
+def tokenize(sql: str) -> List[Token]:
+    """Scan `sql` once and return every token with its character offsets."""
+    tokens: List[Token] = []
+    append = tokens.append
+    new_token = tuple.__new__  # skips the generated NamedTuple __new__ in this hot loop
+    for match in TOKEN_PATTERN.finditer(sql):
+        kind = match.lastgroup
+        start, end = match.span()
+        if kind == STRING and tokens and tokens[-1].end == start and tokens[-1].text in ("N", "n"):
+            prefix = tokens.pop()
+            append(new_token(Token, (STRING, prefix.text + match.group(), prefix.start, end)))
+        else:
+            append(new_token(Token, (kind, match.group(), start, end)))
+    return tokens
+
+
+def literal_tokens(token: Token) -> List[Token]:
+    """Lex the body of a string literal, keeping offsets relative to the block.
+
+    Lessons build dynamic SQL in literals (`SET @sql = 'SELECT e.FirstName ...'`),
+    so the tools inspect literal contents the same way as the surrounding code.
+    """
+    quote = token.text.index("'")
+    body_start = token.start + quote + 1
+    body_end = token.end - 1 if len(token.text) > quote + 1 and token.text.endswith("'") else token.end
+    return [
+        Token(inner.kind, inner.text, inner.start + body_start, inner.end + body_start)
+        for inner in tokenize(token.text[quote + 1 : body_end - token.start])
+    ]
+
+
+class CodeMask:
+    """Non-code intervals of one block: comments and plain-text literals.
+
+    Built in one pass over the token stream; `is_code` answers with a binary
+    search instead of re-reading the text around each offset. Literals that
+    read as dynamic SQL count as code so the statements they build are still
+    checked.
+    """
+
+    __slots__ = ("starts", "ends")
+
+    def __init__(self, tokens: Sequence[Token]):
+        starts: List[int] = []
+        ends: List[int] = []
+        for token in tokens:
+            kind = token.kind
+            if kind == COMMENT or (kind == STRING and not DYNAMIC_SQL_HINT.search(token.text)):
+                starts.append(token.start)
+                ends.append(token.end)
+        self.starts = starts
+        self.ends = ends
+
+    def is_code(self, offset: int) -> bool:
+        """True unless `offset` falls inside a comment or a plain-text literal."""
+        index = bisect_right(self.starts, offset) - 1
+        return index < 0 or offset >= self.ends[index]
+
+
+def code_tokens(tokens: Sequence[Token], mask: Optional[CodeMask] = None) -> List[Token]:
+    """Drop non-code tokens and replace dynamic SQL literals with their body tokens."""
+    if mask is None:
+        mask = CodeMask(tokens)
+    result: List[Token] = []
+    append = result.append
+    is_code = mask.is_code
+    for token in tokens:
+        kind = token.kind
+        if kind == COMMENT:
+            continue
+        if kind == STRING:
+            if is_code(token.start):
+                result.extend(code_tokens(literal_tokens(token)))
+            continue
+        append(token)
+    return result
+
+
+def references(tokens: Sequence[Token]) -> Iterator[Token]:
+    """Yield the dotted name tokens (alias.column, table.column, schema.table.column)."""
+    for token in tokens:
+        if token.kind == NAME and "." in token.text and token.is_reference:
+            yield token
+
+
+def table_sources(tokens: Sequence[Token]) -> Iterator[Tuple[Token, Optional[Token]]]:
+    """Yield `(table, alias)` pairs introduced by FROM/JOIN clauses.
+
+    `tokens` should already be filtered with `code_tokens` so comments between
+    the keyword and the table behave like whitespace. Derived tables
+    (`FROM (SELECT ...)`) are skipped and the alias is None when absent.
+    """
+    count = len(tokens)
+    for index, token in enumerate(tokens):
+        if token.kind != NAME or token.text.upper() not in TABLE_SOURCE_KEYWORDS or index + 1 >= count:
+            continue
+        table = tokens[index + 1]
+        if table.kind != NAME or table.is_keyword(RESERVED_WORDS):
+            continue
+
+        alias: Optional[Token] = None
+        follower = tokens[index + 2] if index + 2 < count else None
+        if follower is not None and follower.is_keyword(AS_KEYWORD):
+            follower = tokens[index + 3] if index + 3 < count else None
+            if follower is not None and follower.kind == NAME and not follower.is_reference:
+                alias = follower
+        elif (
+            follower is not None
+            and follower.kind == NAME
+            and not follower.is_reference
+            and not follower.is_keyword(RESERVED_WORDS)
+        ):
+            alias = follower
+        yield table, alias
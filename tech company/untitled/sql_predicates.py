@@ -0,0 +1,388 @@
+"""Comparisons in the WHERE, ON and HAVING clauses of a SQL block.
+
+The column tools check which names a query uses; the predicate checks look
+at how it compares them. `comparisons` walks a block's tokens once, tracks
+which clause each parenthesis level is in and yields every comparison made
+in a WHERE, JOIN ... ON or HAVING clause: the binary operators (`=`, `<>`,
+`<`, ...), `[NOT] LIKE`, `[NOT] IN (...)` with a value list and
+`[NOT] BETWEEN ... AND ...`. Each side is an `Operand`: the tokens of one
+term, or of several joined by arithmetic (`o.Total * 1.1`), where a term is
+a name, literal, variable, function call or parenthesised expression.
+
+The tokens are the block's tokens without comments but with their string
+literals (`predicate_tokens`): a plain-text literal is noise to the
+reference checks and the most common right-hand side of a predicate. The
+statements that dynamic SQL literals build are left alone here; their
+values are only known at run time.
+"""
+
+from __future__ import annotations
+
+from typing import Callable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from sql_lexer import COMMENT, NAME, NUMBER, OPERATOR, PUNCT, RESERVED_WORDS, STRING, VARIABLE, Token
+from sql_scopes import STATEMENT_KEYWORDS
+
+PREDICATE_CLAUSES = {"WHERE", "ON", "HAVING"}
+# Keywords that end a predicate clause at the same parenthesis level.
+CLAUSE_ENDS = STATEMENT_KEYWORDS | {
+    "SELECT", "FROM", "JOIN", "INNER", "LEFT", "RIGHT", "FULL", "CROSS", "OUTER", "APPLY", "GROUP",
+    "ORDER", "SET", "VALUES", "UNION", "EXCEPT", "INTERSECT", "OPTION", "FOR", "WINDOW", "INTO",
+    "OUTPUT", "INSERT", "UPDATE", "DELETE", "MERGE", "WITH",
+}
+COMPARISON_OPERATORS = {"=", "<>", "!=", "<", ">", "<=", ">=", "!<", "!>"}
+ARITHMETIC_OPERATORS = {"+", "-", "*", "/", "%"}
+# Join keywords that are also string functions: `LEFT(c.Phone, 3)`.
+FUNCTION_KEYWORDS = {"LEFT", "RIGHT"}
+# Words that read like a name but are values or functions without parentheses.
+VALUE_WORDS = {"NULL", "CURRENT_TIMESTAMP", "CURRENT_USER", "SESSION_USER", "SYSTEM_USER", "USER"}
+
+
+class Operand(NamedTuple):
+    tokens: Tuple[Token, ...]
+
+    @property
+    def start(self) -> int:
+        return self.tokens[0].start
+
+    @property
+    def end(self) -> int:
+        return self.tokens[-1].end
+
+    def text(self, sql: str) -> str:
+        """The operand as written, with its inner whitespace collapsed."""
+        return " ".join(sql[self.start : self.end].split())
+
+    @property
+    def column(self) -> Optional[Token]:
+        """The name token when the operand is a bare column (`e.HireDate`, `HireDate`)."""
+        if len(self.tokens) != 1:
+            return None
+        token = self.tokens[0]
+        if token.kind != NAME or token.text.upper() in RESERVED_WORDS or token.text.upper() in VALUE_WORDS:
+            return None
+        return token
+
+    @property
+    def literal(self) -> Optional[Token]:
+        """The literal token when the operand is a number or string (a leading minus sign is allowed)."""
+        tokens = self.tokens
+        if len(tokens) == 2 and tokens[0].kind == OPERATOR and tokens[0].text in ("-", "+"):
+            tokens = tokens[1:]
+        if len(tokens) == 1 and tokens[0].kind in (NUMBER, STRING):
+            return tokens[0]
+        return None
+
+    def call(self) -> Optional[Tuple[str, List["Operand"]]]:
+        """`(NAME, arguments)` when the operand is one function call, e.g. `YEAR(o.OrderDate)`."""
+        tokens = self.tokens
+        if (
+            len(tokens) < 3
+            or tokens[0].kind != NAME
+            or tokens[1].text != "("
+            or tokens[-1].text != ")"
+            or _matching_close(tokens, 1) != len(tokens) - 1
+        ):
+            return None
+        return tokens[0].text.upper(), split_arguments(tokens[2:-1])
+
+
+class Comparison(NamedTuple):
+    left: Operand
+    operator: str  # upper-cased: "=", "<>", "LIKE", "NOT LIKE", "IN", "NOT IN", "BETWEEN", ...
+    right: Tuple[Operand, ...]  # one operand; the IN list; the two BETWEEN bounds
+    clause: str  # WHERE, ON or HAVING
+    position: int  # offset of the operator
+
+
+class PredicateFinding(NamedTuple):
+    """One problem a predicate check found, anchored on a column reference."""
+
+    rule: str  # findings.Rule id
+    token: Token  # the column reference (or the operand's first token)
+    table: str
+    column: str
+    message: str
+    suggestion: str
+
+
+class ColumnType(NamedTuple):
+    """A column reference resolved against the schema."""
+
+    table: str
+    column: str
+    data_type: str  # as declared, e.g. "NVARCHAR(100)"; empty when the schema has no types
+
+
+# Maps a name token of the block to the schema column it refers to, or None.
+Resolver = Callable[[Token], Optional[ColumnType]]
+
+
+def predicate_tokens(tokens: Sequence[Token]) -> List[Token]:
+    """The tokens of a block without its comments; string literals stay as they are."""
+    return [token for token in tokens if token.kind != COMMENT]
+
+
+def split_arguments(tokens: Sequence[Token]) -> List[Operand]:
+    """Split the tokens between a call's parentheses on their top-level commas."""
+    arguments: List[Operand] = []
+    depth = 0
+    current: List[Token] = []
+    for token in tokens:
+        if token.kind == PUNCT:
+            if token.text == "(":
+                depth += 1
+            elif token.text == ")":
+                depth -= 1
+            elif token.text == "," and depth == 0:
+                if current:
+                    arguments.append(Operand(tuple(current)))
+                current = []
+                continue
+        current.append(token)
+    if current:
+        arguments.append(Operand(tuple(current)))
+    return arguments
+
+
+def _matching_close(tokens: Sequence[Token], index: int) -> int:
+    """Index of the `)` closing the `(` at `index`, or -1 when the block ends first."""
+    depth = 0
+    for position in range(index, len(tokens)):
+        text = tokens[position].text
+        if tokens[position].kind != PUNCT:
+            continue
+        if text == "(":
+            depth += 1
+        elif text == ")":
+            depth -= 1
+            if depth == 0:
+                return position
+    return -1
+
+
+def _matching_open(tokens: Sequence[Token], index: int) -> int:
+    """Index of the `(` opened for the `)` at `index`, or -1."""
+    depth = 0
+    for position in range(index, -1, -1):
+        text = tokens[position].text
+        if tokens[position].kind != PUNCT:
+            continue
+        if text == ")":
+            depth += 1
+        elif text == "(":
+            depth -= 1
+            if depth == 0:
+                return position
+    return -1
+
+
+def _is_term_word(token: Token) -> bool:
+    return token.kind == NAME and (token.text.upper() not in RESERVED_WORDS or token.text.upper() == "NULL")
+
+
+def _is_call(tokens: Sequence[Token], index: int) -> bool:
+    """True when the name at `index` is followed by `(`, as in `LEFT(`, a function rather than a join."""
+    return index + 1 < len(tokens) and tokens[index + 1].text == "("
+
+
+def _term_before(tokens: Sequence[Token], index: int) -> int:
+    """Start index of the term ending at `index`, or -1 when no term ends there."""
+    token = tokens[index]
+    if token.kind == PUNCT and token.text == ")":
+        opened = _matching_open(tokens, index)
+        if opened < 0:
+            return -1
+        if opened > 0 and (_is_term_word(tokens[opened - 1]) or tokens[opened - 1].text.upper() in FUNCTION_KEYWORDS):
+            return opened - 1
+        return opened
+    if token.kind in (NUMBER, STRING, VARIABLE) or _is_term_word(token):
+        return index
+    return -1
+
+
+def _term_after(tokens: Sequence[Token], index: int) -> int:
+    """End index (exclusive) of the term starting at `index`, or -1 when no term starts there."""
+    if index >= len(tokens):
+        return -1
+    token = tokens[index]
+    if token.kind == PUNCT and token.text == "(":
+        closed = _matching_close(tokens, index)
+        return closed + 1 if closed >= 0 else -1
+    if token.kind == NAME and _is_call(tokens, index) and (
+        _is_term_word(token) or token.text.upper() in FUNCTION_KEYWORDS
+    ):
+        closed = _matching_close(tokens, index + 1)
+        return closed + 1 if closed >= 0 else -1
+    if token.kind in (NUMBER, STRING, VARIABLE) or _is_term_word(token):
+        return index + 1
+    return -1
+
+
+def operand_before(tokens: Sequence[Token], index: int) -> Optional[Operand]:
+    """The operand that ends just before `tokens[index]`."""
+    start = _term_before(tokens, index - 1) if index > 0 else -1
+    if start < 0:
+        return None
+    while start >= 2 and tokens[start - 1].kind == OPERATOR and tokens[start - 1].text in ARITHMETIC_OPERATORS:
+        previous = _term_before(tokens, start - 2)
+        if previous < 0:
+            break
+        start = previous
+    if start >= 1 and tokens[start - 1].kind == OPERATOR and tokens[start - 1].text in ("-", "+"):
+        if start == 1 or _term_before(tokens, start - 2) < 0:
+            start -= 1  # a unary sign: `WHERE -e.BaseSalary < 0`
+    return Operand(tuple(tokens[start:index]))
+
+
+def operand_after(tokens: Sequence[Token], index: int) -> Optional[Operand]:
+    """The operand that starts at `tokens[index]`."""
+    start = index
+    if start < len(tokens) and tokens[start].kind == OPERATOR and tokens[start].text in ("-", "+"):
+        index += 1
+    end = _term_after(tokens, index)
+    if end < 0:
+        return None
+    while end + 1 < len(tokens) and tokens[end].kind == OPERATOR and tokens[end].text in ARITHMETIC_OPERATORS:
+        following = _term_after(tokens, end + 1)
+        if following < 0:
+            break
+        end = following
+    return Operand(tuple(tokens[start:end]))
+
+
+def _word(token: Optional[Token]) -> str:
+    if token is None or token.kind != NAME or "." in token.text or token.text.startswith("["):
+        return ""
+    return token.text.upper()
+
+
+def comparisons(tokens: Sequence[Token]) -> Iterator[Comparison]:
+    """Yield the comparisons made in the WHERE, ON and HAVING clauses of `tokens`."""
+    clause = ""
+    stack: List[str] = []
+    count = len(tokens)
+    for index, token in enumerate(tokens):
+        kind = token.kind
+        if kind == PUNCT:
+            if token.text == "(":
+                stack.append(clause)
+            elif token.text == ")":
+                clause = stack.pop() if stack else ""
+            elif token.text == ";":
+                clause, stack = "", []
+            continue
+        if kind == OPERATOR:
+            if clause and token.text in COMPARISON_OPERATORS:
+                left = operand_before(tokens, index)
+                right = operand_after(tokens, index + 1)
+                if left is not None and right is not None:
+                    yield Comparison(left, token.text, (right,), clause, token.start)
+            continue
+        if kind != NAME:
+            continue
+        # Bracketed and dotted names never match a keyword, so no `_word` call is needed.
+        word = token.text.upper()
+        if word in PREDICATE_CLAUSES:
+            clause = word
+            continue
+        if word in CLAUSE_ENDS and not (word in FUNCTION_KEYWORDS and _is_call(tokens, index)):
+            clause = ""
+            continue
+        if not clause or word not in ("LIKE", "IN", "BETWEEN"):
+            continue
+        negated = index > 0 and _word(tokens[index - 1]) == "NOT"
+        left = operand_before(tokens, index - 1 if negated else index)
+        if left is None:
+            continue
+        operator = f"NOT {word}" if negated else word
+        if word == "LIKE":
+            right = operand_after(tokens, index + 1)
+            if right is not None:
+                yield Comparison(left, operator, (right,), clause, token.start)
+        elif word == "IN":
+            if index + 2 >= count or tokens[index + 1].text != "(" or _word(tokens[index + 2]) in ("SELECT", "WITH"):
+                continue
+            closed = _matching_close(tokens, index + 1)
+            if closed > 0:
+                values = tuple(split_arguments(tokens[index + 2 : closed]))
+                yield Comparison(left, operator, values, clause, token.start)
+        else:
+            low = operand_after(tokens, index + 1)
+            if low is None:
+                continue
+            after_low = index + 1 + len(low.tokens)
+            if after_low >= count or _word(tokens[after_low]) != "AND":
+                continue
+            high = operand_after(tokens, after_low + 1)
+            if high is not None:
+                yield Comparison(left, operator, (low, high), clause, token.start)
+
+
+class _Level:
+    """One parenthesis level of a block while `disjunctions` walks it."""
+
+    __slots__ = ("clause", "branches", "subquery")
+
+    def __init__(self, clause: str):
+        self.clause = clause
+        self.branches: List[List[Comparison]] = [[]]
+        self.subquery = False
+
+    def flush(self) -> Optional[List[List[Comparison]]]:
+        """The OR-ed branches of the condition that just ended, if it had any; starts a new condition."""
+        branches, self.branches = self.branches, [[]]
+        return branches if len(branches) > 1 and self.clause in ("WHERE", "ON") else None
+
+
+def disjunctions(tokens: Sequence[Token], found: Sequence[Comparison]) -> Iterator[List[List[Comparison]]]:
+    """Yield the branches of every WHERE or ON condition joined by OR, as the comparisons each branch makes.
+
+    `found` are the block's `comparisons`. A parenthesised group belongs to
+    the branch it sits in (and yields its own ORs as well); the comparisons
+    of a subquery belong to no branch of the enclosing query.
+    """
+    at = {comparison.position: comparison for comparison in found}
+    levels = [_Level("")]
+    for index, token in enumerate(tokens):
+        level = levels[-1]
+        kind = token.kind
+        if kind == PUNCT:
+            if token.text == "(":
+                levels.append(_Level(level.clause))
+            elif token.text == ")" and len(levels) > 1:
+                closed = levels.pop()
+                if not closed.subquery:
+                    levels[-1].branches[-1].extend(comparison for branch in closed.branches for comparison in branch)
+                branches = closed.flush()
+                if branches is not None:
+                    yield branches
+            elif token.text == ";":
+                for level in levels:
+                    branches = level.flush()
+                    if branches is not None:
+                        yield branches
+                levels = [_Level("")]
+            continue
+        comparison = at.get(token.start)
+        if comparison is not None:
+            level.branches[-1].append(comparison)
+            continue
+        if kind != NAME:
+            continue
+        word = token.text.upper()
+        if word == "OR":
+            if level.clause:
+                level.branches.append([])
+        elif word in PREDICATE_CLAUSES or (
+            word in CLAUSE_ENDS and not (word in FUNCTION_KEYWORDS and _is_call(tokens, index))
+        ):
+            branches = level.flush()
+            if branches is not None:
+                yield branches
+            level.clause = word if word in PREDICATE_CLAUSES else ""
+            level.subquery = level.subquery or word == "SELECT"
+    for level in levels:
+        branches = level.flush()
+        if branches is not None:
+            yield branches
@@ -0,0 +1,302 @@
+"""Statement-scoped alias resolution for SQL blocks.
+
+A lesson block usually holds several statements, and aliases are reused
+between them: `e` is Employees in one query and a derived table in the
+next. `resolve_scopes` walks a block's code tokens once and gives every
+token the `Scope` it belongs to: one per statement, plus one per subquery,
+CTE body, derived table or APPLY operand. Each scope records the names its
+FROM/JOIN/APPLY/UPDATE/INTO/USING clauses bind, so a reference is resolved
+against its own statement first and then against the enclosing queries.
+
+Statements end at `;` and `GO`, and at a keyword that cannot continue the
+current statement (a SELECT after a finished query, DECLARE, SET, ...), since
+most lessons leave the semicolons out. CTE names and `(SELECT ...) AS x`
+derived tables are bound as non-table sources, so `x.Total` is known to be
+a derived column rather than a misspelt schema column.
+
+Every statement scope hangs off one block-wide scope that holds the last
+table binding of each name. A qualifier that its own statement never binds
+(a lone `ORDER BY e.LastName` fragment, or dynamic SQL assembled over
+several SET statements) still resolves the way the rest of the block uses it.
+"""
+
+from __future__ import annotations
+
+from typing import Container, Dict, List, NamedTuple, Optional, Sequence
+
+from sql_lexer import NAME, PUNCT, RESERVED_WORDS, Token, bare_words
+
+TABLE = "table"
+CTE = "cte"
+DERIVED = "derived"
+
+SOURCE_KEYWORDS = {"FROM", "JOIN", "APPLY", "UPDATE", "INTO", "USING", "MERGE"}
+SET_OPERATORS = {"UNION", "ALL", "EXCEPT", "INTERSECT"}
+DML_KEYWORDS = {"INSERT", "UPDATE", "DELETE", "MERGE"}
+# A block without any of these binds no name, and every lookup in it misses.
+BINDING_KEYWORDS = SOURCE_KEYWORDS | {"WITH"}
+# Keywords that always begin a new statement at the top level. ELSE, END and
+# FETCH are left out because CASE and OFFSET/FETCH use them inside a query.
+STATEMENT_KEYWORDS = {
+    "ALTER", "BEGIN", "BREAK", "COMMIT", "CONTINUE", "CREATE", "DEALLOCATE", "DECLARE", "DROP",
+    "EXEC", "EXECUTE", "GO", "GOTO", "GRANT", "IF", "PRINT", "RAISERROR", "RETURN", "REVOKE",
+    "ROLLBACK", "THROW", "TRUNCATE", "USE", "WAITFOR", "WHILE",
+}
+# Keywords after which a comma no longer separates table sources.
+CLAUSE_KEYWORDS = {
+    "WHERE", "GROUP", "ORDER", "HAVING", "SELECT", "SET", "ON", "OPTION", "UNION", "EXCEPT",
+    "INTERSECT", "WINDOW", "FOR", "VALUES", "OUTPUT", "WHEN", "PIVOT", "UNPIVOT",
+}
+NOT_ALIAS = RESERVED_WORDS | STATEMENT_KEYWORDS | {"CROSS", "OUTER", "WITH"}
+
+
+class Source(NamedTuple):
+    kind: str  # TABLE, CTE or DERIVED
+    name: str  # the name references use: the alias, or the table's own name
+    table: str  # the table (last name part, unbracketed), CTE name or derived alias
+    aliased: bool
+    clause: str = "FROM"  # keyword that bound it: FROM, JOIN, APPLY, UPDATE, INTO, USING or MERGE
+
+
+class Scope:
+    """The names one query level binds; lookups fall back to the enclosing query."""
+
+    __slots__ = ("parent", "sources")
+
+    def __init__(self, parent: Optional["Scope"] = None):
+        self.parent = parent
+        self.sources: Dict[str, Source] = {}
+
+    def bind(self, source: Source) -> None:
+        self.sources[source.name.lower()] = source
+
+    def lookup(self, name: str) -> Optional[Source]:
+        key = _unbracket(name).lower()
+        scope: Optional[Scope] = self
+        while scope is not None:
+            source = scope.sources.get(key)
+            if source is not None:
+                return source
+            scope = scope.parent
+        return None
+
+
+def _unbracket(name: str) -> str:
+    return name[1:-1] if name.startswith("[") and name.endswith("]") else name
+
+
+def _is_alias(token: Token, word: str) -> bool:
+    """`word` is the token's entry in `bare_words`."""
+    return token.kind == NAME and not token.is_reference and word not in NOT_ALIAS
+
+
+class _Frame:
+    __slots__ = ("scope", "derived", "in_sources")
+
+    def __init__(self, scope: Scope, derived: bool = False):
+        self.scope = scope
+        self.derived = derived
+        self.in_sources = False
+
+
+class _Statement:
+    __slots__ = ("kind", "empty", "has_select", "has_values", "cte_header")
+
+    def __init__(self):
+        self.kind = ""
+        self.empty = True
+        self.has_select = False
+        self.has_values = False
+        self.cte_header = False
+
+
+def _starts_cte(tokens: Sequence[Token], words: Sequence[str], index: int) -> bool:
+    """True when tokens[index] is a CTE name: `name AS (` or `name (cols) AS (`."""
+    follower = tokens[index + 1] if index + 1 < len(tokens) else None
+    return _is_alias(tokens[index], words[index]) and follower is not None and (
+        words[index + 1] == "AS" or (follower.kind == PUNCT and follower.text == "(")
+    )
+
+
+def resolve_scopes(tokens: Sequence[Token]) -> List[Scope]:
+    """Return the scope of every token in `tokens` (code tokens of one block), index for index."""
+    count = len(tokens)
+    words = bare_words(tokens)
+    if BINDING_KEYWORDS.isdisjoint(words):
+        # Nothing in the block binds a name, so all its statements resolve alike.
+        return [Scope(Scope())] * count
+
+    scopes: List[Scope] = []
+    block = Scope()
+    stack = [_Frame(Scope(block))]
+    statement = _Statement()
+    expect_source = False
+    clause = "FROM"
+    word = ""
+
+    for index, token in enumerate(tokens):
+        previous_word = word
+        word = words[index]
+        frame = stack[-1]
+
+        if len(stack) == 1 and word and _begins_statement(word, statement, previous_word, tokens, words, index):
+            stack = [_Frame(Scope(block))]
+            statement = _Statement()
+            frame = stack[0]
+            expect_source = False
+
+        kind = token.kind
+        if kind == PUNCT:
+            text = token.text
+            if text == "(":
+                scopes.append(frame.scope)
+                if index + 1 < count and words[index + 1] in ("SELECT", "WITH"):
+                    derived = previous_word in ("FROM", "JOIN", "APPLY") or (
+                        index > 0 and tokens[index - 1].text == "," and frame.in_sources
+                    )
+                    stack.append(_Frame(Scope(frame.scope), derived=derived))
+                else:
+                    stack.append(_Frame(frame.scope))
+                expect_source = False
+                continue
+            if text == ")":
+                if len(stack) > 1:
+                    closed = stack.pop()
+                    if closed.derived:
+                        _bind_derived(stack[-1].scope, tokens, words, index)
+                scopes.append(stack[-1].scope)
+                expect_source = False
+                continue
+            if text == ";":
+                scopes.append(frame.scope)
+                stack = [_Frame(Scope(block))]
+                statement = _Statement()
+                expect_source = False
+                continue
+            if text == "," and frame.in_sources:
+                expect_source = True
+                clause = "FROM"
+            scopes.append(frame.scope)
+            continue
+
+        scopes.append(frame.scope)
+        if kind != NAME:
+            expect_source = False
+            continue
+        if len(stack) == 1 and statement.empty:
+            statement.empty = False
+            statement.kind = word
+
+        if expect_source:
+            expect_source = False
+            if word not in NOT_ALIAS:
+                source = _bind_table(frame.scope, tokens, words, index, clause)
+                if source.kind == TABLE:
+                    block.bind(source)
+                continue
+
+        if (
+            statement.cte_header
+            and len(stack) == 1
+            and (previous_word == "WITH" or (index > 0 and tokens[index - 1].text == ","))
+            and _starts_cte(tokens, words, index)
+        ):
+            frame.scope.bind(Source(CTE, _unbracket(token.text), _unbracket(token.text), False))
+            continue
+
+        if not word:
+            continue
+        if word in SOURCE_KEYWORDS:
+            expect_source = True
+            clause = word
+            if word in ("FROM", "JOIN", "APPLY"):
+                frame.in_sources = True
+        elif word in CLAUSE_KEYWORDS:
+            frame.in_sources = False
+
+        if len(stack) == 1:
+            if word == "WITH" and index + 1 < count and _starts_cte(tokens, words, index + 1):
+                statement.cte_header = True
+            elif word == "SELECT" or word in DML_KEYWORDS:
+                if statement.cte_header:
+                    # The main statement after `WITH ... AS (...)`.
+                    statement.kind = word
+                    statement.cte_header = False
+                statement.has_select = statement.has_select or word == "SELECT"
+            elif word == "VALUES":
+                statement.has_values = True
+
+    return scopes
+
+
+def _begins_statement(
+    word: str, statement: _Statement, previous_word: str, tokens: Sequence[Token], words: Sequence[str], index: int
+) -> bool:
+    """Decide whether a top-level keyword starts a new statement."""
+    if statement.empty:
+        return False
+    if word in STATEMENT_KEYWORDS:
+        return True
+    if word == "SET":
+        return statement.kind not in ("UPDATE", "MERGE")
+    if word == "WITH":
+        return index + 1 < len(tokens) and _starts_cte(tokens, words, index + 1)
+    if word == "SELECT":
+        if previous_word in SET_OPERATORS or previous_word == "AS" or statement.cte_header:
+            return False
+        # INSERT ... SELECT is one statement.
+        return not (statement.kind == "INSERT" and not (statement.has_select or statement.has_values))
+    if word in DML_KEYWORDS:
+        # WITH ... UPDATE, and the UPDATE/INSERT/DELETE actions of a MERGE.
+        return not (statement.cte_header or statement.kind == "MERGE")
+    return False
+
+
+def _bind_table(scope: Scope, tokens: Sequence[Token], words: Sequence[str], index: int, clause: str) -> Source:
+    token = tokens[index]
+    table = _unbracket(token.parts[-1])
+    count = len(tokens)
+    alias: Optional[Token] = None
+    follower = tokens[index + 1] if index + 1 < count else None
+    if follower is not None and words[index + 1] == "AS":
+        follower = tokens[index + 2] if index + 2 < count else None
+        if follower is not None and follower.kind == NAME and not follower.is_reference:
+            alias = follower
+    elif follower is not None and _is_alias(follower, words[index + 1]):
+        alias = follower
+
+    visible = scope.lookup(table) if "." not in token.text else None
+    kind = CTE if visible is not None and visible.kind == CTE else TABLE
+    name = _unbracket(alias.text) if alias is not None else table
+    source = Source(kind, name, table, alias is not None, clause)
+    scope.bind(source)
+    return source
+
+
+def _bind_derived(scope: Scope, tokens: Sequence[Token], words: Sequence[str], index: int) -> None:
+    """Bind the alias after the `)` at `index` that closes a derived table."""
+    follower_index = index + 1
+    if follower_index < len(tokens) and words[follower_index] == "AS":
+        follower_index += 1
+    follower = tokens[follower_index] if follower_index < len(tokens) else None
+    if follower is not None and _is_alias(follower, words[follower_index]):
+        name = _unbracket(follower.text)
+        scope.bind(Source(DERIVED, name, name, True, "FROM"))
+
+
+def schema_table(scope: Scope, qualifier: str, tables: Container[str]) -> Optional[str]:
+    """Return the lower-cased schema table a qualifier refers to, or None.
+
+    A bound name wins: an alias of a schema table resolves to that table,
+    while CTEs, derived tables and non-schema tables resolve to None. An
+    unbound qualifier that is itself a schema table name resolves to that
+    table, since lessons often keep qualifying with the table name.
+    """
+    source = scope.lookup(qualifier)
+    if source is not None:
+        if source.kind != TABLE:
+            return None
+        key = source.table.lower()
+    else:
+        key = _unbracket(qualifier).lower()
+    return key if key in tables else None
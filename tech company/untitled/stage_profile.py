@@ -0,0 +1,161 @@
+"""Per-stage wall time and call counts for the column tools' `--profile` flag.
+
+The tools and the modules they share wrap each stage of their work in
+`PROFILER.stage(name)`:
+
+* `read`       - reading a markdown file;
+* `fences`     - finding its fenced blocks;
+* `tokenize`   - lexing a block and masking its comments and strings;
+* `aliases`    - resolving FROM/JOIN sources and aliases per statement;
+* `lines`      - line numbers for offsets (LineIndex, newline counting);
+* `references` - walking the references and matching them to the schema;
+* `predicates` - checking WHERE/ON/HAVING comparisons (types, sargability);
+* `fuzzy`      - closest-column lookups (difflib scoring);
+* `handlers`   - rename rules and other special-case rewrites;
+* `report`     - rendering report sections, summaries and findings;
+* `write`      - writing fixed files, caches and the usage index.
+
+Stages nest (a fuzzy lookup happens while references are matched), and each
+stage is charged only its own time, so the breakdown adds up to the time
+spent inside stages. Until `enable()` is called `stage()` hands out one
+shared no-op context manager, which keeps the hooks nearly free.
+
+`--profile-output FILE` additionally runs the whole tool under cProfile and
+dumps the statistics to FILE for `python -m pstats FILE` or snakeviz. Per-file
+stages run in whichever process scans the file, so the tools scan serially
+while profiling.
+"""
+
+from __future__ import annotations
+
+import argparse
+import cProfile
+import sys
+import time
+from contextlib import nullcontext
+from pathlib import Path
+from typing import ContextManager, Dict, Iterator, List, Optional, TextIO, TypeVar
+
+T = TypeVar("T")
+
+_NULL = nullcontext()
+_DONE = object()
+
+
+class _Stage:
+    __slots__ = ("profiler", "name", "started", "nested")
+
+    def __init__(self, profiler: "StageProfiler", name: str):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self) -> None:
+        self.nested = 0.0
+        self.profiler._stack.append(self)
+        self.started = time.perf_counter()
+
+    def __exit__(self, *exc_info: object) -> None:
+        elapsed = time.perf_counter() - self.started
+        profiler = self.profiler
+        profiler._stack.pop()
+        profiler.seconds[self.name] = profiler.seconds.get(self.name, 0.0) + elapsed - self.nested
+        profiler.calls[self.name] = profiler.calls.get(self.name, 0) + 1
+        if profiler._stack:
+            profiler._stack[-1].nested += elapsed
+
+
+class StageProfiler:
+    def __init__(self):
+        self.enabled = False
+        self.seconds: Dict[str, float] = {}
+        self.calls: Dict[str, int] = {}
+        self._stack: List[_Stage] = []
+        self._started = 0.0
+        self._cprofile: Optional[cProfile.Profile] = None
+
+    def enable(self, pstats_path: Optional[Path] = None) -> None:
+        self.enabled = True
+        self._started = time.perf_counter()
+        if pstats_path is not None:
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+
+    def stage(self, name: str) -> ContextManager[None]:
+        if not self.enabled:
+            return _NULL
+        return _Stage(self, name)
+
+    def iterate(self, name: str, items: Iterator[T]) -> Iterator[T]:
+        """Charge the time spent producing each item of a lazy iterator to `name`."""
+        if not self.enabled:
+            yield from items
+            return
+        while True:
+            with self.stage(name):
+                item = next(items, _DONE)
+            if item is _DONE:
+                return
+            yield item
+
+    def breakdown(self) -> List[str]:
+        wall = time.perf_counter() - self._started
+        unstaged = max(wall - sum(self.seconds.values()), 0.0)
+        lines = [
+            "",
+            "Stage profile",
+            f"{'stage':<12} {'seconds':>10} {'share':>7} {'calls':>10} {'µs/call':>10}",
+        ]
+        for name, seconds in sorted(self.seconds.items(), key=lambda item: item[1], reverse=True):
+            calls = self.calls[name]
+            lines.append(
+                f"{name:<12} {seconds:>10.4f} {seconds / wall if wall else 0:>7.1%} {calls:>10} "
+                f"{seconds / calls * 1e6:>10.1f}"
+            )
+        lines.append(f"{'other':<12} {unstaged:>10.4f} {unstaged / wall if wall else 0:>7.1%}")
+        lines.append(f"{'total':<12} {wall:>10.4f}")
+        return lines
+
+    def finish(self, pstats_path: Optional[Path] = None, out: TextIO = sys.stdout) -> None:
+        """Print the breakdown and dump the cProfile statistics, if they were collected."""
+        if not self.enabled:
+            return
+        if self._cprofile is not None:
+            self._cprofile.disable()
+        for line in self.breakdown():
+            print(line, file=out)
+        if self._cprofile is not None and pstats_path is not None:
+            self._cprofile.dump_stats(str(pstats_path))
+            print(f"cProfile statistics written to {pstats_path} (view with: python -m pstats {pstats_path})", file=out)
+
+
+# One profiler per process, shared by the tools and the modules they import.
+PROFILER = StageProfiler()
+
+
+def add_profile_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Print wall time and calls per stage at the end (scans serially; pair with --no-cache to profile a full scan)",
+    )
+    parser.add_argument(
+        "--profile-output",
+        type=Path,
+        metavar="PSTATS_FILE",
+        help="With --profile, also run under cProfile and dump the statistics to this file",
+    )
+
+
+def start_profile(args: argparse.Namespace) -> None:
+    """Enable `PROFILER` if `--profile` was given."""
+    if not args.profile:
+        return
+    if getattr(args, "jobs", 1) != 1:
+        print("--profile: scanning in this process so every stage is measured (ignoring --jobs)")
+        args.jobs = 1
+    PROFILER.enable(args.profile_output)
+
+
+def finish_profile(args: argparse.Namespace) -> None:
+    if args.profile:
+        PROFILER.finish(args.profile_output)
@@ -0,0 +1,39 @@
+"""Shared setup for the column-tool tests.
+
+The tools are plain scripts that import each other from the labs
+directory, so the tests put that directory on sys.path the same way the
+scripts see it when they are run. The seed-data tools at the repository
+root go on the path after it.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+LABS_DIR = Path(__file__).resolve().parent.parent
+REPO_ROOT = LABS_DIR.parent.parent
+MASTER_SQL = LABS_DIR.parent / "00_TechCorp_MASTER_Setup.sql"
+EMPLOYEES_AND_DEPARTMENTS = "FROM Employees e JOIN Departments d ON d.DepartmentID = e.DepartmentID"
+
+if str(LABS_DIR) not in sys.path:
+    sys.path.insert(0, str(LABS_DIR))
+if str(REPO_ROOT) not in sys.path:
+    sys.path.append(str(REPO_ROOT))
+
+
+@pytest.fixture(scope="session")
+def validator():
+    """A validator over the master script, which also supplies the column types."""
+    from validate_column_references import ColumnReferenceValidator
+
+    return ColumnReferenceValidator(str(MASTER_SQL))
+
+
+def predicate_findings(validator, where, source=EMPLOYEES_AND_DEPARTMENTS):
+    """(rule, reference, suggestion) for every issue in `SELECT ... <source> WHERE <where>`."""
+    sql = f"SELECT e.FirstName {source}\nWHERE {where}"
+    return [
+        (issue["rule"], issue["reference"], issue.get("suggestion", ""))
+        for issue in validator.validate_sql_block(sql, "lab.md", 1)
+    ]
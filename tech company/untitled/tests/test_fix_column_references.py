@@ -0,0 +1,69 @@
+import pytest
+
+from conftest import LABS_DIR
+from findings import REDUNDANT_QUALIFIER
+from fix_column_references import ColumnReferenceFixer, SchemaIndex
+
+RESULTS_JSON = LABS_DIR / "Results.json"
+
+
+@pytest.fixture(scope="module")
+def schema():
+    return SchemaIndex(RESULTS_JSON)
+
+
+def _fix(schema, tmp_path, sql):
+    path = tmp_path / "lab.md"
+    path.write_text(f"```sql\n{sql}\n```\n", encoding="utf-8")
+    scan = ColumnReferenceFixer(None, dry_run=True, schema=schema).scan_file(path)
+    return [(change.before, change.after, change.rule) for change in scan.change_log]
+
+
+def test_stray_middle_qualifier_keeps_the_bound_alias(schema, tmp_path):
+    sql = "SELECT e.FirstName FROM Employees e\nINNER JOIN Departments d ON e.d.DepartmentID = d.DepartmentID"
+    (change,) = _fix(schema, tmp_path, sql)
+
+    assert change == ("e.d.DepartmentID", "e.DepartmentID", REDUNDANT_QUALIFIER.id)
+
+
+def test_unaliased_table_keeps_its_name(schema, tmp_path):
+    sql = (
+        "SELECT d.DepartmentName FROM Departments d\n"
+        "INNER JOIN Employees ON d.DepartmentID = Employees.d.DepartmentID"
+    )
+    (change,) = _fix(schema, tmp_path, sql)
+
+    assert change[:2] == ("Employees.d.DepartmentID", "Employees.DepartmentID")
+
+
+def test_table_name_before_its_alias_is_dropped(schema, tmp_path):
+    (change,) = _fix(schema, tmp_path, "SELECT Employees.e.FirstName FROM Employees e")
+    assert change == ("Employees.e.FirstName", "e.FirstName", REDUNDANT_QUALIFIER.id)
+
+
+def test_valid_references_are_left_alone(schema, tmp_path):
+    sql = "SELECT e.FirstName, d.DepartmentName FROM Employees e JOIN Departments d ON e.DepartmentID = d.DepartmentID"
+    assert _fix(schema, tmp_path, sql) == []
+
+
+# The only changes a dry run over the current labs proposes: stray middle qualifiers that the lessons
+# still contain. Anything else showing up here means the fixer started rewriting valid lesson SQL.
+KNOWN_LAB_FIXES = {
+    ("Comprehensive_Beginner_Exercise_Answer_Key_Part1.md", 21, "Employees.d.DepartmentID", "Employees.DepartmentID"),
+    ("Lab_Introduction_to_T-SQL_Querying_Answers.md", 413, "e.d.DepartmentID", "e.DepartmentID"),
+    ("Lab_Introduction_to_T-SQL_Querying_Answers.md", 460, "e.d.DepartmentID", "e.DepartmentID"),
+    ("Module4_Theory_Presentation.md", 221, "e.d.DepartmentID", "e.DepartmentID"),
+    ("Module7_Theory_Presentation.md", 157, "Employees.d.DepartmentID", "Employees.DepartmentID"),
+}
+
+
+def test_current_labs_need_only_the_known_fixes(schema):
+    fixer = ColumnReferenceFixer(None, dry_run=True, schema=schema)
+    proposed = set()
+    paths = sorted(LABS_DIR.glob("**/*.md"))
+    for path in paths:
+        for change in fixer.scan_file(path).change_log:
+            proposed.add((path.name, change.line, change.before, change.after))
+
+    assert len(paths) > 250
+    assert proposed == KNOWN_LAB_FIXES
@@ -0,0 +1,48 @@
+import difflib
+
+import pytest
+
+from conftest import MASTER_SQL
+from fuzzy_match import FuzzyMatcher
+from schema_catalog import SchemaCatalog
+
+
+def _misspellings(column):
+    yield column
+    yield column.lower()
+    yield column[:-1]
+    yield column[1:]
+    yield column + "s"
+    yield column.replace("ID", "Id")
+    if len(column) > 3:
+        yield column[:2] + column[3] + column[2] + column[4:]
+    yield "x" + column[len(column) // 2 :]
+
+
+@pytest.fixture(scope="module")
+def catalog():
+    return SchemaCatalog.compile([MASTER_SQL])
+
+
+@pytest.mark.parametrize("cutoff", [0.6, 0.8, 0.85])
+def test_matches_difflib_on_the_schema_columns(catalog, cutoff):
+    matcher = FuzzyMatcher()
+    checked = 0
+    for table in catalog:
+        columns = table.column_names
+        for column in columns:
+            for word in _misspellings(column):
+                expected = difflib.get_close_matches(word, columns, n=1, cutoff=cutoff)
+                assert matcher.best_match(table.key, word, columns, cutoff) == (expected[0] if expected else None)
+                checked += 1
+    assert checked > 1000
+
+
+def test_answers_are_memoized_and_bounded():
+    matcher = FuzzyMatcher(maxsize=2)
+    columns = ["FirstName", "LastName", "HireDate"]
+
+    assert matcher.best_match("employees", "FirstNme", columns, 0.8) == "FirstName"
+    assert matcher.best_match("employees", "HireDat", columns, 0.8) == "HireDate"
+    assert matcher.best_match("employees", "Nothing", columns, 0.8) is None
+    assert len(matcher._memo) == 2
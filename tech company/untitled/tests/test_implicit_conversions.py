@@ -0,0 +1,63 @@
+import pytest
+
+from conftest import predicate_findings
+from findings import CONVERTED_COLUMN, IMPLICIT_CONVERSION, REDUNDANT_CAST
+
+CONVERSION_RULES = {IMPLICIT_CONVERSION.id, CONVERTED_COLUMN.id}
+
+
+@pytest.mark.parametrize(
+    "where, rule, reference, suggestion",
+    [
+        ("e.EmployeeNumber = 12345", "COL008", "e.EmployeeNumber", "e.EmployeeNumber = '12345'"),
+        ("e.EmployeeNumber IN (1, 2)", "COL008", "e.EmployeeNumber", "e.EmployeeNumber IN ('1', '2')"),
+        ("e.Gender = N'M'", "COL008", "e.Gender", "e.Gender = 'M'"),
+        ("e.HireDate LIKE '2024%'", "COL008", "e.HireDate", "e.HireDate >= '20240101' AND e.HireDate < '20250101'"),
+        ("e.EmployeeID LIKE '30%'", "COL008", "e.EmployeeID", "INT values"),
+        ("CONVERT(VARCHAR(10), e.HireDate, 120) = '2024-01-01'", "COL009", "e.HireDate", "date range"),
+        ("CAST(e.BaseSalary AS INT) > 50000", "COL009", "e.BaseSalary", "DECIMAL(10,2) value"),
+    ],
+)
+def test_conversion_is_reported_with_its_rewrite(validator, where, rule, reference, suggestion):
+    matches = [finding for finding in predicate_findings(validator, where) if finding[0] == rule]
+
+    assert [finding[1] for finding in matches] == [reference]
+    assert suggestion in matches[0][2]
+
+
+@pytest.mark.parametrize(
+    "where",
+    [
+        "e.EmployeeNumber = '12345'",
+        "e.FirstName = N'Ann'",
+        "e.Gender = 'M'",
+        "e.FirstName LIKE N'A%'",
+        "e.HireDate >= '20240101' AND e.HireDate < '20250101'",
+        "CAST(e.CreatedDate AS DATE) = '20240101'",
+        "e.DepartmentID IN (1, 2)",
+    ],
+)
+def test_matching_types_are_not_reported(validator, where):
+    assert [finding for finding in predicate_findings(validator, where) if finding[0] in CONVERSION_RULES] == []
+
+
+@pytest.mark.parametrize(
+    "where",
+    [
+        "CAST(e.BaseSalary AS DECIMAL(10,2)) > 50000",
+        "CONVERT(decimal(10, 2), e.BaseSalary) > 50000",
+        "CAST(e.HireDate AS DATE) = '20240101'",
+    ],
+)
+def test_cast_to_the_columns_own_type_is_only_noted(validator, where):
+    (finding,) = predicate_findings(validator, where)
+
+    assert finding[0] == REDUNDANT_CAST.id
+    assert finding[2].startswith("Drop the C")
+
+
+def test_join_converts_the_string_side(validator):
+    findings = predicate_findings(
+        validator, "1 = 1", "FROM Employees e JOIN Departments d ON d.DepartmentID = e.EmployeeNumber"
+    )
+    assert [finding[:2] for finding in findings] == [("COL008", "e.EmployeeNumber")]
@@ -0,0 +1,113 @@
+from conftest import MASTER_SQL
+from load_plan import ForeignKeyGraph, plan_catalog, plan_loads
+from schema_catalog import SchemaCatalog
+
+
+def _catalog(tmp_path, sql):
+    path = tmp_path / "schema.sql"
+    path.write_text(sql, encoding="utf-8")
+    return SchemaCatalog.compile([path])
+
+
+def _position(plan, table):
+    return next(number for number, wave in enumerate(plan.waves) if table in wave)
+
+
+def test_parents_load_in_earlier_waves(tmp_path):
+    catalog = _catalog(
+        tmp_path,
+        """
+        CREATE TABLE OrderItems (
+            OrderItemID INT PRIMARY KEY,
+            OrderID INT NOT NULL REFERENCES Orders(OrderID),
+            ProductID INT NOT NULL,
+            FOREIGN KEY (ProductID) REFERENCES Products(ProductID)
+        );
+        CREATE TABLE Orders (OrderID INT PRIMARY KEY, CustomerID INT NOT NULL REFERENCES Customers(CustomerID));
+        CREATE TABLE Customers (CustomerID INT PRIMARY KEY);
+        CREATE TABLE Products (ProductID INT PRIMARY KEY);
+        """,
+    )
+    plan = plan_catalog(catalog)
+
+    assert plan.waves == [["Customers", "Products"], ["Orders"], ["OrderItems"]]
+    assert plan.drop_waves == [["OrderItems"], ["Orders"], ["Customers", "Products"]]
+    assert not plan.cycles and not plan.deferred and not plan.unresolved
+
+
+def test_self_reference_is_a_cycle_but_not_deferred(tmp_path):
+    catalog = _catalog(
+        tmp_path,
+        """
+        CREATE TABLE Employees (
+            EmployeeID INT PRIMARY KEY,
+            ReportsToEmployeeID INT NULL REFERENCES Employees(EmployeeID)
+        );
+        """,
+    )
+    plan = plan_catalog(catalog)
+
+    assert plan.waves == [["Employees"]]
+    assert plan.cycles == [["Employees"]]
+    assert plan.deferred == []
+
+
+def test_nullable_foreign_key_breaks_a_cycle(tmp_path):
+    catalog = _catalog(
+        tmp_path,
+        """
+        CREATE TABLE Departments (DepartmentID INT PRIMARY KEY, ManagerEmployeeID INT NULL);
+        CREATE TABLE Employees (
+            EmployeeID INT PRIMARY KEY,
+            DepartmentID INT NOT NULL REFERENCES Departments(DepartmentID)
+        );
+        ALTER TABLE Departments ADD CONSTRAINT FK_Manager
+            FOREIGN KEY (ManagerEmployeeID) REFERENCES Employees(EmployeeID);
+        """,
+    )
+    plan = plan_catalog(catalog)
+
+    assert plan.cycles == [["Departments", "Employees"]]
+    assert [dependency.describe() for dependency in plan.deferred] == ["Departments.ManagerEmployeeID -> Employees"]
+    assert plan.waves == [["Departments"], ["Employees"]]
+    assert plan.unresolved == []
+
+
+def test_cycle_without_a_nullable_foreign_key_is_unresolved(tmp_path):
+    catalog = _catalog(
+        tmp_path,
+        """
+        CREATE TABLE A (AID INT PRIMARY KEY, BID INT NOT NULL REFERENCES B(BID));
+        CREATE TABLE B (BID INT PRIMARY KEY, AID INT NOT NULL REFERENCES A(AID));
+        CREATE TABLE C (CID INT PRIMARY KEY, AID INT NOT NULL REFERENCES A(AID));
+        """,
+    )
+    plan = plan_catalog(catalog)
+
+    assert plan.unresolved == [["A", "B"]]
+    assert plan.deferred == []
+    assert sorted(table for wave in plan.waves for table in wave) == ["A", "B", "C"]
+    assert _position(plan, "C") > _position(plan, "A")
+
+
+def test_references_outside_the_graph_are_dangling(tmp_path):
+    catalog = _catalog(
+        tmp_path,
+        "CREATE TABLE Orders (OrderID INT PRIMARY KEY, CustomerID INT REFERENCES Customers(CustomerID));",
+    )
+    plan = plan_loads(ForeignKeyGraph(catalog))
+
+    assert plan.dangling == ["Orders.CustomerID -> Customers"]
+    assert plan.waves == [["Orders"]]
+
+
+def test_master_schema_plan_respects_every_foreign_key():
+    catalog = SchemaCatalog.compile([MASTER_SQL])
+    plan = plan_catalog(catalog)
+    deferred = {(dependency.child, dependency.parent) for dependency in plan.deferred}
+
+    assert plan.unresolved == []
+    for dependency in ForeignKeyGraph(catalog).dependencies:
+        if dependency.child == dependency.parent or (dependency.child, dependency.parent) in deferred:
+            continue
+        assert _position(plan, dependency.parent) < _position(plan, dependency.child), dependency.describe()
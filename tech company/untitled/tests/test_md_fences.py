@@ -0,0 +1,70 @@
+from md_fences import iter_fences, rewrite_fences, sql_fences
+
+
+def _fences(text):
+    return list(iter_fences(text.splitlines(keepends=True)))
+
+
+def test_backtick_and_tilde_fences():
+    text = "# Lab\n```sql\nSELECT 1\n```\n\n~~~tsql\nSELECT 2\n~~~\n"
+    first, second = _fences(text)
+
+    assert (first.lang, first.body, first.start_line, first.body_line) == ("sql", "SELECT 1\n", 2, 3)
+    assert (second.lang, second.body, second.start_line) == ("tsql", "SELECT 2\n", 6)
+    assert text[first.span[0] : first.span[1]] == first.body
+    assert text[second.span[0] : second.span[1]] == second.body
+
+
+def test_info_string_keeps_only_the_first_word_as_language():
+    (fence,) = _fences("```SQL title=\"Answer 1\" {.numberLines}\nSELECT 1\n```\n")
+    assert fence.lang == "sql"
+    assert fence.info == 'SQL title="Answer 1" {.numberLines}'
+
+
+def test_untagged_fence_has_no_language():
+    (fence,) = _fences("```\nSELECT 1\n```\n")
+    assert fence.lang == ""
+
+
+def test_closing_fence_must_match_character_and_length():
+    text = "````sql\nSELECT 1\n```\n~~~~\n`````\nSELECT 2\n"
+    (fence,) = _fences(text)
+
+    assert fence.closed
+    assert fence.body == "SELECT 1\n```\n~~~~\n"
+
+
+def test_closing_fence_carries_nothing_but_whitespace():
+    (fence,) = _fences("```sql\nSELECT 1\n``` not a close\n```  \n")
+    assert fence.body == "SELECT 1\n``` not a close\n"
+
+
+def test_unterminated_fence_runs_to_the_end():
+    text = "```sql\nSELECT 1\nFROM Employees\n"
+    (fence,) = _fences(text)
+
+    assert not fence.closed
+    assert fence.body == "SELECT 1\nFROM Employees\n"
+    assert fence.span == (len("```sql\n"), len(text))
+
+
+def test_indented_and_list_item_fences():
+    text = "1. Answer:\n   ```sql\n   SELECT 1\n   ```\n2. ```sql\n   SELECT 2\n   ```\n"
+    first, second = _fences(text)
+
+    assert first.body == "   SELECT 1\n"
+    assert second.start_line == 5 and second.body == "   SELECT 2\n"
+
+
+def test_inline_code_is_not_a_fence():
+    assert _fences("Use ```SELECT``` inline.\n```sql\nSELECT 1\n```\n")[0].body == "SELECT 1\n"
+
+
+def test_crlf_line_endings_are_kept(tmp_path):
+    path = tmp_path / "lab.md"
+    path.write_bytes(b"```sql\r\nSELECT 1\r\n```\r\n```python\r\nprint(1)\r\n```\r\n")
+    (fence,) = list(sql_fences(path))
+
+    assert fence.body == "SELECT 1\r\n"
+    rewrite_fences(path, {fence.span: "SELECT 2\r\n"})
+    assert path.read_bytes() == b"```sql\r\nSELECT 2\r\n```\r\n```python\r\nprint(1)\r\n```\r\n"
@@ -0,0 +1,116 @@
+import argparse
+import json
+
+import pytest
+
+from fix_column_references import ColumnReferenceFixer, run_rename
+from schema_catalog import rename_results_column
+from usage_index import UsageIndex
+
+SCHEMA = [
+    {"TableName": "Employees", "ColumnName": "EmployeeID"},
+    {"TableName": "Employees", "ColumnName": "FirstName"},
+    {"TableName": "Employees", "ColumnName": "Title"},
+    {"TableName": "Departments", "ColumnName": "DepartmentID"},
+    {"TableName": "Departments", "ColumnName": "Title"},
+]
+
+REPORT_LAB = """# Report
+
+```sql
+SELECT e.FirstName, e.Title, Employees.Title
+FROM Employees e
+```
+
+Departments keep their own titles:
+
+```sql
+SELECT d.Title FROM Departments d
+```
+"""
+
+OTHER_LAB = "# Other\n\n```sql\nSELECT e.FirstName FROM Employees e\n```\n"
+
+
+@pytest.fixture()
+def labs(tmp_path):
+    (tmp_path / "Results.json").write_text(json.dumps(SCHEMA, indent=2), encoding="utf-8")
+    (tmp_path / "report.md").write_text(REPORT_LAB, encoding="utf-8")
+    (tmp_path / "other.md").write_text(OTHER_LAB, encoding="utf-8")
+    index = UsageIndex(tmp_path / "usage.sqlite")
+    ColumnReferenceFixer(tmp_path / "Results.json", dry_run=True).run(tmp_path, "*.md", index=index)
+    index.save()
+    index.close()
+    return tmp_path
+
+
+def _rename(labs, old, new, dry_run=False):
+    args = argparse.Namespace(
+        old=old,
+        new=new,
+        dry_run=dry_run,
+        directory=labs,
+        schema=labs / "Results.json",
+        index=labs / "usage.sqlite",
+    )
+    return run_rename(args)
+
+
+def _columns(labs, table):
+    entries = json.loads((labs / "Results.json").read_text(encoding="utf-8"))
+    return [entry["ColumnName"] for entry in entries if entry["TableName"] == table]
+
+
+def test_rename_rewrites_only_the_indexed_references(labs):
+    assert _rename(labs, "Employees.Title", "Employees.JobTitle") == 0
+
+    report = (labs / "report.md").read_text(encoding="utf-8")
+    assert "SELECT e.FirstName, e.JobTitle, Employees.JobTitle" in report
+    assert "SELECT d.Title FROM Departments d" in report
+    assert (labs / "other.md").read_text(encoding="utf-8") == OTHER_LAB
+    assert _columns(labs, "Employees") == ["EmployeeID", "FirstName", "JobTitle"]
+    assert _columns(labs, "Departments") == ["DepartmentID", "Title"]
+
+
+def test_rename_updates_the_index(labs):
+    _rename(labs, "Employees.Title", "JobTitle")
+
+    index = UsageIndex.open_existing(labs / "usage.sqlite")
+    try:
+        assert list(index.occurrences("Employees", "Title")) == []
+        assert len(list(index.occurrences("Employees", "JobTitle"))) == 2
+    finally:
+        index.close()
+
+
+def test_dry_run_changes_nothing(labs, capsys):
+    assert _rename(labs, "Employees.Title", "JobTitle", dry_run=True) == 0
+
+    assert (labs / "report.md").read_text(encoding="utf-8") == REPORT_LAB
+    assert _columns(labs, "Employees") == ["EmployeeID", "FirstName", "Title"]
+    assert "Would rewrite 2 references to Employees.Title in 1 files" in capsys.readouterr().out
+
+
+def test_file_edited_since_indexing_is_checked_in_full(labs):
+    edited = "# Report\n\nNew intro.\n\n" + REPORT_LAB.replace("# Report\n", "")
+    (labs / "report.md").write_text(edited, encoding="utf-8")
+
+    _rename(labs, "Employees.Title", "JobTitle")
+
+    assert "e.JobTitle, Employees.JobTitle" in (labs / "report.md").read_text(encoding="utf-8")
+
+
+@pytest.mark.parametrize("old, new", [("Title", "JobTitle"), ("Employees.Title", "Departments.JobTitle")])
+def test_rename_rejects_other_tables(labs, old, new):
+    assert _rename(labs, old, new) == 2
+    assert (labs / "report.md").read_text(encoding="utf-8") == REPORT_LAB
+
+
+def test_results_column_merges_into_an_existing_name(tmp_path):
+    path = tmp_path / "Results.json"
+    path.write_text(json.dumps(SCHEMA + [{"TableName": "Employees", "ColumnName": "JobTitle"}]), encoding="utf-8")
+
+    assert rename_results_column(path, "[Employees]", "Title", "JobTitle") == "merged"
+    assert rename_results_column(path, "Employees", "Title", "JobTitle") == "current"
+    assert rename_results_column(path, "Employees", "Salary", "BaseSalary") == "absent"
+    assert _columns(tmp_path, "Employees") == ["EmployeeID", "FirstName", "JobTitle"]
@@ -0,0 +1,92 @@
+import json
+
+import pytest
+
+from findings import COLUMN_RENAME
+from rename_rules import ALIAS, BARE, RenameRule, load_rules
+
+CONTACT_NAME = RenameRule(
+    "Customers",
+    "ContactName",
+    "CONCAT({alias}.ContactFirstName, ' ', {alias}.ContactLastName)",
+    (ALIAS, BARE),
+    "ContactName -> ContactFirstName+LastName",
+)
+
+
+def _write_rules(tmp_path, entries):
+    path = tmp_path / "column_renames.json"
+    path.write_text(json.dumps(entries), encoding="utf-8")
+    return path
+
+
+def test_plain_rename_renders_with_and_without_alias():
+    rule = RenameRule("Employees", "Title", "JobTitle")
+
+    assert rule.render("e") == "e.JobTitle"
+    assert rule.render(None) == "JobTitle"
+    assert rule.description == "Title -> JobTitle"
+
+
+def test_template_rename_fills_in_the_alias():
+    assert CONTACT_NAME.render("c") == "CONCAT(c.ContactFirstName, ' ', c.ContactLastName)"
+    assert CONTACT_NAME.render(None) == "CONCAT(ContactFirstName, ' ', ContactLastName)"
+    assert CONTACT_NAME.description == "ContactName -> ContactFirstName+LastName"
+
+
+def test_rules_are_looked_up_by_table_and_column(tmp_path):
+    path = _write_rules(
+        tmp_path,
+        [
+            {"TableName": "Customers", "OldName": "Phone", "NewName": "PrimaryPhone", "Scope": ["alias", "bare"]},
+            {"TableName": "Customers", "OldName": "PhoneNumber", "NewName": "PrimaryPhone"},
+            {"TableName": "Customers", "OldName": "Email", "NewName": "PrimaryEmail", "Scope": "bare"},
+        ],
+    )
+    rules = load_rules(path)
+
+    assert len(rules) == 3
+    assert rules.alias_rule("customers", "phone").new == "PrimaryPhone"
+    assert rules.alias_rule("customers", "phonenumber").finding == COLUMN_RENAME.id
+    assert rules.alias_rule("customers", "email") is None
+    assert rules.alias_rule("orders", "phone") is None
+    assert [(name, position) for name, (position, _) in rules.bare_rules("customers").items()] == [
+        ("phone", 0),
+        ("email", 1),
+    ]
+    assert rules.bare_rules("orders") == {}
+
+
+def test_bare_table_hint(tmp_path):
+    entry = {"TableName": "Customers", "OldName": "Phone", "NewName": "PrimaryPhone", "Scope": "bare"}
+    path = _write_rules(tmp_path, [entry])
+    rules = load_rules(path)
+
+    assert rules.mentions_bare_table("SELECT Phone FROM customers")
+    assert not rules.mentions_bare_table("SELECT Phone FROM CustomersArchive")
+    assert not load_rules(tmp_path / "missing.json").mentions_bare_table("SELECT Phone FROM Customers")
+
+
+def test_missing_file_means_no_rules(tmp_path):
+    assert len(load_rules(tmp_path / "missing.json")) == 0
+
+
+@pytest.mark.parametrize(
+    "entry, message",
+    [
+        ({"TableName": "Customers", "OldName": "Phone"}, "missing NewName"),
+        ({"TableName": "Customers", "OldName": "Phone", "NewName": "X", "Scope": ["everywhere"]}, "Scope"),
+        ({"TableName": "Customers", "OldName": "Phone", "NewName": "X", "Rule": "COL999"}, "COL999"),
+    ],
+)
+def test_invalid_rules_are_rejected(tmp_path, entry, message):
+    path = _write_rules(tmp_path, [entry])
+    with pytest.raises(ValueError, match=message):
+        load_rules(path)
+
+
+def test_shipped_rules_file_loads():
+    rules = load_rules()
+
+    assert rules.alias_rule("customers", "contactname").render("c") == CONTACT_NAME.render("c")
+    assert "customers" in rules.bare_tables and "employees" in rules.bare_tables
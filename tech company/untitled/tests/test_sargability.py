@@ -0,0 +1,89 @@
+import pytest
+
+from conftest import predicate_findings
+from findings import COLUMN_ARITHMETIC, LEADING_WILDCARD, NON_SARGABLE_FUNCTION, NULL_REPLACEMENT, OR_ACROSS_COLUMNS
+
+SARGABILITY_RULES = {
+    rule.id
+    for rule in (NON_SARGABLE_FUNCTION, LEADING_WILDCARD, NULL_REPLACEMENT, COLUMN_ARITHMETIC, OR_ACROSS_COLUMNS)
+}
+
+
+@pytest.mark.parametrize(
+    "where, rule, reference, suggestion",
+    [
+        # COL010 non-sargable-function
+        ("YEAR(e.HireDate) = 2024", "COL010", "e.HireDate", "e.HireDate >= '20240101' AND e.HireDate < '20250101'"),
+        ("YEAR(e.HireDate) >= 2020", "COL010", "e.HireDate", "e.HireDate >= '20200101'"),
+        ("LEFT(e.LastName, 3) = 'Smi'", "COL010", "e.LastName", "e.LastName LIKE 'Smi%'"),
+        ("UPPER(e.LastName) = 'SMITH'", "COL010", "e.LastName", "e.LastName = 'SMITH'"),
+        (
+            "DATEDIFF(YEAR, e.HireDate, GETDATE()) >= 5",
+            "COL010",
+            "e.HireDate",
+            "e.HireDate <= DATEADD(YEAR, -5, GETDATE())",
+        ),
+        (
+            "DATEADD(day, 30, e.HireDate) < GETDATE()",
+            "COL010",
+            "e.HireDate",
+            "e.HireDate < DATEADD(day, -30, GETDATE())",
+        ),
+        # COL011 leading-wildcard
+        ("e.LastName LIKE '%son'", "COL011", "e.LastName", "LIKE 'son%'"),
+        # COL012 null-replacement
+        ("ISNULL(e.MiddleName, '') = ''", "COL012", "e.MiddleName", "(e.MiddleName = '' OR e.MiddleName IS NULL)"),
+        ("ISNULL(e.MiddleName, 'A') = 'B'", "COL012", "e.MiddleName", "e.MiddleName = 'B'"),
+        (
+            "COALESCE(e.MiddleName, e.LastName) = 'X'",
+            "COL012",
+            "e.MiddleName",
+            "(e.MiddleName = 'X' OR (e.MiddleName IS NULL AND e.LastName = 'X'))",
+        ),
+        # COL013 column-arithmetic
+        ("e.BaseSalary * 2 > 100000", "COL013", "e.BaseSalary", "e.BaseSalary > 100000 / 2"),
+        ("e.BaseSalary + 5000 = 60000", "COL013", "e.BaseSalary", "e.BaseSalary = 60000 - 5000"),
+        ("-e.BaseSalary < -50000", "COL013", "e.BaseSalary", "e.BaseSalary > 50000"),
+        ("+e.BaseSalary = 1", "COL013", "e.BaseSalary", "e.BaseSalary = 1"),
+        # COL014 or-across-columns
+        ("(e.FirstName = 'Ann' OR e.LastName = 'Lee')", "COL014", "e.FirstName", "UNION"),
+        ("e.BaseSalary > 1 AND (d.DepartmentName = 'IT' OR e.HireDate > '20240101')", "COL014", "d.DepartmentName", ""),
+    ],
+)
+def test_rule_fires_with_its_rewrite(validator, where, rule, reference, suggestion):
+    matches = [finding for finding in predicate_findings(validator, where) if finding[0] == rule]
+
+    assert [finding[1] for finding in matches] == [reference]
+    assert suggestion in matches[0][2]
+
+
+@pytest.mark.parametrize(
+    "where",
+    [
+        "e.HireDate >= '20240101' AND e.HireDate < '20250101'",
+        "CONVERT(VARCHAR(10), e.HireDate, 120) = '2024-01-01'",
+        "e.LastName LIKE 'Sm%'",
+        "e.BaseSalary > 100000 / 2",
+        "e.BaseSalary > -5",
+        "e.BaseSalary * 1.1 > e.BonusTarget",
+        "(e.LastName = 'Lee' OR e.LastName = 'Kim')",
+        "(@Dept IS NULL OR e.DepartmentID = @Dept)",
+    ],
+)
+def test_sargable_predicates_are_not_reported(validator, where):
+    assert [finding for finding in predicate_findings(validator, where) if finding[0] in SARGABILITY_RULES] == []
+
+
+def test_select_list_and_having_are_not_linted(validator):
+    sql = (
+        "SELECT YEAR(e.HireDate) AS HireYear, COUNT(*) FROM Employees e\n"
+        "GROUP BY YEAR(e.HireDate) HAVING YEAR(e.HireDate) > 2020"
+    )
+    assert [issue["rule"] for issue in validator.validate_sql_block(sql, "lab.md", 1)] == []
+
+
+def test_findings_point_at_the_column_line(validator):
+    sql = "SELECT e.FirstName\nFROM Employees e\nWHERE e.IsActive = 1\n  AND YEAR(e.HireDate) = 2024"
+    (issue,) = validator.validate_sql_block(sql, "lab.md", 10)
+
+    assert (issue["rule"], issue["line"], issue["table"], issue["column"]) == ("COL010", 13, "Employees", "HireDate")
@@ -0,0 +1,111 @@
+import json
+
+from conftest import MASTER_SQL
+from scan_cache import ScanCache, file_digest, fingerprint
+from validate_column_references import ColumnReferenceValidator
+
+
+def _lab(tmp_path, name="lab.md", text="```sql\nSELECT 1\n```\n"):
+    path = tmp_path / name
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+def _reopen(cache):
+    cache.save()
+    return ScanCache(cache.path, cache.fingerprint)
+
+
+def test_unchanged_file_is_a_hit_after_reload(tmp_path):
+    lab = _lab(tmp_path)
+    cache = ScanCache(tmp_path / "cache.json", "schema-1")
+    assert cache.get(lab) is None
+    cache.put(lab, ["result"])
+
+    assert _reopen(cache).get(lab) == ["result"]
+
+
+def test_edited_file_misses(tmp_path):
+    lab = _lab(tmp_path)
+    cache = ScanCache(tmp_path / "cache.json", "schema-1")
+    cache.get(lab)
+    cache.put(lab, ["result"])
+    lab.write_text("```sql\nSELECT 2\n```\n", encoding="utf-8")
+
+    assert _reopen(cache).get(lab) is None
+
+
+def test_edit_during_the_run_still_misses_next_time(tmp_path):
+    lab = _lab(tmp_path)
+    cache = ScanCache(tmp_path / "cache.json", "schema-1")
+    cache.get(lab)
+    lab.write_text("```sql\nSELECT 2\n```\n", encoding="utf-8")  # saved while the tool was scanning
+    cache.put(lab, ["stale result"])
+
+    assert _reopen(cache).get(lab) is None
+
+
+def test_new_fingerprint_starts_empty(tmp_path):
+    lab = _lab(tmp_path)
+    cache = ScanCache(tmp_path / "cache.json", "schema-1")
+    cache.get(lab)
+    cache.put(lab, ["result"])
+    cache.save()
+
+    assert ScanCache(cache.path, "schema-2").get(lab) is None
+
+
+def test_fingerprint_follows_source_contents(tmp_path):
+    schema = _lab(tmp_path, "schema.sql", "CREATE TABLE A (ID INT);")
+    before = fingerprint([schema])
+    schema.write_text("CREATE TABLE A (ID INT, Name NVARCHAR(10));", encoding="utf-8")
+
+    assert fingerprint([schema]) != before
+
+
+def test_deleted_files_are_dropped_on_save(tmp_path):
+    kept, deleted = _lab(tmp_path, "kept.md"), _lab(tmp_path, "deleted.md")
+    cache = ScanCache(tmp_path / "cache.json", "schema-1")
+    for lab in (kept, deleted):
+        cache.get(lab)
+        cache.put(lab, [lab.name])
+    deleted.unlink()
+    cache.save()
+
+    assert set(json.loads(cache.path.read_text(encoding="utf-8"))["files"]) == {str(kept)}
+
+
+def test_unreadable_cache_file_is_ignored(tmp_path):
+    lab = _lab(tmp_path)
+    path = tmp_path / "cache.json"
+    path.write_text("{not json", encoding="utf-8")
+
+    assert ScanCache(path, "schema-1").get(lab) is None
+
+
+def test_digest_reuses_the_hash_get_took(tmp_path):
+    lab = _lab(tmp_path)
+    cache = ScanCache(tmp_path / "cache.json", "schema-1")
+    cache.get(lab)
+    original = file_digest(lab)
+    lab.write_text("```sql\nSELECT 2\n```\n", encoding="utf-8")
+
+    assert cache.digest(lab) == original
+    assert cache.digest(_lab(tmp_path, "other.md")) == file_digest(tmp_path / "other.md")
+
+
+def test_validator_does_not_cache_files_it_failed_on(tmp_path, monkeypatch):
+    lab = _lab(tmp_path, text="```sql\nSELECT e.Nope FROM Employees e\n```\n")
+    validator = ColumnReferenceValidator(str(MASTER_SQL))
+    cache = ScanCache(tmp_path / "cache.json", "schema-1")
+
+    def crash(*args):
+        raise RuntimeError("boom")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(validator, "validate_sql_block", crash)
+        assert validator.validate_directory(str(tmp_path), cache=cache)["total_issues"] == 0
+    assert cache.entries == {}
+
+    assert validator.validate_directory(str(tmp_path), cache=cache)["total_issues"] == 1
+    assert list(cache.entries) == [str(lab)]
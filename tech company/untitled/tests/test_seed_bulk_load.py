@@ -0,0 +1,79 @@
+import pytest
+
+from seed_bulk_load import NotLiteral, literal_field, parse_inserts
+from sql_lexer import tokenize
+
+
+def _value(text):
+    return tokenize(text)
+
+
+def _parse(sql):
+    warnings = []
+    return list(parse_inserts(sql, warnings)), warnings
+
+
+def test_multi_row_insert():
+    sql = (
+        "-- INSERT INTO Skipped (A) VALUES (1)\n"
+        "INSERT INTO dbo.Departments (DepartmentName, [Budget]) VALUES\n"
+        "('Sales', 1000.50),\n"
+        "('R&D, Labs', NULL);\n"
+        "PRINT 'done';"
+    )
+    (statement,), warnings = _parse(sql)
+
+    assert warnings == []
+    assert statement.table == "dbo.Departments"
+    assert statement.columns == ["DepartmentName", "Budget"]
+    assert [[literal_field(value) for value in row] for row in statement.rows] == [
+        ["Sales", "1000.50"],
+        ["R&D, Labs", None],
+    ]
+    assert sql[statement.span[0] : statement.span[1]].endswith("NULL);")
+    assert sql[statement.span[0] :].startswith("INSERT INTO dbo.Departments")
+
+
+def test_function_arguments_stay_in_one_value():
+    (statement,), _ = _parse("INSERT Projects (Name, StartDate) VALUES ('Apollo', DATEADD(day, -1, GETDATE()))")
+
+    assert statement.table == "Projects"
+    name, start_date = statement.rows[0]
+    assert literal_field(name) == "Apollo"
+    with pytest.raises(NotLiteral, match="DATEADD"):
+        literal_field(start_date)
+
+
+def test_inserts_without_values_are_left_alone():
+    sql = (
+        "INSERT INTO Archive SELECT * FROM Employees;\n"
+        "INSERT INTO Archive (EmployeeID) SELECT EmployeeID FROM Employees;"
+    )
+    statements, warnings = _parse(sql)
+
+    assert statements == []
+    assert warnings == [
+        "line 1: INSERT INTO Archive has no column list; left as is",
+        "line 2: INSERT INTO Archive is not fed by VALUES; left as is",
+    ]
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("'O''Brien'", "O'Brien"),
+        ("N'Maseru'", "Maseru"),
+        ("42", "42"),
+        ("-3.5", "-3.5"),
+        ("+7", "7"),
+        ("null", None),
+    ],
+)
+def test_literal_fields(text, expected):
+    assert literal_field(_value(text)) == expected
+
+
+@pytest.mark.parametrize("text", ["DEFAULT", "SYSDATETIME()", "1 + 2"])
+def test_computed_values_are_not_literals(text):
+    with pytest.raises(NotLiteral):
+        literal_field(_value(text))
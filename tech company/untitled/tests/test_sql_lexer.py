@@ -0,0 +1,116 @@
+from sql_lexer import (
+    COMMENT,
+    NAME,
+    NUMBER,
+    OPERATOR,
+    STRING,
+    VARIABLE,
+    CodeMask,
+    bare_words,
+    code_tokens,
+    split_name,
+    tokenize,
+)
+
+
+def _code_names(sql):
+    return [token.text for token in code_tokens(tokenize(sql)) if token.kind == NAME]
+
+
+def test_comments_are_masked():
+    sql = "SELECT e.FirstName -- e.Salary\nFROM Employees e /* e.Bonus\n e.Title */ WHERE e.IsActive = 1"
+    tokens = tokenize(sql)
+    mask = CodeMask(tokens)
+
+    assert [token.kind for token in tokens if token.text.startswith(("--", "/*"))] == [COMMENT, COMMENT]
+    assert not mask.is_code(sql.index("e.Salary"))
+    assert not mask.is_code(sql.index("e.Title"))
+    assert mask.is_code(sql.index("e.IsActive"))
+    assert "e.Salary" not in _code_names(sql)
+    assert "e.IsActive" in _code_names(sql)
+
+
+def test_unterminated_block_comment_runs_to_the_end():
+    sql = "SELECT e.FirstName FROM Employees e /* e.Salary"
+    assert _code_names(sql) == ["SELECT", "e.FirstName", "FROM", "Employees", "e"]
+
+
+def test_comment_markers_inside_literals_are_text():
+    sql = "SELECT '-- not a comment', e.LastName, '/* nor this */' FROM Employees e"
+    tokens = tokenize(sql)
+
+    assert [token.kind for token in tokens if token.kind in (STRING, COMMENT)] == [STRING, STRING]
+    assert "e.LastName" in _code_names(sql)
+
+
+def test_plain_literals_are_masked():
+    sql = "PRINT 'Average e.BaseSalary and bonus'; SELECT e.FirstName FROM Employees e"
+    mask = CodeMask(tokenize(sql))
+
+    assert not mask.is_code(sql.index("e.BaseSalary"))
+    assert "e.BaseSalary" not in _code_names(sql)
+
+
+def test_same_reference_twice_on_a_line():
+    sql = "SELECT e.Title, 'e.Title' AS Label -- e.Title\nFROM Employees e"
+    mask = CodeMask(tokenize(sql))
+    offsets = [index for index in range(len(sql)) if sql.startswith("e.Title", index)]
+
+    assert [mask.is_code(offset) for offset in offsets] == [True, False, False]
+
+
+def test_dynamic_sql_literals_are_code():
+    sql = "SET @sql = 'SELECT e.FirstName FROM Employees e WHERE e.IsActive = 1'"
+    mask = CodeMask(tokenize(sql))
+
+    assert mask.is_code(sql.index("e.FirstName"))
+    names = _code_names(sql)
+    assert "e.FirstName" in names and "e.IsActive" in names
+
+
+def test_dynamic_sql_keywords_are_case_insensitive():
+    sql = "SET @sql = 'exec dbo.usp_Report @Dept = e.DepartmentID'"
+    assert "e.DepartmentID" in _code_names(sql)
+
+
+def test_dynamic_sql_offsets_point_into_the_block():
+    sql = "SET @sql = 'SELECT e.FirstName FROM Employees e'"
+    (reference,) = [token for token in code_tokens(tokenize(sql)) if token.text == "e.FirstName"]
+    assert sql[reference.start : reference.end] == "e.FirstName"
+
+
+def test_escaped_quotes_stay_inside_one_literal():
+    sql = "SELECT 'O''Brien e.Title' AS Name, e.LastName FROM Employees e"
+    strings = [token.text for token in tokenize(sql) if token.kind == STRING]
+
+    assert strings == ["'O''Brien e.Title'"]
+    assert "e.Title" not in _code_names(sql)
+
+
+def test_unicode_prefix_joins_the_literal():
+    (literal,) = [token for token in tokenize("WHERE e.LastName = N'Smith'") if token.kind == STRING]
+    assert literal.text == "N'Smith'"
+
+
+def test_token_kinds_and_offsets():
+    sql = "WHERE [e].[Base Salary] >= @Min + 1.5"
+    tokens = tokenize(sql)
+
+    assert [(token.kind, token.text) for token in tokens] == [
+        (NAME, "WHERE"),
+        (NAME, "[e].[Base Salary]"),
+        (OPERATOR, ">="),
+        (VARIABLE, "@Min"),
+        (OPERATOR, "+"),
+        (NUMBER, "1.5"),
+    ]
+    assert all(sql[token.start : token.end] == token.text for token in tokens)
+
+
+def test_split_name_keeps_brackets_whole():
+    assert split_name("dbo.[Order.Details].Qty") == ("dbo", "[Order.Details]", "Qty")
+
+
+def test_bare_words_skip_names_that_cannot_be_keywords():
+    words = bare_words(tokenize("select e.Title, [From], 'x' from #Temp"))
+    assert words == ["SELECT", "", "", "", "", "", "FROM", "#TEMP"]
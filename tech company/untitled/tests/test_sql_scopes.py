@@ -0,0 +1,69 @@
+from sql_lexer import code_tokens, tokenize
+from sql_scopes import CTE, DERIVED, TABLE, resolve_scopes, schema_table
+
+
+def _resolved(sql):
+    """(reference text, Source its qualifier resolves to, Scope) for every dotted reference in `sql`."""
+    tokens = code_tokens(tokenize(sql))
+    scopes = resolve_scopes(tokens)
+    return [
+        (token.text, scope.lookup(token.parts[0]), scope)
+        for token, scope in zip(tokens, scopes)
+        if token.is_reference
+    ]
+
+
+def test_aliases_reused_across_statements():
+    sql = (
+        "SELECT e.FirstName FROM Employees e\n"
+        "SELECT e.ProjectID FROM EmployeeProjects e;\n"
+        "SELECT e.Total FROM (SELECT COUNT(*) AS Total FROM Orders) e"
+    )
+    (_, first, _), (_, second, _), (_, third, _) = _resolved(sql)
+
+    assert (first.kind, first.table) == (TABLE, "Employees")
+    assert (second.kind, second.table) == (TABLE, "EmployeeProjects")
+    assert third.kind == DERIVED
+
+
+def test_cte_names_are_not_schema_tables():
+    sql = "WITH Recent AS (SELECT o.OrderID FROM Orders o) SELECT r.OrderID FROM Recent r"
+    (_, inner, _), (_, outer, scope) = _resolved(sql)
+
+    assert (inner.kind, inner.table) == (TABLE, "Orders")
+    assert (outer.kind, outer.table) == (CTE, "Recent")
+    assert schema_table(scope, "r", {"orders", "recent"}) is None
+
+
+def test_apply_operand_sees_the_outer_query():
+    sql = (
+        "SELECT c.CustomerID, x.Total FROM Customers c\n"
+        "CROSS APPLY (SELECT SUM(o.TotalAmount) AS Total FROM Orders o WHERE o.CustomerID = c.CustomerID) x"
+    )
+    resolved = {(text, source.table, source.kind) for text, source, _ in _resolved(sql)}
+
+    assert ("x.Total", "x", DERIVED) in resolved
+    assert ("o.TotalAmount", "Orders", TABLE) in resolved
+    assert ("c.CustomerID", "Customers", TABLE) in resolved
+
+
+def test_correlated_exists_resolves_through_the_parent_scope():
+    sql = (
+        "SELECT c.CompanyName FROM Customers c\n"
+        "WHERE EXISTS (SELECT 1 FROM Orders o WHERE o.CustomerID = c.CustomerID)"
+    )
+    (_, outer, outer_scope), (_, inner, inner_scope), (_, correlated, correlated_scope) = _resolved(sql)
+
+    assert outer.table == "Customers" and inner.table == "Orders" and correlated.table == "Customers"
+    assert correlated_scope is inner_scope
+    assert "c" not in inner_scope.sources and "o" not in outer_scope.sources
+    assert inner_scope.parent is outer_scope
+
+
+def test_schema_table_accepts_unbound_table_names():
+    (_, _, scope), = _resolved("SELECT Employees.FirstName FROM Employees")
+    tables = {"employees", "departments"}
+
+    assert schema_table(scope, "Employees", tables) == "employees"
+    assert schema_table(scope, "[Departments]", tables) == "departments"
+    assert schema_table(scope, "Unknown", tables) is None
@@ -0,0 +1,29 @@
+import pytest
+
+from synthetic_data import Component, KeyGroup
+
+
+def _component(name, size):
+    return Component((name,), lambda k: (str(k),), size)
+
+
+def _keys(group, rows):
+    group.spread(rows)
+    return [tuple(value for (value,) in group.values(row)) for row in range(rows)]
+
+
+def test_composite_key_varies_every_component():
+    keys = _keys(KeyGroup([_component("indicator", 5000), _component("day", 3_000_000)]), 5000)
+
+    assert len(set(keys)) == 5000
+    assert len({indicator for indicator, _ in keys}) == 71
+    assert len({day for _, day in keys}) == 71
+
+
+@pytest.mark.parametrize("sizes, rows", [((5000, 4), 5000), ((3, 7, 2), 42), ((10, 10), 1)])
+def test_small_trailing_components_still_give_distinct_keys(sizes, rows):
+    group = KeyGroup([_component(f"c{index}", size) for index, size in enumerate(sizes)])
+    keys = _keys(group, rows)
+
+    assert len(set(keys)) == rows
+    assert all(int(value) < size for key in keys for value, size in zip(key, sizes))
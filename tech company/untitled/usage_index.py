@@ -0,0 +1,208 @@
+"""On-disk index of every table.column reference the fixer resolves.
+
+`ColumnReferenceFixer` already resolves each reference in every SQL block
+to a schema table and column; `UsageIndex` keeps those occurrences in a
+SQLite file instead of letting them go once the top-20 usage table is
+printed. Questions such as "where is Employees.JobTitle used?" or "which
+labs touch TimeTracking?" are then one indexed lookup away, and a column
+rename only opens the files (and parses the blocks) that use the column:
+
+    python fix_column_references.py query Employees.JobTitle
+    python fix_column_references.py query TimeTracking --files
+    python fix_column_references.py rename Employees.Title Employees.JobTitle
+
+Each row is one occurrence: the table and column as the schema spells
+them, the markdown file, the line of the reference and the line of the
+opening fence of its block. `resolved` is 0 when the table is known but the
+column is not (the fixer's unresolved references). A run replaces a file's
+rows as it merges the file, along with the SHA-256 of the content they were
+found in, so `rename` can tell whether the recorded blocks are still current.
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from scan_cache import CACHE_DIR_NAME
+
+INDEX_VERSION = 2
+INDEX_FILE_NAME = "column_usage.sqlite"
+
+PathLike = Union[str, Path]
+# (table, column, line, block, resolved) as produced by the fixer for one file.
+ReferenceRow = Tuple[str, str, int, int, bool]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    sha256 TEXT NOT NULL DEFAULT ''
+);
+CREATE TABLE IF NOT EXISTS refs (
+    table_name TEXT NOT NULL COLLATE NOCASE,
+    column_name TEXT NOT NULL COLLATE NOCASE,
+    file_id INTEGER NOT NULL REFERENCES files (id),
+    line INTEGER NOT NULL,
+    block INTEGER NOT NULL,
+    resolved INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS refs_by_column ON refs (table_name, column_name);
+CREATE INDEX IF NOT EXISTS refs_by_file ON refs (file_id);
+"""
+
+
+class Occurrence(NamedTuple):
+    table: str
+    column: str
+    file: str
+    line: int
+    block: int
+    resolved: bool
+
+
+def default_index_path(directory: PathLike) -> Path:
+    return Path(directory) / CACHE_DIR_NAME / INDEX_FILE_NAME
+
+
+def parse_target(target: str) -> Tuple[Optional[str], Optional[str]]:
+    """Split `Table`, `Table.Column`, `*.Column` or `dbo.Table.Column` into (table, column).
+
+    Brackets are dropped and `*` (or an empty part) matches anything.
+    """
+    parts = [part.strip().strip("[]") for part in target.split(".")]
+    if len(parts) == 3:
+        parts = parts[1:]
+    if len(parts) > 2 or not any(part not in ("", "*") for part in parts):
+        raise ValueError(f"expected Table, Table.Column or *.Column, got {target!r}")
+    table = parts[0] if parts[0] not in ("", "*") else None
+    column = parts[1] if len(parts) == 2 and parts[1] not in ("", "*") else None
+    return table, column
+
+
+class UsageIndex:
+    """SQLite-backed map of (table, column) -> every file and line that references it."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._file_ids: Dict[str, int] = {}
+        self._db = sqlite3.connect(str(path))
+        try:
+            version = self._db.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        except sqlite3.OperationalError:
+            version = None  # a new file, or one from before the meta table
+        except sqlite3.DatabaseError:
+            # Not an SQLite file at all: start over rather than fail every run.
+            self._db.close()
+            path.unlink()
+            self._db = sqlite3.connect(str(path))
+            version = None
+        if version is None or version[0] != str(INDEX_VERSION):
+            self._db.executescript("DROP TABLE IF EXISTS refs; DROP TABLE IF EXISTS files; DROP TABLE IF EXISTS meta;")
+        self._db.executescript(_SCHEMA)
+        self._db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('version', ?)", (str(INDEX_VERSION),))
+
+    @classmethod
+    def open_existing(cls, path: Path) -> "UsageIndex":
+        """Open an index for querying; a missing file is an error rather than a new empty index."""
+        if not path.is_file():
+            raise FileNotFoundError(f"No usage index at {path}; run fix_column_references.py (e.g. --dry-run) first")
+        return cls(path)
+
+    def replace_file(self, file: PathLike, rows: Iterable[ReferenceRow], digest: str = "") -> None:
+        """Drop what the index holds for `file` and record `rows` (found in content `digest`) instead."""
+        file_id = self._file_id(str(file))
+        self._db.execute("UPDATE files SET sha256 = ? WHERE id = ?", (digest, file_id))
+        self._db.execute("DELETE FROM refs WHERE file_id = ?", (file_id,))
+        self._db.executemany(
+            "INSERT INTO refs (table_name, column_name, file_id, line, block, resolved) VALUES (?, ?, ?, ?, ?, ?)",
+            ((table, column, file_id, line, block, int(resolved)) for table, column, line, block, resolved in rows),
+        )
+
+    def _file_id(self, path: str) -> int:
+        file_id = self._file_ids.get(path)
+        if file_id is None:
+            self._db.execute("INSERT OR IGNORE INTO files (path) VALUES (?)", (path,))
+            file_id = self._db.execute("SELECT id FROM files WHERE path = ?", (path,)).fetchone()[0]
+            self._file_ids[path] = file_id
+        return file_id
+
+    def digest(self, file: PathLike) -> str:
+        """SHA-256 of `file` as last indexed, or "" when unknown."""
+        row = self._db.execute("SELECT sha256 FROM files WHERE path = ?", (str(file),)).fetchone()
+        return row[0] if row else ""
+
+    def rename_column(self, file: PathLike, table: str, old: str, new: str, digest: str) -> None:
+        """Record that `table.old` was renamed in `file` (now with content `digest`) without rescanning it.
+
+        A rename only changes identifiers within their lines, so the lines and blocks stay valid.
+        """
+        file_id = self._file_id(str(file))
+        self._db.execute(
+            "UPDATE refs SET column_name = ?, resolved = 1 WHERE file_id = ? AND table_name = ? AND column_name = ?",
+            (new, file_id, table, old),
+        )
+        self._db.execute("UPDATE files SET sha256 = ? WHERE id = ?", (digest, file_id))
+
+    def save(self) -> None:
+        """Forget files that no longer exist and commit the run's changes."""
+        files = self._db.execute("SELECT id, path FROM files").fetchall()
+        stale = [(file_id,) for file_id, path in files if not os.path.exists(path)]
+        self._db.executemany("DELETE FROM refs WHERE file_id = ?", stale)
+        self._db.executemany("DELETE FROM files WHERE id = ?", stale)
+        self._db.commit()
+
+    def close(self) -> None:
+        self._db.close()
+
+    def occurrences(self, table: Optional[str] = None, column: Optional[str] = None) -> Iterator[Occurrence]:
+        """Every occurrence matching `table` and/or `column` (case-insensitive), by file and line."""
+        clauses: List[str] = []
+        params: List[str] = []
+        if table is not None:
+            clauses.append("refs.table_name = ?")
+            params.append(table)
+        if column is not None:
+            clauses.append("refs.column_name = ?")
+            params.append(column)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        query = (
+            "SELECT refs.table_name, refs.column_name, files.path, refs.line, refs.block, refs.resolved "
+            f"FROM refs JOIN files ON files.id = refs.file_id {where} "
+            "ORDER BY files.path, refs.line, refs.table_name, refs.column_name"
+        )
+        for table_name, column_name, path, line, block, resolved in self._db.execute(query, params):
+            yield Occurrence(table_name, column_name, path, line, block, bool(resolved))
+
+
+def format_occurrences(occurrences: Sequence[Occurrence], files_only: bool = False) -> Iterator[str]:
+    """Render query results: one file per line, with the lines or columns it uses."""
+    by_file: Dict[str, List[Occurrence]] = {}
+    for occurrence in occurrences:
+        by_file.setdefault(occurrence.file, []).append(occurrence)
+    if files_only:
+        yield from by_file
+        return
+
+    names = sorted({f"{o.table}.{o.column}" for o in occurrences}, key=str.lower)
+    tables = sorted({o.table for o in occurrences}, key=str.lower)
+    subject = names[0] if len(names) == 1 else ", ".join(tables)
+    yield f"{subject}: {len(occurrences)} references in {len(by_file)} files"
+    for path, found in by_file.items():
+        if len(names) == 1:
+            lines = sorted({o.line for o in found})
+            yield f"  {path}: line{'s' if len(lines) > 1 else ''} {', '.join(map(str, lines))}"
+        else:
+            counts: Dict[str, int] = {}
+            for o in found:
+                key = f"{o.table}.{o.column}" if len(tables) > 1 else o.column
+                counts[key] = counts.get(key, 0) + 1
+            used = ", ".join(f"{name} ({count})" for name, count in counts.items())
+            yield f"  {path} ({len(found)}): {used}"
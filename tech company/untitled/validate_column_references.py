@@ -1,68 +1,105 @@
 #!/usr/bin/env python3
 """
-SQL Column Reference Validator and Fixer
+SQL Column Reference Validator
 
 This script validates column references in T-SQL queries within markdown files
-against a schema definition from Results.json. It can detect invalid column
-references and optionally fix them with suggestions.
+against a schema definition from Results.json (or a setup .sql script). It can
+detect invalid column references and suggest where the column does exist.
+It also lints the WHERE/ON/HAVING predicates: comparisons that make SQL
+Server convert a column (implicit_conversions.py, given column types) and
+non-sargable ones that cannot seek an index (sargability.py).
 
 Usage:
-    python validate_column_references.py [--fix] [--output report.md]
+    python validate_column_references.py [--output report.md] [--jobs N]
     
 Options:
-    --fix           Automatically fix invalid column references where possible
     --output FILE   Write validation report to specified file (default: validation_report.md)
     --verbose       Show detailed progress information
+    --jobs N        Validate files in N worker processes (0 = one per CPU)
+    --no-cache      Re-validate every file instead of reusing cached results
+    --types FILE    Setup script to read column types from when the schema has none
+                    (default: ../00_TechCorp_MASTER_Setup.sql)
+    --jsonl FILE    Also stream every issue to FILE as JSON Lines
+    --sarif FILE    Also write every issue to FILE as a SARIF 2.1.0 log
+    --watch         Keep running and revalidate files as they are saved
+    --profile       Print wall time and call counts per stage at the end
 """
 
-import json
-import re
+import io
 import os
+import time
+from itertools import chain
 from pathlib import Path
 from collections import defaultdict
-from typing import Dict, List, Set, Tuple
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
 import argparse
 
+from file_pool import map_files
+from file_watch import matching, open_watcher
+from findings import RULES_BY_ID, UNKNOWN_COLUMN, UNKNOWN_TABLE, FindingStream, make_finding
+from git_changes import GitError, select_changed
+from implicit_conversions import check_comparison
+from line_index import LineIndex
+from md_fences import SQL_LANGS, iter_fences, sql_fences
+from report_stream import MarkdownStream, Spool
+from sargability import check_disjunction, check_sargability
+from scan_cache import SHARED_SOURCES, ScanCache, default_cache_path, fingerprint
+from schema_catalog import SchemaCatalog, expand_sources, load_catalog
+from sql_lexer import CodeMask, Token, code_tokens, references, table_sources, tokenize
+from sql_predicates import ColumnType, comparisons, disjunctions, predicate_tokens
+from sql_scopes import TABLE, Scope, resolve_scopes, schema_table
+from stage_profile import PROFILER, add_profile_arguments, finish_profile, start_profile
+
+# Results.json lists columns without their types; the predicate checks read them from the setup script.
+DEFAULT_TYPE_SOURCES = (str(Path(__file__).resolve().parent.parent / '00_TechCorp_MASTER_Setup.sql'),)
+
 
 class ColumnReferenceValidator:
-    """Validates and fixes column references in SQL queries."""
+    """Validates column references in SQL queries."""
     
-    def __init__(self, schema_file: str):
-        """Initialize validator with schema from Results.json."""
+    def __init__(self, schema_file: str, type_sources: Sequence[str] = DEFAULT_TYPE_SOURCES):
+        """
+        Initialize validator with schema from Results.json. Column types come
+        from the schema itself, or from type_sources when it has none.
+        """
         self.schema = self._load_schema(schema_file)
+        self.types = self._load_types(type_sources)
         self.table_columns = self._build_table_column_map()
-        self.all_columns = self._build_all_columns_set()
+        self.column_tables = self._build_column_table_index()
+        self.available_columns = {
+            table: ', '.join(sorted(columns)) for table, columns in self.table_columns.items()
+        }
         self.issues = []
         
-    def _load_schema(self, schema_file: str) -> List[Dict]:
-        """Load schema from Results.json."""
-        with open(schema_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
+    def _load_schema(self, schema_file: str) -> SchemaCatalog:
+        """Load schema from Results.json or a setup script via the shared catalog."""
+        return load_catalog([schema_file])
+    
+    def _load_types(self, type_sources: Sequence[str]) -> Optional[SchemaCatalog]:
+        """The catalog that knows the column types, or None when no source has them."""
+        if any(column.data_type for table in self.schema for column in table.columns.values()):
+            return self.schema
+        sources = [source for source in type_sources if os.path.exists(source)]
+        return load_catalog(sources) if sources else None
     
     def _build_table_column_map(self) -> Dict[str, Set[str]]:
         """Build a map of table names to their columns."""
-        table_map = defaultdict(set)
-        for item in self.schema:
-            table_name = item['TableName'].lower()
-            column_name = item['ColumnName'].lower()
-            table_map[table_name].add(column_name)
-        return dict(table_map)
-    
-    def _build_all_columns_set(self) -> Set[str]:
-        """Build a set of all column names across all tables."""
-        all_cols = set()
-        for item in self.schema:
-            all_cols.add(item['ColumnName'].lower())
-        return all_cols
+        table_map = {}
+        for table in self.schema:
+            table_map[table.name.lower()] = {column.lower() for column in table.column_names}
+        return table_map
+    
+    def _build_column_table_index(self) -> Dict[str, List[str]]:
+        """Build an inverted map of column names to the tables that have them."""
+        column_map = defaultdict(list)
+        for table, columns in self.table_columns.items():
+            for column in columns:
+                column_map[column].append(table)
+        return dict(column_map)
     
     def find_table_for_column(self, column: str) -> List[str]:
         """Find which table(s) contain a specific column."""
-        column_lower = column.lower()
-        tables = []
-        for table, columns in self.table_columns.items():
-            if column_lower in columns:
-                tables.append(table)
-        return tables
+        return list(self.column_tables.get(column.lower(), ()))
     
     def validate_column_reference(self, table: str, column: str) -> Tuple[bool, str]:
         """
@@ -86,7 +123,7 @@ class ColumnReferenceValidator:
             else:
                 # Column doesn't exist anywhere - check for similar columns
                 suggestion = f"Column '{column}' does not exist in table '{table}' or any other table. " \
-                           f"Available columns in '{table}': {', '.join(sorted(self.table_columns[table_lower]))}"
+                           f"Available columns in '{table}': {self.available_columns[table_lower]}"
             return False, suggestion
         
         return True, "Valid"
@@ -97,71 +134,52 @@ class ColumnReferenceValidator:
         Returns list of (sql_content, start_line, end_line).
         """
         sql_blocks = []
-        lines = content.split('\n')
-        in_sql_block = False
-        current_block = []
-        start_line = 0
-        
-        for i, line in enumerate(lines, 1):
-            if re.match(r'^```sql', line, re.IGNORECASE):
-                in_sql_block = True
-                start_line = i + 1
-                current_block = []
-            elif in_sql_block and line.strip().startswith('```'):
-                in_sql_block = False
-                if current_block:
-                    sql_blocks.append(('\n'.join(current_block), start_line, i - 1))
-            elif in_sql_block:
-                current_block.append(line)
-        
+        for fence in iter_fences(content.splitlines(True)):
+            if fence.lang in SQL_LANGS and fence.body:
+                line_count = fence.body.count('\n') + (not fence.body.endswith('\n'))
+                sql_blocks.append((fence.body, fence.body_line, fence.body_line + line_count - 1))
         return sql_blocks
     
-    def extract_table_column_references(self, sql: str) -> List[Tuple[str, str, str, int]]:
+    def extract_table_column_references(self, sql: str, tokens: List[Token] = None) -> List[Tuple[str, str, str, int]]:
         """
         Extract table.column references from SQL.
         Returns list of (full_reference, table, column, position).
         """
-        references = []
-        
-        # Pattern for table.column or alias.column
-        # Matches: TableName.ColumnName, t.ColumnName, [TableName].[ColumnName], etc.
-        pattern = r'\b([a-zA-Z_][\w]*|\[[^\]]+\])\.([a-zA-Z_][\w]*|\[[^\]]+\])\b'
+        if tokens is None:
+            tokens = code_tokens(tokenize(sql))
+        references_found = []
         
-        for match in re.finditer(pattern, sql):
-            full_ref = match.group(0)
-            table_part = match.group(1).strip('[]')
-            column_part = match.group(2).strip('[]')
-            position = match.start()
+        # Dotted names from the shared lexer: TableName.ColumnName, t.ColumnName,
+        # [TableName].[ColumnName], etc. Comments and string literals never
+        # produce name tokens, so they are skipped implicitly.
+        keywords = {'master', 'sys', 'information_schema', 'dbo', 'tempdb'}
+        for token in references(tokens):
+            table_raw, column_raw = token.parts[0], token.parts[1]
+            table_part = table_raw.strip('[]')
+            column_part = column_raw.strip('[]')
             
             # Skip common SQL keywords that might match the pattern
-            keywords = {'master', 'sys', 'information_schema', 'dbo', 'tempdb'}
             if table_part.lower() not in keywords:
-                references.append((full_ref, table_part, column_part, position))
+                full_ref = f"{table_raw}.{column_raw}"
+                references_found.append((full_ref, table_part, column_part, token.start))
         
-        return references
+        return references_found
     
-    def extract_table_aliases(self, sql: str) -> Dict[str, str]:
+    def extract_table_aliases(self, sql: str, tokens: List[Token] = None) -> Dict[str, str]:
         """
         Extract table aliases from SQL.
         Returns dict of {alias: table_name}.
         """
+        if tokens is None:
+            tokens = code_tokens(tokenize(sql))
         aliases = {}
         
-        # Pattern for FROM/JOIN table AS alias or FROM/JOIN table alias
-        patterns = [
-            r'\bFROM\s+([a-zA-Z_][\w]*|\[[^\]]+\])\s+(?:AS\s+)?([a-zA-Z_][\w]+)',
-            r'\bJOIN\s+([a-zA-Z_][\w]*|\[[^\]]+\])\s+(?:AS\s+)?([a-zA-Z_][\w]+)',
-            r'\bINNER\s+JOIN\s+([a-zA-Z_][\w]*|\[[^\]]+\])\s+(?:AS\s+)?([a-zA-Z_][\w]+)',
-            r'\bLEFT\s+(?:OUTER\s+)?JOIN\s+([a-zA-Z_][\w]*|\[[^\]]+\])\s+(?:AS\s+)?([a-zA-Z_][\w]+)',
-            r'\bRIGHT\s+(?:OUTER\s+)?JOIN\s+([a-zA-Z_][\w]*|\[[^\]]+\])\s+(?:AS\s+)?([a-zA-Z_][\w]+)',
-            r'\bFULL\s+(?:OUTER\s+)?JOIN\s+([a-zA-Z_][\w]*|\[[^\]]+\])\s+(?:AS\s+)?([a-zA-Z_][\w]+)',
-        ]
-        
-        for pattern in patterns:
-            for match in re.finditer(pattern, sql, re.IGNORECASE):
-                table_name = match.group(1).strip('[]')
-                alias = match.group(2)
-                aliases[alias.lower()] = table_name
+        # FROM/JOIN table AS alias or FROM/JOIN table alias
+        for table_token, alias_token in table_sources(tokens):
+            if alias_token is None:
+                continue
+            table_name = table_token.parts[-1].strip('[]')
+            aliases[alias_token.text.strip('[]').lower()] = table_name
         
         return aliases
     
@@ -172,79 +190,165 @@ class ColumnReferenceValidator:
         """
         issues = []
         
-        # Extract table aliases
-        aliases = self.extract_table_aliases(sql)
+        with PROFILER.stage('tokenize'):
+            raw_tokens = tokenize(sql)
+            tokens = code_tokens(raw_tokens, CodeMask(raw_tokens))
+        with PROFILER.stage('lines'):
+            lines = LineIndex(sql)
         
-        # Extract all table.column references
-        references = self.extract_table_column_references(sql)
+        # Resolve aliases per statement: each reference sees the names bound
+        # by its own query and the queries enclosing it
+        with PROFILER.stage('aliases'):
+            scope_at = dict(zip((token.start for token in tokens), resolve_scopes(tokens)))
         
-        for full_ref, table_part, column_part, position in references:
-            # Skip if this is in a comment (basic check)
-            sql_lines = sql.split('\n')
-            cumulative_pos = 0
-            current_line_num = 0
-            current_line = ""
-            
-            for i, line in enumerate(sql_lines):
-                if cumulative_pos + len(line) >= position:
-                    current_line_num = i
-                    current_line = line
-                    break
-                cumulative_pos += len(line) + 1  # +1 for newline
-            
-            # Skip if in a comment
-            if '--' in current_line:
-                comment_pos = current_line.find('--')
-                ref_pos = current_line.find(full_ref)
-                if ref_pos > comment_pos:
-                    continue  # Reference is in a comment, skip validation
+        with PROFILER.stage('references'):
+            self._check_references(sql, tokens, scope_at, lines, file_path, start_line, issues)
+        
+        with PROFILER.stage('predicates'):
+            self._check_predicates(sql, raw_tokens, scope_at, lines, file_path, start_line, issues)
+        
+        return issues
+    
+    def _check_references(self, sql: str, tokens: List[Token], scope_at: Dict, lines: LineIndex,
+                          file_path: str, start_line: int, issues: List[Dict]):
+        """Validate the block's table.column references, appending an issue per invalid one."""
+        block_references = self.extract_table_column_references(sql, tokens)
+        
+        for full_ref, table_part, column_part, position in block_references:
+            # Resolve alias to actual table name; CTE and derived-table
+            # columns are not schema references
+            source = scope_at[position].lookup(table_part)
+            if source is not None and source.kind != TABLE:
+                continue
+            table_name = source.table if source is not None else table_part
             
-            # Resolve alias to actual table name
-            table_name = aliases.get(table_part.lower(), table_part)
+            # Locate the line containing the reference
+            current_line_num = lines.line_of(position)
+            current_line = lines.line_text(current_line_num)
             
             # Validate the reference
             is_valid, message = self.validate_column_reference(table_name, column_part)
             
             if not is_valid:
+                unknown_table = table_name.lower() not in self.table_columns
                 issue = {
+                    'rule': (UNKNOWN_TABLE if unknown_table else UNKNOWN_COLUMN).id,
                     'file': file_path,
                     'line': start_line + current_line_num,
                     'reference': full_ref,
                     'table': table_name,
                     'column': column_part,
                     'original_table_part': table_part,
+                    'offset': position,
                     'message': message,
                     'sql_snippet': current_line.strip()
                 }
                 issues.append(issue)
+    
+    def _check_predicates(self, sql: str, raw_tokens: List[Token], scope_at: Dict, lines: LineIndex,
+                          file_path: str, start_line: int, issues: List[Dict]):
+        """
+        Flag WHERE/ON/HAVING comparisons that convert a column or cannot seek
+        an index, appending an issue per finding in block order.
+        """
+        def resolve(token: Token) -> Optional[ColumnType]:
+            scope = scope_at.get(token.start)
+            return self.column_type(token, scope) if scope is not None else None
         
-        return issues
+        tokens = predicate_tokens(raw_tokens)
+        found = list(comparisons(tokens))
+        findings = []
+        for comparison in found:
+            findings.extend(check_comparison(comparison, resolve, sql))
+            findings.extend(check_sargability(comparison, resolve, sql))
+        for branches in disjunctions(tokens, found):
+            finding = check_disjunction(branches, resolve)
+            if finding is not None:
+                findings.append(finding)
+        
+        for finding in sorted(findings, key=lambda finding: finding.token.start):
+            current_line_num = lines.line_of(finding.token.start)
+            issues.append({
+                'rule': finding.rule,
+                'file': file_path,
+                'line': start_line + current_line_num,
+                'reference': finding.token.text,
+                'table': finding.table,
+                'column': finding.column,
+                'offset': finding.token.start,
+                'message': finding.message,
+                'suggestion': finding.suggestion,
+                'sql_snippet': lines.line_text(current_line_num).strip()
+            })
+    
+    def column_type(self, token: Token, scope: Scope) -> Optional[ColumnType]:
+        """
+        Resolve a column reference in its scope to the table, column and type
+        (empty without type sources). A bare name resolves when exactly one
+        table of the innermost query that binds any has the column.
+        """
+        parts = token.parts
+        column_name = parts[-1].strip('[]')
+        if len(parts) > 1:
+            table_key = schema_table(scope, parts[-2], self.schema.tables)
+            candidates = [self.schema.tables[table_key]] if table_key else []
+        else:
+            candidates = []
+            level = scope
+            while level is not None and level.parent is not None:
+                if level.sources:
+                    if any(source.kind != TABLE for source in level.sources.values()):
+                        return None
+                    tables = (self.schema.table(source.table) for source in level.sources.values())
+                    candidates = [table for table in tables if table is not None and table.column(column_name)]
+                    break
+                level = level.parent
+        if len(candidates) != 1:
+            return None
+        table = candidates[0]
+        column = table.column(column_name)
+        if column is None:
+            return None
+        typed_table = self.types.table(table.name) if self.types is not None else None
+        typed_column = typed_table.column(column.name) if typed_table is not None else None
+        return ColumnType(table.name, column.name, typed_column.data_type if typed_column is not None else '')
     
     def validate_file(self, file_path: str) -> List[Dict]:
         """Validate all SQL blocks in a markdown file."""
+        issues = self.try_validate_file(file_path)
+        return issues if issues is not None else []
+    
+    def try_validate_file(self, file_path: str) -> Optional[List[Dict]]:
+        """Like validate_file, but None when the file could not be processed, so it is not cached as clean."""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            sql_blocks = self.extract_sql_blocks(content)
             all_issues = []
             
-            for sql, start_line, end_line in sql_blocks:
-                issues = self.validate_sql_block(sql, file_path, start_line)
-                all_issues.extend(issues)
+            # Blocks are streamed from the file; only one is held at a time.
+            for fence in sql_fences(file_path):
+                if fence.body:
+                    issues = self.validate_sql_block(fence.body, file_path, fence.body_line)
+                    all_issues.extend(issues)
             
             return all_issues
         except Exception as e:
             print(f"Error processing {file_path}: {e}")
-            return []
+            return None
     
-    def validate_directory(self, directory: str, pattern: str = "**/*.md") -> Dict:
+    def validate_directory(self, directory: str, pattern: str = "**/*.md", jobs: int = 1,
+                           cache: ScanCache = None, report: 'ValidationReport' = None,
+                           files: List[Path] = None) -> Dict:
         """
-        Validate all markdown files in directory.
+        Validate all markdown files in directory, or only `files` when given
+        (the --since/--staged selection).
+        With jobs > 1 the files are spread over a process pool; results are
+        merged in file order so the report matches a serial run. Files whose
+        content matches the cache are not parsed again.
+        When a report is given, each file's issues are streamed to it instead
+        of being kept in issues_by_file, so memory stays flat.
         Returns dict with validation results.
         """
         directory_path = Path(directory)
-        md_files = list(directory_path.glob(pattern))
+        md_files = sorted(directory_path.glob(pattern), key=str) if files is None else files
         
         results = {
             'total_files': len(md_files),
@@ -253,18 +357,113 @@ class ColumnReferenceValidator:
             'issues_by_file': {}
         }
         
-        for md_file in md_files:
-            issues = self.validate_file(str(md_file))
+        file_names = [str(md_file) for md_file in md_files]
+        cached = {}
+        if cache is not None:
+            for file_name in file_names:
+                issues = cache.get(file_name)
+                if issues is not None:
+                    cached[file_name] = issues
+        pending = [file_name for file_name in file_names if file_name not in cached]
+        fresh = map_files(_validate_in_worker, pending, jobs, _init_worker, (self,))
+        
+        for md_file, file_name in zip(md_files, file_names):
+            issues = cached.get(file_name)
+            if issues is None:
+                issues = next(fresh)
+                if issues is None:
+                    issues = []  # failed: reported already, and retried on the next run
+                elif cache is not None:
+                    cache.put(file_name, issues)
             if issues:
                 results['files_with_issues'] += 1
                 results['total_issues'] += len(issues)
-                results['issues_by_file'][str(md_file)] = issues
+                if report is not None:
+                    report.add_file(str(md_file), issues)
+                else:
+                    results['issues_by_file'][str(md_file)] = issues
         
         return results
     
     def generate_report(self, results: Dict, output_file: str = None) -> str:
         """Generate a markdown report of validation results."""
-        report_lines = [
+        report = ValidationReport()
+        for file_path, issues in sorted(results['issues_by_file'].items()):
+            report.add_file(file_path, issues)
+        
+        buffer = io.StringIO()
+        report.write(buffer, results)
+        report.close()
+        text = buffer.getvalue()
+        
+        if output_file:
+            with open(output_file, 'w', encoding='utf-8') as f:
+                f.write(text)
+            print(f"\n✅ Report written to: {output_file}")
+        
+        return text
+
+
+class ValidationReport:
+    """
+    Markdown report (plus optional JSONL/SARIF findings) built while files
+    are validated. Per-file sections go to a temporary spool as they arrive;
+    the summary that heads the report is written once the totals are known.
+    """
+    
+    def __init__(self, findings: FindingStream = None):
+        self.sections = Spool()
+        self.findings = findings
+    
+    @staticmethod
+    def section_lines(file_path: str, issues: List[Dict]) -> List[str]:
+        """The report section for one file's issues."""
+        lines = [f"### {Path(file_path).name}", "", f"**Issues Found:** {len(issues)}", ""]
+        for i, issue in enumerate(issues, 1):
+            lines.extend((
+                f"#### Issue {i}: Line {issue['line']}",
+                "",
+                f"- **Reference:** `{issue['reference']}`",
+                f"- **Table:** `{issue['table']}`",
+                f"- **Column:** `{issue['column']}`",
+                f"- **Problem:** {issue['message']}",
+                *([f"- **Suggestion:** {issue['suggestion']}"] if 'suggestion' in issue else []),
+                "",
+                "**SQL Snippet:**",
+                "```sql",
+                issue['sql_snippet'],
+                "```",
+                "",
+            ))
+        return lines
+    
+    def add_file(self, file_path: str, issues: List[Dict]):
+        """Spool the report section for one file (call in file path order)."""
+        with PROFILER.stage('report'):
+            self._add_file(file_path, issues)
+    
+    def _add_file(self, file_path: str, issues: List[Dict]):
+        for line in self.section_lines(file_path, issues):
+            self.sections.write(line)
+        
+        for issue in issues:
+            if self.findings is not None:
+                self.findings.write(make_finding(
+                    RULES_BY_ID[issue['rule']],
+                    issue['file'],
+                    issue['line'],
+                    issue['message'],
+                    reference=issue['reference'],
+                    table=issue['table'],
+                    column=issue['column'],
+                    snippet=issue['sql_snippet'],
+                    **({'suggestion': issue['suggestion']} if 'suggestion' in issue else {}),
+                ))
+    
+    def write(self, handle, results: Dict, sections: Iterable[str] = None):
+        """Write the summary followed by the spooled (or the given) sections to handle."""
+        out = MarkdownStream(handle)
+        out.write_all([
             "# SQL Column Reference Validation Report",
             "",
             f"**Generated:** {Path.cwd()}",
@@ -275,49 +474,171 @@ class ColumnReferenceValidator:
             f"- **Files with Issues:** {results['files_with_issues']}",
             f"- **Total Issues Found:** {results['total_issues']}",
             ""
-        ]
+        ])
         
         if results['total_issues'] == 0:
-            report_lines.append("✅ **No issues found! All column references are valid.**")
+            out.write("✅ **No issues found! All column references are valid.**")
         else:
-            report_lines.extend([
-                "## Issues by File",
-                ""
-            ])
-            
-            for file_path, issues in sorted(results['issues_by_file'].items()):
-                rel_path = Path(file_path).name
-                report_lines.extend([
-                    f"### {rel_path}",
-                    "",
-                    f"**Issues Found:** {len(issues)}",
-                    ""
-                ])
-                
-                for i, issue in enumerate(issues, 1):
-                    report_lines.extend([
-                        f"#### Issue {i}: Line {issue['line']}",
-                        "",
-                        f"- **Reference:** `{issue['reference']}`",
-                        f"- **Table:** `{issue['table']}`",
-                        f"- **Column:** `{issue['column']}`",
-                        f"- **Problem:** {issue['message']}",
-                        "",
-                        "**SQL Snippet:**",
-                        "```sql",
-                        issue['sql_snippet'],
-                        "```",
-                        ""
-                    ])
-        
-        report = '\n'.join(report_lines)
+            out.write_all(["## Issues by File", ""])
+            out.write_all(self.sections if sections is None else sections)
+        out.finish()
+    
+    def save(self, output_file: str, results: Dict):
+        """Write the markdown report to output_file and release the spool."""
+        with PROFILER.stage('report'), open(output_file, 'w', encoding='utf-8') as f:
+            self.write(f, results)
+        self.close()
+        print(f"\n✅ Report written to: {output_file}")
+    
+    def close(self):
+        self.sections.close()
+        if self.findings is not None:
+            self.findings.close()
+
+
+_worker_validator = None
+
+
+def _init_worker(validator: ColumnReferenceValidator):
+    """Keep the schema-loaded validator for every file this worker handles."""
+    global _worker_validator
+    _worker_validator = validator
+
+
+def _validate_in_worker(file_path: str) -> Optional[List[Dict]]:
+    return _worker_validator.try_validate_file(file_path)
+
+
+def _open_cache(args) -> ScanCache:
+    cache_path = Path(args.cache) if args.cache else default_cache_path(
+        args.directory, 'validate_column_references')
+    sources = [*expand_sources([args.schema]), *expand_sources(_type_sources(args))]
+    return ScanCache(cache_path, fingerprint([*sources, __file__, *SHARED_SOURCES]))
+
+
+def _type_sources(args) -> List[str]:
+    return [source for source in args.types if os.path.exists(source)]
+
+
+class WatchSession:
+    """
+    Watch mode: the schema and every file's issues stay in memory, and only
+    the files that are saved are validated again. Each file's report section
+    is rendered once and kept, so after a save the report is rewritten from
+    those sections without touching any other markdown file. Saving a schema
+    source reloads the schema and revalidates everything.
+    """
+    
+    def __init__(self, validator: ColumnReferenceValidator, args, cache: ScanCache = None):
+        self.validator = validator
+        self.args = args
+        self.cache = cache
+        self.directory = Path(args.directory)
+        self.output = Path(args.output)
+        self.schema_sources = {path.resolve() for path in expand_sources([args.schema, *_type_sources(args)])}
+        self.issues: Dict[str, List[Dict]] = {}
+        self.sections: Dict[str, List[str]] = {}
+    
+    def validate_all(self):
+        # The report is markdown too; validating its own snippets would feed back into it.
+        output = self.output.resolve()
+        md_files = [path for path in sorted(self.directory.glob(self.args.pattern), key=str)
+                    if path.resolve() != output]
+        results = self.validator.validate_directory(str(self.directory), self.args.pattern, jobs=self.args.jobs,
+                                                    cache=self.cache, files=md_files)
+        self.issues = {str(md_file): [] for md_file in md_files}
+        self.issues.update(results['issues_by_file'])
+        self.sections = {
+            name: ValidationReport.section_lines(name, issues) for name, issues in self.issues.items() if issues
+        }
+    
+    def refresh(self, path: Path) -> Tuple[int, int]:
+        """Revalidate one saved (or deleted) file; returns its issue count before and after."""
+        name = str(path)
+        before = len(self.issues.get(name, []))
+        if path.is_file():
+            issues = self.validator.try_validate_file(name)
+            if issues is None:
+                issues = []
+            elif self.cache is not None:
+                self.cache.put(name, issues)
+            self.issues[name] = issues
+        else:
+            issues = []
+            self.issues.pop(name, None)
+        if issues:
+            self.sections[name] = ValidationReport.section_lines(name, issues)
+        else:
+            self.sections.pop(name, None)
+        return before, len(issues)
+    
+    def results(self) -> Dict:
+        return {
+            'total_files': len(self.issues),
+            'files_with_issues': len(self.sections),
+            'total_issues': sum(len(issues) for issues in self.issues.values()),
+        }
+    
+    def write_report(self):
+        # Written aside and renamed, so an editor previewing the report never sees half of it.
+        temp_path = self.output.with_name(self.output.name + '.tmp')
+        report = ValidationReport()
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                sections = chain.from_iterable(self.sections[name] for name in sorted(self.sections))
+                report.write(f, self.results(), sections)
+        finally:
+            report.close()
+        os.replace(temp_path, self.output)
+    
+    def handle(self, paths: Set[Path], overflow: bool):
+        started = time.perf_counter()
+        if overflow or any(path.resolve() in self.schema_sources for path in paths):
+            print("🔁 Schema changed or events were lost; reloading and revalidating everything...")
+            self.validator = ColumnReferenceValidator(self.args.schema, self.args.types)
+            if self.cache is not None:
+                self.cache = _open_cache(self.args)
+            self.validate_all()
+            self.write_report()
+            totals = self.results()
+            print(f"   {totals['total_issues']} issue(s) in {totals['files_with_issues']} file(s) "
+                  f"({(time.perf_counter() - started) * 1000:.0f} ms)")
+            return
         
-        if output_file:
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write(report)
-            print(f"\n✅ Report written to: {output_file}")
+        output = self.output.resolve()
+        changed = [path for path in matching(paths, self.directory, self.args.pattern) if path.resolve() != output]
+        if not changed:
+            return
+        counts = [(path, self.refresh(path)) for path in changed]
+        self.write_report()
+        elapsed = (time.perf_counter() - started) * 1000
+        for path, (before, after) in counts:
+            if not path.exists():
+                print(f"🗑️  {path}: removed ({-before:+d} issue(s)) in {elapsed:.0f} ms")
+                continue
+            icon = '✅' if after == 0 else '⚠️ '
+            print(f"{icon} {path}: {after} issue(s) ({after - before:+d}) in {elapsed:.0f} ms")
+    
+    def run(self, polling: bool = False) -> int:
+        self.validate_all()
+        self.write_report()
+        totals = self.results()
+        print(f"📊 {totals['total_issues']} issue(s) in {totals['files_with_issues']} of "
+              f"{totals['total_files']} file(s); report at {self.output}")
         
-        return report
+        watcher = open_watcher(self.directory, self.args.pattern, sorted(self.schema_sources), polling=polling)
+        print(f"👀 Watching {self.directory} ({watcher.kind}); press Ctrl+C to stop")
+        try:
+            while True:
+                batch = watcher.wait()
+                self.handle(batch.paths, batch.overflow)
+        except KeyboardInterrupt:
+            print("\nStopped watching.")
+        finally:
+            watcher.close()
+            if self.cache is not None:
+                self.cache.save()
+        return 0
 
 
 def main():
@@ -328,7 +649,7 @@ def main():
     parser.add_argument(
         '--schema',
         default='Results.json',
-        help='Path to Results.json schema file (default: Results.json)'
+        help='Path to Results.json or a setup .sql script (default: Results.json)'
     )
     parser.add_argument(
         '--directory',
@@ -350,8 +671,66 @@ def main():
         action='store_true',
         help='Show detailed progress information'
     )
+    parser.add_argument(
+        '--jobs',
+        type=int,
+        default=1,
+        help='Number of worker processes (default: 1, 0 = one per CPU)'
+    )
+    parser.add_argument(
+        '--cache',
+        help='Scan cache file (default: <directory>/.scan_cache/validate_column_references.json)'
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Re-validate every file and leave the scan cache untouched'
+    )
+    parser.add_argument(
+        '--types',
+        nargs='+',
+        default=list(DEFAULT_TYPE_SOURCES),
+        metavar='SOURCE',
+        help='Setup .sql script(s) to read column types from when the schema has none, for the '
+             'implicit-conversion checks (default: ../00_TechCorp_MASTER_Setup.sql)'
+    )
+    parser.add_argument(
+        '--jsonl',
+        help='Also stream every issue to this file as JSON Lines'
+    )
+    parser.add_argument(
+        '--sarif',
+        help='Also write every issue to this file as a SARIF 2.1.0 log'
+    )
+    changed = parser.add_mutually_exclusive_group()
+    changed.add_argument(
+        '--since',
+        metavar='REF',
+        help='Only validate markdown files changed since this git ref '
+             '(plus files using tables a schema change touched)'
+    )
+    changed.add_argument(
+        '--staged',
+        action='store_true',
+        help='Only validate markdown files staged for commit, e.g. from a pre-commit hook '
+             '(plus files using tables a schema change touched)'
+    )
+    parser.add_argument(
+        '--watch',
+        action='store_true',
+        help='Keep the schema and results in memory and revalidate files as they are saved'
+    )
+    parser.add_argument(
+        '--poll',
+        action='store_true',
+        help='With --watch, poll for changes instead of using inotify'
+    )
+    add_profile_arguments(parser)
     
     args = parser.parse_args()
+    if args.watch and (args.since or args.staged or args.jsonl or args.sarif or args.profile):
+        parser.error('--watch cannot be combined with --since, --staged, --jsonl, --sarif or --profile')
+    start_profile(args)
     
     # Check if schema file exists
     if not os.path.exists(args.schema):
@@ -363,23 +742,50 @@ def main():
     print(f"📂 Schema file: {args.schema}")
     print(f"📂 Scanning directory: {args.directory}")
     print(f"📄 File pattern: {args.pattern}")
+    files = None
+    if args.since or args.staged:
+        try:
+            selection = select_changed(sorted(Path(args.directory).glob(args.pattern), key=str),
+                                       expand_sources([args.schema]), args.since, args.staged)
+        except GitError as exc:
+            print(f"❌ Error: {exc}")
+            return 2
+        files = selection.files
+        print(f"🌿 {selection.describe(f'since {args.since}' if args.since else 'staged for commit')}")
     print()
     
     # Initialize validator
-    validator = ColumnReferenceValidator(args.schema)
+    validator = ColumnReferenceValidator(args.schema, args.types)
     
     print(f"📊 Loaded schema with {len(validator.table_columns)} tables")
+    if validator.types is None:
+        print("   No column types found; the implicit-conversion checks are off")
     if args.verbose:
         print(f"   Tables: {', '.join(sorted(validator.table_columns.keys()))}")
     print()
     
     # Run validation
     print("🔎 Validating files...")
-    results = validator.validate_directory(args.directory, args.pattern)
+    cache = None if args.no_cache else _open_cache(args)
+    if args.watch:
+        return WatchSession(validator, args, cache).run(polling=args.poll)
+    findings = None
+    if args.jsonl or args.sarif:
+        findings = FindingStream(
+            'validate_column_references',
+            Path(args.jsonl) if args.jsonl else None,
+            Path(args.sarif) if args.sarif else None,
+        )
+    report = ValidationReport(findings)
+    results = validator.validate_directory(args.directory, args.pattern, jobs=args.jobs, cache=cache,
+                                           report=report, files=files)
+    if cache is not None:
+        with PROFILER.stage('write'):
+            cache.save()
     
     # Generate report
     print("📝 Generating report...")
-    validator.generate_report(results, args.output)
+    report.save(args.output, results)
     
     # Print summary
     print()
@@ -391,10 +797,12 @@ def main():
     
     if results['total_issues'] > 0:
         print(f"\n⚠️  Found {results['total_issues']} issue(s). See {args.output} for details.")
-        return 1
+        status = 1
     else:
         print("\n✅ All column references are valid!")
-        return 0
+        status = 0
+    finish_profile(args)
+    return status
 
 
 if __name__ == '__main__':